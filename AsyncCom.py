@@ -0,0 +1,224 @@
+from __future__ import annotations
+import asyncio
+
+from Com import Com
+from Dispatcher import LoopDispatcher
+from Log import getLogger
+from Message import Message
+from Router import Router
+
+syncLog = getLogger("sync")
+barrierLog = getLogger("barrier")
+mutexLog = getLogger("mutex")
+
+class AsyncCom(Com):
+    """
+    Variante asyncio de Com : les opérations bloquantes sont des coroutines qui attendent sans occuper de thread,
+    et les handlers de réception sont exécutés sur la boucle d'événements par un LoopDispatcher.
+    Des milliers de processus logiques peuvent ainsi tourner comme coroutines d'une seule boucle.
+    Les opérations non bloquantes (sendTo, broadcast, releaseSC, stop...) sont celles de Com,
+    et la boîte aux lettres se lit avec async for.
+    Si les boîtes aux lettres sont bornées (Com.mailboxCapacity), les envois asynchrones ne peuvent pas attendre de crédits sans bloquer
+    la boucle : ils lèvent MailboxFull quand les crédits manquent, et await waitCredits(dest) permet de les attendre avant d'envoyer.
+
+    Usage:
+        com = AsyncCom("P0", 3)
+        await com.start()
+
+    Args:
+        name (str): Le nom du processus.
+        expectedProcesses (int | None): Nombre de processus attendus, voir Com.
+        router (Router | None): La couche de routage à utiliser, voir Com.
+    """
+
+    def __init__(self, name: str, expectedProcesses: int | None = None, router: Router | None = None):
+        """
+        Crée le Com sans bloquer, depuis la boucle d'événements ; l'initialisation se termine avec await start().
+        """
+        self.setup(name, expectedProcesses, router)
+        self.reorgWaiters: list[asyncio.Future] = []
+
+    def createDispatcher(self) -> LoopDispatcher:
+        """
+        Crée le LoopDispatcher exécutant les handlers de réception sur la boucle d'événements courante,
+        dès la livraison si la couche de routage le permet.
+        """
+        return LoopDispatcher(asyncio.get_running_loop(), self.router.inlineHandlers)
+
+    async def start(self) -> None:
+        """
+        Enregistre le Com, attend la génération des IDs puis termine l'initialisation.
+        """
+        self.router.register(self)
+        await self.autoId()
+        self.initialize()
+
+    async def autoId(self) -> None:
+        """
+        Version asynchrone de Com.autoId.
+        """
+        self.announce()
+        if self.expectedProcesses is not None:
+            try:
+                await asyncio.wait_for(asyncio.wrap_future(self.membersFuture), Com.bootstrapTimeout)
+            except asyncio.TimeoutError:
+                self.bootstrapTimedOut()
+        else:
+            while (remaining := self.stabilityRemaining()) > 0:
+                await asyncio.sleep(remaining)
+        self.buildNameTable()
+
+    def waitReorganized(self) -> None:
+        """
+        N'attend pas : les opérations et l'application des réorganisations s'exécutant toutes sur la boucle d'événements,
+        une opération commencée avant l'application d'un retrait porte des IDs cohérents avec l'époque de ses messages.
+        """
+
+    async def waitReorg(self) -> None:
+        """
+        Attend la fin d'une éventuelle réorganisation, sans bloquer la boucle d'événements.
+        """
+        if not self.reorgEvent.is_set():
+            waiter = asyncio.get_running_loop().create_future()
+            self.reorgWaiters.append(waiter)
+            await waiter
+
+    def applyReorgs(self) -> None:
+        """
+        Applique les retraits reçus, voir Com.applyReorgs, puis réveille les opérations qui en attendaient la fin.
+        Exécuté sur la boucle d'événements par le LoopDispatcher.
+        """
+        super(AsyncCom, self).applyReorgs()
+        waiters = self.reorgWaiters
+        self.reorgWaiters = []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def acquireCredits(self, dest: str | None, count: int) -> None:
+        """
+        Prend les crédits de count messages asynchrones sans attendre, quelle que soit Com.overflowPolicy, voir waitCredits.
+        """
+        self.flow.acquire(dest, count, "reject", None)
+
+    async def waitCredits(self, dest: str | list[str] | None = None, count: int = 1) -> None:
+        """
+        Attend que count messages asynchrones puissent être envoyés à un destinataire, à plusieurs (membres d'un groupe)
+        ou à tous (None), sans lever MailboxFull.
+        Les crédits ne sont pas réservés : l'envoi doit suivre sans await intermédiaire.
+        """
+        await asyncio.wrap_future(self.flow.whenAvailable(dest, count))
+
+    async def sendToSync(self, message: any, dest: str):
+        """
+        Envoie un message synchronisé à un destinataire et attend l'ACK.
+        """
+        await self.waitReorg()
+        future = self.sendToSyncFuture(message, dest)
+        if future is not None:
+            await asyncio.wrap_future(future)
+
+    async def recevFromSync(self, src: str) -> Message:
+        """
+        Attend la réception d'un message synchronisé depuis une source spécifique et renvoie le message reçu.
+        """
+        await self.waitReorg()
+        if src not in self.nameTable:
+            syncLog.error("<%s:%s> source %s unknown", self.name, self.id, src)
+            return None
+
+        msg = await asyncio.wrap_future(self.syncMailbox.getFuture(sender=self.nameTable[src]))
+        self.acknowledgeSync(msg)
+        return msg
+
+    async def recevFromAnySync(self) -> Message:
+        """
+        Attend la réception d'un message synchronisé depuis n'importe quelle source et renvoie le premier arrivé.
+        """
+        await self.waitReorg()
+        msg = await asyncio.wrap_future(self.syncMailbox.getFuture())
+        self.acknowledgeSync(msg)
+        return msg
+
+    async def synchronize(self):
+        """
+        Synchronise le processus avec tous les autres, voir Com.synchronize.
+        """
+        await self.waitReorg()
+        barrierLog.info("<%s:%s> is synchronizing", self.name, self.id)
+        for future in self.barrier():
+            await asyncio.wrap_future(future)
+        barrierLog.info("<%s:%s> synchronized with %s others", self.name, self.id, self.nbProcess - 1)
+
+    async def requestSC(self, resource: str | None = None, shared: bool = False):
+        """
+        Demande l'accès à une section critique en attendant le token, voir Com.requestSC.
+        """
+        await self.waitReorg()
+        mutexLog.info("<%s:%s> is requesting critical section%s", self.name, self.id, "" if resource is None else " " + resource)
+        await asyncio.wrap_future(self.requestSCFuture(resource, shared))
+        mutexLog.info("<%s:%s> got the token", self.name, self.id)
+
+    async def ackNeededBroadcast(self, message: any):
+        """
+        Diffuse un message à tous les processus en attendant un ACK de chacun.
+        """
+        await self.waitReorg()
+        await self.waitCredits()
+        await asyncio.wrap_future(self.ackNeededBroadcastFuture(message))
+
+    async def ackNeededSendToGroup(self, message: any, group: str):
+        """
+        Diffuse un message aux membres d'un groupe en attendant un ACK de chacun.
+        """
+        await self.waitReorg()
+        await self.waitCredits(self.groupMembers(group))
+        await asyncio.wrap_future(self.ackNeededSendToGroupFuture(message, group))
+
+    async def bcast(self, value: any = None, root: str | None = None) -> any:
+        """
+        Diffuse la valeur du processus racine à tous les processus, voir Com.bcast.
+        """
+        await self.waitReorg()
+        return await self.collective(self.collectives.bcast(value, self.rootId(root)))
+
+    async def reduce(self, value: any, op="sum", root: str | None = None) -> any:
+        """
+        Combine les valeurs de tous les processus à la racine, voir Com.reduce.
+        """
+        await self.waitReorg()
+        return await self.collective(self.collectives.reduce(value, op, self.rootId(root)))
+
+    async def allreduce(self, value: any, op="sum") -> any:
+        """
+        Combine les valeurs de tous les processus et retourne le résultat à chacun, voir Com.allreduce.
+        """
+        await self.waitReorg()
+        return await self.collective(self.collectives.allreduce(value, op))
+
+    async def scatter(self, values: list[any] | None = None, root: str | None = None) -> any:
+        """
+        Distribue à chaque processus une valeur de la liste de la racine, voir Com.scatter.
+        """
+        await self.waitReorg()
+        return await self.collective(self.collectives.scatter(values, self.rootId(root)))
+
+    async def gather(self, value: any, root: str | None = None) -> list[any] | None:
+        """
+        Collecte à la racine les valeurs de tous les processus, voir Com.gather.
+        """
+        await self.waitReorg()
+        return await self.collective(self.collectives.gather(value, self.rootId(root)))
+
+    async def collective(self, operation) -> any:
+        """
+        Exécute une opération collective sans bloquer la boucle d'événements, voir Com.collective.
+        """
+        start = self.scheduler.now()
+        try:
+            future = next(operation)
+            while True:
+                future = operation.send(await asyncio.wrap_future(future))
+        except StopIteration as done:
+            self.metrics.record("collectiveWait", self.scheduler.now() - start)
+            return done.value
@@ -0,0 +1,284 @@
+"""
+Banc d'essai des primitives de Com, pour des systèmes de N processus dans un même interpréteur.
+
+Chaque mesure retourne un dictionnaire de résultats : débit ("throughput", en opérations par seconde),
+percentiles de latence ("p50", "p99", en millisecondes) ou durée totale ("seconds").
+Les résultats de la suite sont indexés par "<mesure>/N=<taille>", peuvent être écrits en JSON,
+et comparés à ceux d'une exécution de référence pour détecter les régressions.
+L'initialisation est mesurée sur ses propres tailles de système, de 3 à 500 processus par défaut.
+
+Usage:
+    python Benchmark.py --sizes 2 16 64 --bootstrap-sizes 3 50 500 --output results.json
+    python Benchmark.py --baseline results.json
+"""
+
+import argparse
+import json
+import sys
+from contextlib import contextmanager
+from threading import Thread
+from time import perf_counter
+
+from Com import Com
+from Metrics import Histogram
+
+DEFAULT_SIZES = (2, 4, 16, 64, 256)
+BOOTSTRAP_SIZES = (3, 10, 50, 100, 250, 500)
+
+def runAll(targets) -> None:
+    """Exécute chaque fonction sans argument de targets dans son propre thread et attend la fin de toutes."""
+    threads = [Thread(target=target) for target in targets]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+@contextmanager
+def cluster(n: int):
+    """
+    Crée en parallèle un système de n Com déclarant le nombre de processus attendus, et les arrête à la sortie.
+    Produit la liste des Com indexée par ID.
+    """
+    coms: list[Com | None] = [None] * n
+
+    def create(i: int):
+        coms[i] = Com(f"B{i}", n)
+
+    runAll([lambda i=i: create(i) for i in range(n)])
+    coms.sort(key=lambda com: com.id)
+    try:
+        yield coms
+    finally:
+        for com in coms:
+            com.stop()
+
+def latencies(histogram: Histogram, elapsed: float) -> dict[str, float]:
+    """Résume une série de latences : débit sur la durée totale, p50 et p99."""
+    return {"throughput": histogram.count / elapsed, "p50": histogram.percentile(50), "p99": histogram.percentile(99)}
+
+def benchBootstrap(n: int) -> dict[str, float]:
+    """
+    Mesure le temps d'initialisation (génération des IDs et construction des tables) d'un système de n processus.
+    """
+    start = perf_counter()
+    with cluster(n):
+        elapsed = perf_counter() - start
+    return {"seconds": elapsed}
+
+def benchUnicast(coms: list[Com], count: int = 2000) -> dict[str, float]:
+    """
+    Mesure le débit de sendTo d'un processus vers un autre, jusqu'à la réception du dernier message.
+    """
+    sender, receiver = coms[0], coms[-1]
+    start = perf_counter()
+    for i in range(count):
+        sender.sendTo(i, receiver.name)
+    for _ in range(count):
+        receiver.mailbox.get()
+    return {"throughput": count / (perf_counter() - start)}
+
+def benchSendToSync(coms: list[Com], count: int = 200) -> dict[str, float]:
+    """
+    Mesure la latence aller-retour de sendToSync, le destinataire consommant les messages au fil de l'eau.
+    """
+    sender, receiver = coms[0], coms[-1]
+    histogram = Histogram()
+    consumer = Thread(target=lambda: [receiver.recevFromSync(sender.name) for _ in range(count)])
+    consumer.start()
+    start = perf_counter()
+    for i in range(count):
+        sent = perf_counter()
+        sender.sendToSync(i, receiver.name)
+        histogram.record(perf_counter() - sent)
+    elapsed = perf_counter() - start
+    consumer.join()
+    return latencies(histogram, elapsed)
+
+def benchBroadcast(coms: list[Com], count: int = 50) -> dict[str, float]:
+    """
+    Mesure le débit de broadcast, jusqu'à la réception de tous les messages par tous les processus.
+    """
+    start = perf_counter()
+    for i in range(count):
+        coms[0].broadcast(i)
+    runAll([lambda com=com: [com.mailbox.get() for _ in range(count)] for com in coms])
+    return {"throughput": count / (perf_counter() - start)}
+
+def benchAckNeededBroadcast(coms: list[Com], count: int = 20) -> dict[str, float]:
+    """
+    Mesure la latence d'ackNeededBroadcast, jusqu'à la réception de l'ACK de chaque processus.
+    """
+    histogram = Histogram()
+    start = perf_counter()
+    for i in range(count):
+        sent = perf_counter()
+        coms[0].ackNeededBroadcast(i)
+        histogram.record(perf_counter() - sent)
+    elapsed = perf_counter() - start
+    for com in coms:
+        com.mailbox.drain()
+    return latencies(histogram, elapsed)
+
+def benchBarrier(coms: list[Com], count: int = 10) -> dict[str, float]:
+    """
+    Mesure le débit et la latence de synchronize, tous les processus enchaînant count barrières.
+    """
+    histogram = Histogram()
+
+    def run(com: Com):
+        for _ in range(count):
+            start = perf_counter()
+            com.synchronize()
+            histogram.record(perf_counter() - start)
+
+    start = perf_counter()
+    runAll([lambda com=com: run(com) for com in coms])
+    elapsed = perf_counter() - start
+    return {"throughput": count / elapsed, "p50": histogram.percentile(50), "p99": histogram.percentile(99)}
+
+def benchCriticalSection(coms: list[Com], count: int = 2) -> dict[str, float]:
+    """
+    Mesure le débit de la section critique et l'attente du token, tous les processus la demandant count fois en concurrence.
+    """
+    histogram = Histogram()
+
+    def run(com: Com):
+        for _ in range(count):
+            start = perf_counter()
+            com.requestSC()
+            histogram.record(perf_counter() - start)
+            com.releaseSC()
+
+    start = perf_counter()
+    runAll([lambda com=com: run(com) for com in coms])
+    return latencies(histogram, perf_counter() - start)
+
+def benchNamedSections(coms: list[Com], count: int = 2, resources: int = 8) -> dict[str, float]:
+    """
+    Mesure le débit des sections critiques nommées et l'attente de leur token, tous les processus demandant count fois en concurrence
+    l'une de resources sections : à comparer à criticalSection, les sections distinctes ne s'attendant pas.
+    """
+    histogram = Histogram()
+
+    def run(com: Com):
+        resource = f"section{com.id % resources}"
+        for _ in range(count):
+            start = perf_counter()
+            com.requestSC(resource)
+            histogram.record(perf_counter() - start)
+            com.releaseSC(resource)
+
+    start = perf_counter()
+    runAll([lambda com=com: run(com) for com in coms])
+    return latencies(histogram, perf_counter() - start)
+
+def benchAllreduce(coms: list[Com], count: int = 10) -> dict[str, float]:
+    """
+    Mesure le débit et la latence d'allreduce, tous les processus enchaînant count réductions.
+    """
+    histogram = Histogram()
+
+    def run(com: Com):
+        for i in range(count):
+            start = perf_counter()
+            com.allreduce(i)
+            histogram.record(perf_counter() - start)
+
+    start = perf_counter()
+    runAll([lambda com=com: run(com) for com in coms])
+    return latencies(histogram, perf_counter() - start)
+
+def benchGather(coms: list[Com], count: int = 10) -> dict[str, float]:
+    """
+    Mesure le débit et la latence de gather vers le processus d'ID 0, tous les processus enchaînant count collectes.
+    """
+    histogram = Histogram()
+
+    def run(com: Com):
+        for i in range(count):
+            start = perf_counter()
+            com.gather(i)
+            histogram.record(perf_counter() - start)
+
+    start = perf_counter()
+    runAll([lambda com=com: run(com) for com in coms])
+    return latencies(histogram, perf_counter() - start)
+
+WORKLOADS = {
+    "unicast": benchUnicast,
+    "sendToSync": benchSendToSync,
+    "broadcast": benchBroadcast,
+    "ackNeededBroadcast": benchAckNeededBroadcast,
+    "barrier": benchBarrier,
+    "criticalSection": benchCriticalSection,
+    "namedSections": benchNamedSections,
+    "allreduce": benchAllreduce,
+    "gather": benchGather,
+}
+
+def runSuite(sizes=DEFAULT_SIZES, workloads=None, bootstrapSizes=BOOTSTRAP_SIZES) -> dict[str, dict[str, float]]:
+    """
+    Exécute les mesures demandées : l'initialisation sur un système dédié pour chaque taille de bootstrapSizes,
+    puis, pour chaque taille de sizes, les autres mesures successivement sur un même système.
+    Args:
+        sizes (tuple[int]): Tailles de système des mesures de WORKLOADS.
+        workloads (list[str] | None): Noms des mesures à exécuter, parmi "bootstrap" et WORKLOADS, toutes par défaut.
+        bootstrapSizes (tuple[int]): Tailles de système de la mesure de l'initialisation.
+    Returns:
+        dict[str, dict[str, float]]: Les résultats, indexés par "<mesure>/N=<taille>".
+    """
+    workloads = workloads or ["bootstrap", *WORKLOADS]
+    results = {}
+    if "bootstrap" in workloads:
+        for n in bootstrapSizes:
+            results[f"bootstrap/N={n}"] = benchBootstrap(n)
+    if not any(name in workloads for name in WORKLOADS):
+        return results
+    for n in sizes:
+        with cluster(n) as coms:
+            for name, bench in WORKLOADS.items():
+                if name in workloads:
+                    results[f"{name}/N={n}"] = bench(coms)
+    return results
+
+def compare(results: dict, baseline: dict, tolerance: float = 0.2) -> list[str]:
+    """
+    Compare des résultats à ceux d'une exécution de référence.
+    Un débit plus faible, ou une latence ou une durée plus élevée, de plus de tolerance (en proportion) est une régression.
+    Returns:
+        list[str]: La description de chaque régression, vide s'il n'y en a aucune.
+    """
+    regressions = []
+    for key, values in results.items():
+        for metric, value in values.items():
+            reference = baseline.get(key, {}).get(metric)
+            if reference is None or value is None or reference == 0:
+                continue
+            change = value / reference - 1
+            worse = -change if metric == "throughput" else change
+            if worse > tolerance:
+                regressions.append(f"{key} {metric}: {value:.3f} vs {reference:.3f} ({change:+.0%})")
+    return regressions
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Banc d'essai des primitives de Com.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="tailles de système à mesurer")
+    parser.add_argument("--bootstrap-sizes", type=int, nargs="+", default=BOOTSTRAP_SIZES, help="tailles de système de la mesure de l'initialisation")
+    parser.add_argument("--workloads", nargs="+", choices=["bootstrap", *WORKLOADS], help="mesures à exécuter, toutes par défaut")
+    parser.add_argument("--output", help="fichier JSON où écrire les résultats")
+    parser.add_argument("--baseline", help="fichier JSON de résultats de référence à comparer")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="dégradation tolérée par rapport à la référence, en proportion")
+    args = parser.parse_args()
+
+    results = runSuite(args.sizes, args.workloads, args.bootstrap_sizes)
+    for key, values in results.items():
+        print(f"{key:<28}" + "  ".join(f"{metric}={value:.3f}" for metric, value in values.items()), flush=True)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", flush=True)
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,148 @@
+from __future__ import annotations
+from copy import copy
+from heapq import heappush, heappop
+from threading import Lock
+
+from Membership import renumber
+from Message import Message, CausalMessage
+
+class CausalBroadcast:
+    """
+    Diffusion causalement ordonnée, par horloges vectorielles (Birman-Schiper-Stephenson) :
+    un message diffusé n'est rangé dans la boîte aux lettres qu'après tous les messages diffusés dont son émission dépend.
+
+    Pour que l'en-tête ne grandisse pas avec le nombre de processus, chaque message ne porte que les entrées de l'horloge vectorielle
+    modifiées depuis la diffusion précédente du même émetteur, plus son propre numéro de séquence.
+    Les messages d'un émetteur étant livrés dans l'ordre de leur numéro, les entrées absentes ont déjà été vérifiées pour le message
+    précédent : seules les entrées portées sont à vérifier.
+    Les messages arrivés trop tôt sont retenus dans un tas par émetteur, ordonné par numéro de séquence ; le premier de chaque tas,
+    s'il attend un autre émetteur, est inscrit dans un tas par dépendance, ordonné par valeur attendue.
+    Chaque livraison ne réexamine ainsi que les messages qu'elle débloque, en O(log n) chacun.
+
+    Args:
+        com (Com): Le Com initialisé (id et nbProcess connus) utilisé pour diffuser et livrer les messages.
+
+    Attributs:
+        com (Com): Le Com associé.
+        delivered (list[int]): Horloge vectorielle : nombre de diffusions livrées de chaque processus.
+        sequence (int): Numéro de la dernière diffusion du processus.
+        lastSent (list[int]): Horloge vectorielle portée par la dernière diffusion du processus, référence des deltas.
+        holdback (dict[int, list[tuple[int, CausalMessage]]]): Messages retenus, par émetteur, en tas ordonné par numéro de séquence.
+        blocked (dict[int, list[tuple[int, int]]]): Émetteurs dont le prochain message attend une livraison d'un autre processus,
+            par processus attendu, en tas ordonné par nombre de livraisons attendu.
+        lock (Lock): Mutex protégeant l'état.
+    """
+
+    def __init__(self, com: "Com"):
+        self.com = com
+        self.delivered: list[int] = [0] * com.nbProcess
+        self.sequence = 0
+        self.lastSent: list[int] = [0] * com.nbProcess
+        self.holdback: dict[int, list[tuple[int, CausalMessage]]] = {}
+        self.blocked: dict[int, list[tuple[int, int]]] = {}
+        self.lock = Lock()
+
+    def broadcast(self, content: any, clock: int) -> None:
+        """
+        Diffuse un message portant la part modifiée de l'horloge vectorielle.
+        Args:
+            content (any): Le contenu du message.
+            clock (int): L'horloge de Lamport du message.
+        """
+        id = self.com.id
+        with self.lock:
+            self.sequence += 1
+            delta = {id: self.sequence}
+            for other, count in enumerate(self.delivered):
+                if other != id and count != self.lastSent[other]:
+                    delta[other] = count
+                    self.lastSent[other] = count
+            self.lastSent[id] = self.sequence
+            # posté sous le verrou, pour que les diffusions concurrentes du processus partent dans l'ordre de leur numéro
+            self.com.router.post(CausalMessage(id, content, clock, delta))
+
+    def onMessage(self, message: CausalMessage) -> None:
+        """
+        Reçoit une diffusion, et range dans la boîte aux lettres du Com toutes celles qui deviennent livrables, dans l'ordre causal.
+        """
+        with self.lock:
+            heappush(self.holdback.setdefault(message.sender, []), (message.delta[message.sender], message))
+            ready = self._release(message.sender)
+        self._deliver(ready)
+
+    def renumber(self, removed: list[int]) -> None:
+        """
+        Renumérote l'état après le retrait de processus défaillants, oublie leurs diffusions retenues,
+        et livre celles qui ne dépendaient plus que de diffusions des processus retirés.
+        Args:
+            removed (list[int]): Les anciens IDs retirés, triés.
+        """
+        with self.lock:
+            for id in reversed(removed):
+                del self.delivered[id]
+                del self.lastSent[id]
+            holdback = self.holdback
+            self.holdback = {}
+            self.blocked = {}
+            for sender, queue in holdback.items():
+                sender = renumber(sender, removed)
+                if sender is not None:
+                    self.holdback[sender] = [(sequence, CausalBroadcast.translateMessage(message, sender, removed)) for sequence, message in queue]
+            ready = []
+            for sender in list(self.holdback):
+                ready += self._release(sender)
+        self._deliver(ready)
+
+    @staticmethod
+    def translateMessage(message: CausalMessage, sender: int, removed: list[int]) -> CausalMessage:
+        """
+        Retourne une copie d'un message retenu, d'émetteur renuméroté sender, après le retrait de processus défaillants.
+        """
+        translated = copy(message)
+        translated.sender = sender
+        translated.content = (message.content[0], CausalBroadcast.translateDelta(message.delta, removed))
+        return translated
+
+    @staticmethod
+    def translateDelta(delta: dict[int, int], removed: list[int]) -> dict[int, int]:
+        """
+        Retourne une partie d'horloge vectorielle renumérotée après le retrait de processus défaillants, sans les entrées de ceux-ci :
+        les diffusions des processus retirés qui ne sont pas encore arrivées ne seront plus attendues.
+        """
+        return {new: count for id, count in delta.items() if (new := renumber(id, removed)) is not None}
+
+    def _deliver(self, ready: list[CausalMessage]) -> None:
+        """
+        Range des messages devenus livrables dans la boîte aux lettres du Com, dans l'ordre.
+        """
+        for deliverable in ready:
+            self.com.clock.sync(deliverable.clock)
+            self.com.mailbox.addMessage(Message(deliverable.sender, None, deliverable.content[0], deliverable.clock))
+
+    def _release(self, sender: int) -> list[CausalMessage]:
+        """
+        Livre les messages retenus débloqués à partir de ceux d'un émetteur, et retourne les messages livrés dans l'ordre.
+        Doit être appelé avec le verrou pris.
+        """
+        ready = []
+        pending = [sender]
+        while pending:
+            sender = pending.pop()
+            queue = self.holdback.get(sender)
+            while queue and queue[0][0] == self.delivered[sender] + 1:
+                message = queue[0][1]
+                missing = next(((other, count) for other, count in message.delta.items()
+                                if other != sender and self.delivered[other] < count), None)
+                if missing is not None:
+                    heappush(self.blocked.setdefault(missing[0], []), (missing[1], sender))
+                    break
+                heappop(queue)
+                self.delivered[sender] += 1
+                ready.append(message)
+
+                waiting = self.blocked.get(sender)
+                while waiting and waiting[0][0] <= self.delivered[sender]:
+                    pending.append(heappop(waiting)[1])
+            if queue is not None and not queue:
+                del self.holdback[sender]
+        return ready
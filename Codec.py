@@ -0,0 +1,107 @@
+"""
+Codec binaire compact des messages, utilisé par les couches de routage entre processus OS.
+
+Un message encodé est un en-tête de taille fixe suivi du contenu :
+    type (B) | flags (B) | epoch (I) | sender (i) | recipient (i) | clock (q) | extra (q) | contenu
+sender et recipient valent -1 pour None, et sont exprimés dans l'époque epoch de la composition du système. extra porte le correlationId, ou le firstClock d'un BatchMessage.
+Le contenu est omis s'il vaut None, copié tel quel s'il s'agit d'octets (bytes, bytearray, memoryview), encodé en UTF-8 s'il
+s'agit d'une chaîne, et sérialisé avec pickle sinon. Au décodage, un contenu en octets est une memoryview sur le tampon reçu, sans copie.
+"""
+
+from __future__ import annotations
+import pickle
+from struct import Struct
+
+from Message import Message, AutoIdMessage, AckMessage, BatchMessage, SyncMessage, TokenMessage, TokenRequestMessage, JoinMessage, HeartbitMessage, ReorgMessage, CausalMessage, SuspicionMessage, TokenStatusMessage, CreditMessage, ReleaseMessage, GroupMessage, CollectiveMessage, SharedGrantMessage, SharedReleaseMessage
+
+HEADER = Struct("<BBIiiqq")
+
+TYPES: tuple[type, ...] = (Message, AutoIdMessage, AckMessage, BatchMessage, SyncMessage, TokenMessage, TokenRequestMessage, JoinMessage, HeartbitMessage, ReorgMessage, CausalMessage, SuspicionMessage, TokenStatusMessage, CreditMessage, ReleaseMessage, GroupMessage, CollectiveMessage, SharedGrantMessage, SharedReleaseMessage)
+TYPE_CODES: dict[type, int] = {cls: code for code, cls in enumerate(TYPES)}
+
+SYSTEM = 1
+ACK_NEEDED = 2
+HAS_EXTRA = 4
+REPLY = 8
+EMPTY = 16
+RAW = 32
+TEXT = 64
+
+def encode(message: Message) -> bytes:
+    """
+    Encode un message sous sa forme binaire compacte.
+    Args:
+        message (Message): Le message à encoder.
+    Returns:
+        bytes: L'en-tête suivi du contenu.
+    """
+    code = TYPE_CODES.get(message.__class__)
+    if code is None:
+        raise TypeError(f"cannot encode message of type {message.__class__.__name__}")
+
+    flags = 0
+    if message.isSystem:
+        flags |= SYSTEM
+    if message.ackNeeded:
+        flags |= ACK_NEEDED
+    extra = message.firstClock if code == TYPE_CODES[BatchMessage] else message.correlationId
+    if extra is not None:
+        flags |= HAS_EXTRA
+    if code == TYPE_CODES[AutoIdMessage] and message.reply:
+        flags |= REPLY
+
+    content = message.content
+    if content is None:
+        flags |= EMPTY
+        payload = b""
+    elif isinstance(content, (bytes, bytearray, memoryview)):
+        flags |= RAW
+        payload = content
+    elif isinstance(content, str):
+        flags |= TEXT
+        payload = content.encode()
+    else:
+        payload = pickle.dumps(content, pickle.HIGHEST_PROTOCOL)
+
+    header = HEADER.pack(code, flags, message.epoch,
+                         -1 if message.sender is None else message.sender,
+                         -1 if message.recipient is None else message.recipient,
+                         message.clock, extra or 0)
+    return header + payload
+
+def decode(data: bytes | bytearray | memoryview) -> Message:
+    """
+    Reconstruit un message à partir de sa forme binaire, sans appeler le constructeur de sa classe.
+    Args:
+        data (bytes | bytearray | memoryview): Le message encodé.
+    Returns:
+        Message: Le message décodé ; un contenu en octets est une memoryview sur data.
+    """
+    view = memoryview(data)
+    code, flags, epoch, sender, recipient, clock, extra = HEADER.unpack_from(view)
+    cls = TYPES[code]
+    message = cls.__new__(cls)
+    message.sender = None if sender == -1 else sender
+    message.recipient = None if recipient == -1 else recipient
+    message.clock = clock
+    message.epoch = epoch
+    message.isSystem = bool(flags & SYSTEM)
+    message.ackNeeded = bool(flags & ACK_NEEDED)
+    message.correlationId = None
+    if cls is BatchMessage:
+        message.firstClock = extra
+    elif flags & HAS_EXTRA:
+        message.correlationId = extra
+    if cls is AutoIdMessage:
+        message.reply = bool(flags & REPLY)
+
+    payload = view[HEADER.size:]
+    if flags & EMPTY:
+        message.content = None
+    elif flags & RAW:
+        message.content = payload
+    elif flags & TEXT:
+        message.content = str(payload, "utf-8")
+    else:
+        message.content = pickle.loads(payload)
+    return message
@@ -0,0 +1,234 @@
+from __future__ import annotations
+import operator
+from concurrent.futures import Future
+from threading import Lock
+
+from Membership import ProcessFailure
+from Message import CollectiveMessage
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+def maximum(a: any, b: any) -> any:
+    """Maximum de deux valeurs, élément par élément pour des tableaux NumPy."""
+    if numpy is not None and isinstance(a, numpy.ndarray):
+        return numpy.maximum(a, b)
+    return max(a, b)
+
+def minimum(a: any, b: any) -> any:
+    """Minimum de deux valeurs, élément par élément pour des tableaux NumPy."""
+    if numpy is not None and isinstance(a, numpy.ndarray):
+        return numpy.minimum(a, b)
+    return min(a, b)
+
+OPERATIONS = {"sum": operator.add, "prod": operator.mul, "max": maximum, "min": minimum}
+
+class Collectives:
+    """
+    Opérations collectives à la MPI sur les IDs des processus : diffusion, réduction, réduction globale, distribution et collecte.
+    Chaque opération termine en O(log2(N)) tours de messages point à point : arbre binomial enraciné en root pour bcast, reduce,
+    scatter et gather, doublement récursif pour allreduce (dont les processus en surnombre au-delà de la plus grande puissance de 2
+    sont d'abord regroupés deux à deux). Aucun processus ne reçoit ni n'envoie plus de log2(N) messages par opération, hors collecte
+    et distribution dont les messages portent jusqu'à N/2 valeurs.
+
+    Comme avec MPI, tous les processus doivent appeler les mêmes opérations collectives dans le même ordre : chacune porte un numéro
+    de génération qui distingue ses messages de ceux des opérations suivantes. Les réductions appliquent op dans l'ordre des IDs, de 0 à N-1,
+    quelle que soit la racine, si bien qu'une opération associative suffit, même non commutative : reduce et allreduce donnent le même résultat.
+    Les valeurs NumPy sont combinées par les opérations vectorisées de NumPy : "sum" et "prod" par les opérateurs des tableaux,
+    "max" et "min" par numpy.maximum et numpy.minimum.
+
+    Les opérations sont des générateurs qui envoient les messages de chaque tour et produisent les Futures à attendre, résolus avec la
+    valeur reçue ; la valeur à leur renvoyer est celle du Future, et la valeur de retour du générateur est le résultat de l'opération.
+    Com les attend en bloquant, AsyncCom sans bloquer la boucle d'événements.
+
+    Args:
+        com (Com): Le Com initialisé (id et nbProcess connus) utilisé pour échanger les messages.
+
+    Attributs:
+        generation (int): Numéro de la dernière opération commencée par le processus.
+        received (dict[tuple[int, int], any]): Valeurs reçues et pas encore attendues, par (génération, étape).
+        waiters (dict[tuple[int, int], Future]): Futures des valeurs attendues et pas encore reçues.
+        lock (Lock): Mutex protégeant generation, received et waiters.
+    """
+
+    def __init__(self, com: "Com"):
+        self.com = com
+        self.generation = 0
+        self.received: dict[tuple[int, int], any] = {}
+        self.waiters: dict[tuple[int, int], Future] = {}
+        self.lock = Lock()
+
+    def bcast(self, value: any, root: int):
+        """
+        Diffuse la valeur de la racine à tous les processus, par arbre binomial. Retourne la valeur reçue.
+        """
+        generation, epoch, size, rank = self._begin(root)
+        mask = 1
+        while mask < size:
+            if rank & mask:
+                value = yield self._receive(generation, mask, epoch)
+                break
+            mask <<= 1
+        mask >>= 1
+        while mask > 0:
+            if rank + mask < size:
+                self._send(root, rank + mask, generation, mask, value, epoch)
+            mask >>= 1
+        return value
+
+    def reduce(self, value: any, op, root: int):
+        """
+        Combine les valeurs de tous les processus avec op dans l'ordre des IDs, par arbre binomial. Retourne le résultat à la racine, None ailleurs.
+        Le sous-arbre d'un processus couvre des rangs relatifs consécutifs, dont les IDs reviennent au plus une fois de N-1 à 0 :
+        chaque processus combine séparément les valeurs des IDs supérieurs ou égaux à la racine (high) et celles des IDs inférieurs (low),
+        et la racine combine low puis high.
+        """
+        op = OPERATIONS.get(op, op)
+        generation, epoch, size, rank = self._begin(root)
+        # rang relatif du processus d'ID 0 : les sous-arbres s'étendant au-delà contiennent des IDs inférieurs à la racine
+        wrap = size - root
+        high, low = (value, None) if rank < wrap else (None, value)
+        mask = 1
+        while mask < size:
+            if rank & mask:
+                self._send(root, rank - mask, generation, mask, (high, low), epoch)
+                return None
+            child = rank + mask
+            if child < size:
+                childHigh, childLow = yield self._receive(generation, mask, epoch)
+                if child < wrap:
+                    high = op(high, childHigh)
+                if min(child + mask, size) > wrap:
+                    low = op(low, childLow) if child > wrap else childLow
+            mask <<= 1
+        return op(low, high) if root > 0 else high
+
+    def allreduce(self, value: any, op):
+        """
+        Combine les valeurs de tous les processus avec op, par doublement récursif. Retourne le résultat à tous les processus.
+        """
+        op = OPERATIONS.get(op, op)
+        generation, epoch, size, rank = self._begin(0)
+        power = 1 << (size.bit_length() - 1)
+        extra = size - power
+        # les 2 * extra premiers processus se regroupent deux à deux : le pair confie sa valeur à l'impair et attend le résultat
+        if rank < 2 * extra:
+            if rank % 2 == 0:
+                self._send(0, rank + 1, generation, 0, value, epoch)
+                return (yield self._receive(generation, power, epoch))
+            value = op((yield self._receive(generation, 0, epoch)), value)
+            virtual = rank // 2
+        else:
+            virtual = rank - extra
+        mask = 1
+        while mask < power:
+            partner = virtual ^ mask
+            partnerRank = 2 * partner + 1 if partner < extra else partner + extra
+            self._send(0, partnerRank, generation, mask, value, epoch)
+            received = yield self._receive(generation, mask, epoch)
+            value = op(value, received) if virtual < partner else op(received, value)
+            mask <<= 1
+        if rank < 2 * extra:
+            self._send(0, rank - 1, generation, power, value, epoch)
+        return value
+
+    def scatter(self, values: list[any] | None, root: int):
+        """
+        Distribue à chaque processus la valeur d'indice son ID dans la liste de la racine, par arbre binomial :
+        chaque processus reçoit d'un coup les valeurs de son sous-arbre et en transmet les moitiés. Retourne la valeur reçue.
+        """
+        generation, epoch, size, rank = self._begin(root)
+        if rank == 0:
+            if values is None or len(values) != size:
+                raise ValueError(f"scatter needs one value per process ({size})")
+            block = [values[(relative + root) % size] for relative in range(size)]
+        mask = 1
+        while mask < size:
+            if rank & mask:
+                block = yield self._receive(generation, mask, epoch)
+                break
+            mask <<= 1
+        mask >>= 1
+        while mask > 0:
+            if rank + mask < size:
+                self._send(root, rank + mask, generation, mask, block[mask:2 * mask], epoch)
+                block = block[:mask]
+            mask >>= 1
+        return block[0]
+
+    def gather(self, value: any, root: int):
+        """
+        Collecte à la racine les valeurs de tous les processus, par arbre binomial.
+        Retourne à la racine la liste des valeurs indexée par ID, None ailleurs.
+        """
+        generation, epoch, size, rank = self._begin(root)
+        block = [value]
+        mask = 1
+        while mask < size:
+            if rank & mask:
+                self._send(root, rank - mask, generation, mask, block, epoch)
+                return None
+            if rank + mask < size:
+                block += yield self._receive(generation, mask, epoch)
+            mask <<= 1
+        return [block[(id - root) % size] for id in range(size)]
+
+    def onMessage(self, message: CollectiveMessage) -> None:
+        """
+        Remet une valeur reçue à l'opération qui l'attend, ou la conserve jusqu'à ce qu'elle l'attende.
+        """
+        generation, step, value = message.content
+        with self.lock:
+            future = self.waiters.pop((generation, step), None)
+            if future is None:
+                self.received[(generation, step)] = value
+        if future is not None:
+            future.set_result(value)
+
+    def fail(self, failure: ProcessFailure) -> None:
+        """
+        Fait échouer les opérations en cours après le retrait de processus défaillants ;
+        les numéros de génération repartent de zéro, et les opérations peuvent être recommencées par tous les processus restants.
+        """
+        with self.lock:
+            waiters = list(self.waiters.values())
+            self.waiters.clear()
+            self.received.clear()
+            self.generation = 0
+        for future in waiters:
+            future.set_exception(failure)
+
+    def _begin(self, root: int) -> tuple[int, int, int, int]:
+        """
+        Commence une opération : retourne sa génération, l'époque courante, le nombre de processus et le rang relatif à la racine.
+        """
+        with self.lock:
+            self.generation += 1
+            generation = self.generation
+        size = self.com.nbProcess
+        return generation, self.com.membership.epoch, size, (self.com.id - root) % size
+
+    def _send(self, root: int, rank: int, generation: int, step: int, value: any, epoch: int) -> None:
+        """
+        Envoie une valeur au processus de rang relatif rank.
+        """
+        if self.com.membership.epoch != epoch:
+            raise ProcessFailure("membership changed during collective operation")
+        self.com.router.post(CollectiveMessage(self.com.id, (rank + root) % self.com.nbProcess, generation, step, value))
+
+    def _receive(self, generation: int, step: int, epoch: int) -> Future:
+        """
+        Retourne le Future résolu avec la valeur d'une étape, immédiatement si elle a déjà été reçue,
+        ou en échec si la composition du système a changé depuis le début de l'opération.
+        """
+        future = Future()
+        with self.lock:
+            if self.com.membership.epoch != epoch:
+                future.set_exception(ProcessFailure("membership changed during collective operation"))
+            elif (generation, step) in self.received:
+                future.set_result(self.received.pop((generation, step)))
+            else:
+                self.waiters[(generation, step)] = future
+        return future
@@ -1,174 +1,478 @@
 from __future__ import annotations
-import collections
+from copy import copy
 from time import sleep
 from pyeventbus3.pyeventbus3 import *
 
 from threading import Lock, Event
-
-from random import randint
+from zlib import crc32
+from concurrent.futures import Future
+from itertools import count
 
 from Mailbox import Mailbox
-from Message import Message, AutoIdMessage, AckMessage, SyncMessage, TokenMessage, JoinMessage, HeartbitMessage, ReorgMessage
+from Message import Message, AutoIdMessage, AckMessage, BatchMessage, CausalMessage, SyncMessage, TokenMessage, TokenRequestMessage, JoinMessage, HeartbitMessage, ReorgMessage, SuspicionMessage, TokenStatusMessage, CreditMessage, GroupMessage, CollectiveMessage, SharedGrantMessage, SharedReleaseMessage
+from Membership import Membership, ProcessFailure, BootstrapFailure, renumber
 from LamportClock import LamportClock
 from LoopTask import LoopTask
+from Scheduler import Scheduler
+from Router import Router
+from Dispatcher import Dispatcher, dispatched, nonBlockingSection
+from SuzukiKasami import SuzukiKasami
+from CausalBroadcast import CausalBroadcast
+from Collectives import Collectives
+from FlowControl import FlowControl
+from PhiAccrualDetector import PhiAccrualDetector
+from Log import getLogger
+from Metrics import Metrics
+
+bootstrapLog = getLogger("bootstrap")
+messagesLog = getLogger("messages")
+syncLog = getLogger("sync")
+barrierLog = getLogger("barrier")
+mutexLog = getLogger("mutex")
+failureLog = getLogger("failure")
+reorgLog = getLogger("reorg")
 
 class Com:
     """
     Com permet de gérer la communication entre processus, elle inclue l'envoie et la réception des messages synchrone et asynchrone via une boite aux lettres,
     la gestion des tokens, l'attente de barrière, des heartbeats et de la réorganisation dans un système distribué.
 
+    Réorganisation : un processus dont le niveau de suspicion dépasse phiThreshold est signalé au coordinateur (le processus vivant d'ID
+    le plus petit), qui diffuse son retrait. Chaque processus applique le retrait entre deux livraisons, sans arrêter les autres :
+    seuls les IDs supérieurs au premier retiré sont renumérotés, les messages émis avant le retrait sont traduits à leur réception
+    grâce à l'époque qu'ils portent, et seules les opérations impliquant un processus retiré échouent, avec ProcessFailure
+    (envoi et réception synchronisés avec lui, barrière en cours). Les diffusions avec ACK n'attendent plus le sien, et les tokens
+    perdus avec leur détenteur sont recréés par le coordinateur, à partir de l'état que lui rapporte chaque processus.
+
+    Sections critiques : outre la section globale, requestSC/releaseSC protègent des sections nommées, chacune avec son propre token
+    Suzuki-Kasami, si bien que des processus qui protègent des ressources distinctes ne s'attendent pas. Le token d'une section nommée
+    est créé à son premier usage chez un processus choisi par hachage de son nom, ce qui répartit les tokens entre les processus ;
+    les accès peuvent être exclusifs ou partagés (lecteurs/rédacteurs), voir SuzukiKasami.
+
     Class Attributes:
-        timeout (int |float): Temps d'attente en secondes pour la génération d'ID.
-        maxRand (int): Valeur maximale pour la génération aléatoire des numéros d'ID.
-        sendHeartbitEvery (int |float): Intervalle en secondes pour l'envoi des heartbeats.
+        stabilityWindow (int | float): Durée en secondes sans nouvelle annonce au bout de laquelle la composition du système est considérée connue,
+            lorsque le nombre de processus attendus n'est pas déclaré. Elle doit dépasser l'écart entre les démarrages des processus :
+            un processus qui s'annonce après l'attribution des IDs n'est pas connu des autres, ce qui est signalé dans le journal.
+        bootstrapTimeout (int | float): Durée maximale en secondes de l'attente des processus attendus, au-delà de laquelle
+            l'initialisation échoue avec BootstrapFailure.
+        sendHeartbitEvery (int |float): Intervalle en secondes pour l'envoi des heartbeats. Un heartbeat n'est envoyé à un processus
+            que si aucun autre message ne lui a été envoyé depuis la moitié de cet intervalle.
         checkHeartbitEvery (int |float): Intervalle en secondes pour la vérification des heartbeats.
+        monitoredNeighbours (int): Nombre de successeurs sur l'anneau des IDs surveillés par chaque processus.
+            Augmenter cette valeur rend la détection plus robuste au prix de plus de heartbeats.
+        phiThreshold (float): Niveau de suspicion phi au-delà duquel un processus surveillé est déclaré défaillant.
+        dispatcherWorkers (int): Nombre de threads du pool exécutant les handlers de réception de chaque Com.
+        dispatcherQueueDepth (int): Nombre maximal de messages applicatifs envoyés par l'application dans la file de chaque thread du pool,
+            0 pour ne pas les limiter. Les messages système, les envois regroupés et ceux des threads de réception, des workers et du Scheduler ne sont pas limités.
+        mutexAlgorithm (str): Algorithme d'exclusion mutuelle de la section critique globale de requestSC/releaseSC :
+            "suzukiKasami" pour un token transmis à la demande, "ring" pour un token circulant en permanence sur l'anneau.
+            Les sections critiques nommées utilisent toujours "suzukiKasami".
+        coalescingWindow (int | float): Délai en secondes pendant lequel sendTo et broadcast regroupent les messages vers une même destination
+            en une seule enveloppe, 0 pour envoyer chaque message immédiatement. L'ordre est conservé par destinataire, mais pas entre
+            les messages point à point et les diffusions ; les envois synchronisés vident d'abord les regroupements en attente.
+        causalOrder (bool): Si vrai, broadcast diffuse en ordre causal (voir causalBroadcast) plutôt que dans l'ordre d'arrivée.
+        mailboxCapacity (int): Nombre maximal de messages dans la boîte aux lettres de chaque processus, 0 pour une boîte non bornée.
+            Les envois asynchrones sont alors soumis à un contrôle de flux par crédits, voir FlowControl.
+        highWatermark (float): Fraction de mailboxCapacity à partir de laquelle un processus cesse de rendre les crédits à ses émetteurs.
+        lowWatermark (float): Fraction de mailboxCapacity sous laquelle un processus recommence à rendre les crédits.
+        overflowPolicy (str): Comportement d'un envoi asynchrone vers une boîte aux lettres pleine : "block" pour attendre qu'elle se libère,
+            "timeout" pour l'attendre au plus sendTimeout secondes puis lever MailboxFull, "reject" pour lever MailboxFull immédiatement.
+        sendTimeout (int | float): Temps d'attente maximal d'un envoi avec la politique "timeout".
+        sharedMemoryThreshold (int): Taille en octets à partir de laquelle un contenu en octets (bytes, bytearray, memoryview) envoyé à d'autres
+            processus OS passe par un segment de mémoire partagée, copié une seule fois même pour une diffusion, 0 pour ne jamais le faire.
+            Le destinataire reçoit une vue sur le segment, sans copie, et doit la libérer avec release une fois le contenu utilisé.
 
     Args:
         name (str): Le nom du processus.
             /!\\ Il est de la responsabilité des utilisateurs de donner un nom unique pour chaque processus /!\\
+        expectedProcesses (int | None): Nombre de processus attendus. Si donné, l'initialisation se termine dès qu'ils se sont tous annoncés,
+            et échoue avec BootstrapFailure s'ils ne se sont pas tous annoncés au bout de bootstrapTimeout secondes ou s'il s'en annonce davantage ;
+            sinon elle se termine après stabilityWindow secondes sans nouvelle annonce.
+        router (Router | None): La couche de routage à utiliser, par exemple un SocketRouter pour communiquer avec des Com
+            hébergés dans d'autres processus OS. Par défaut, un Router en mémoire vers les Com du même interpréteur.
             
     Attributs:
-        mailbox (Mailbox): La boîte aux lettres du processus pour stocker les messages reçus.
+        scheduler (Scheduler): L'ordonnanceur qui exécute les tâches de fond et fournit l'horloge des délais et des mesures de temps :
+            celui de la couche de routage s'il en impose un (simulation), sinon le Scheduler partagé.
+        metrics (Metrics): Les métriques du processus : messages envoyés et reçus par type, latences des ACK, de l'attente du token,
+            des barrières et de l'initialisation, et jauges des files et des threads de réception.
+        flow (FlowControl): Le contrôle de flux par crédits des envois asynchrones et de la boîte aux lettres.
+        mailbox (Mailbox): La boîte aux lettres du processus pour stocker les messages reçus, qui signale ses retraits au contrôle de flux.
         clock (LamportClock): L'horloge de Lamport pour la gestion des horloges logiques. Est ignorée sur les messages système, à l'envoi comme à la réception.
         name (str): Le nom du processus.
-        nameTable (dict[str, int]): Table de correspondance entre les noms des processus et leurs IDs.
+        router (Router): La couche de routage livrant les messages point à point directement au Com destinataire, en mémoire ou entre processus OS.
+        dispatcher (Dispatcher): Le pool de threads exécutant les handlers de réception, démarré une fois le processus initialisé.
+        membership (Membership): La composition du système : index bidirectionnel des noms et des IDs, époque, historique des retraits
+            et index des membres des groupes de diffusion.
+        nameTable (dict[str, int]): Table de correspondance entre les noms des processus et leurs IDs (celle de membership).
+        idTable (list[str]): Table de correspondance entre les IDs des processus et leurs noms (celle de membership).
+        membershipLock (Lock): Mutex protégeant la composition du système, ses groupes et l'état de la réorganisation.
+        suspected (set[str]): Noms des processus suspectés d'être défaillants et pas encore retirés.
+        announced (set[str]): Noms des processus dont le retrait a été diffusé par le processus, en tant que coordinateur.
+        announcedEpoch (int): Époque du dernier retrait diffusé par le processus.
+        pendingReorgs (dict[int, list[str]]): Retraits reçus et pas encore appliqués, par époque.
+        reorgScheduled (bool): Indique si l'application des retraits reçus est planifiée.
+        heldMessages (list[Message]): Messages émis dans une époque que le processus n'a pas encore atteinte, traités après la réorganisation.
         heartbitMutex (Lock): Mutex protégeant l'accès à la table des heartbeats.
-        heartbitTable (dict[int, float]): Table des derniers timestamps de réception des heartbeats.
-        receivedNumbers (list[tuple[int, str]]): Liste des numéros reçus pour la génération d'ID. Utilisée uniquement pour la génération des IDs à l'initialisation.
-        receivedNumbersMutex (Lock): Mutex pour protéger l'accès à receivedNumbers.
+        heartbitTable (dict[int, float]): Table des derniers instants (horloge du Scheduler) de réception d'un message de chaque processus surveillé.
+            Tout message reçu compte comme heartbeat.
+        failureDetector (PhiAccrualDetector): Détecteur de défaillance calculant le niveau de suspicion des processus surveillés.
+        monitors (list[int]): IDs des prédécesseurs sur l'anneau, qui surveillent le processus et à qui il envoie ses heartbeats.
+        expectedProcesses (int | None): Nombre de processus attendus à l'initialisation.
+        members (set[str]): Noms des processus qui se sont annoncés. Utilisé uniquement pour la génération des IDs à l'initialisation.
+        membersLock (Lock): Mutex protégeant members.
+        membersFuture (Future): Future résolu lorsque tous les processus attendus se sont annoncés.
+        lastMemberTime (float): Instant (horloge du Scheduler) de la dernière nouvelle annonce.
         id (int | None): L'ID unique du processus.
         nbProcess (int | None): Le nombre total de processus dans le système.
-        ackEvent (Event): Événement pour la gestion des ACK.
-        waitingForAck (int): Compteur du nombre d'ACK en attente.
-        waitingForAckLock (Lock): Mutex pour protéger l'accès à waitingForAck.
-        syncEvent (Event): Événement pour la gestion des messages synchronisés.
-        receiveLock (Lock): Mutex pour protéger la réception des messages synchronisés.
-        syncMessage (SyncMessage | None): Le message synchronisé reçu.
-        requestTokenEvent (Event): Événement pour la réception lors de l'attente de token.
-        releaseTokenEvent (Event): Événement pour la libération du token.
-        waitingForToken (bool): Indique si le processus attend le token.
-        joinEvent (Event): Événement pour la gestion des barrières de synchronisation.
-        joiningIds (set): Ensemble des IDs des processus ayant rejoint la barrière.
+        correlationIds (count): Générateur des identifiants des envois attendant des ACK.
+        pendingAcks (dict[int, list]): Envois en attente d'ACK, par identifiant : [nombre d'ACK restant, Future résolu au dernier, instant d'envoi,
+            nom du destinataire (None pour une diffusion), noms des destinataires d'une diffusion dont l'ACK est encore attendu].
+        pendingAcksLock (Lock): Mutex pour protéger l'accès à pendingAcks.
+        coalesced (dict[int | None, list[any]]): Messages asynchrones en attente de regroupement, par destinataire (None pour les diffusions).
+        coalescedLock (Lock): Mutex protégeant coalesced.
+        syncMailbox (Mailbox): Boîte aux lettres des messages synchronisés reçus et pas encore consommés, rangés par émetteur.
+        tokenLock (Lock): Mutex protégeant waitingForToken, hasToken, tokenHandoff et tokenSent.
+        waitingForToken (Future | None): Future résolu à l'arrivée du token de l'anneau, si le processus l'attend.
+        hasToken (bool): Indique si le processus détient le token de l'anneau pour sa section critique.
+        tokenHandoff (dict[str | None, int]): Numéro de la dernière transmission connue du processus du token de chaque section critique
+            (None pour la section globale).
+        tokenSent (dict[str | None, tuple[int, str]]): Numéro et destinataire de la dernière transmission par le processus du token de chaque section critique.
+        tokenReports (dict[int, dict]): État des tokens rapporté par chaque processus après une réorganisation, tenu par le coordinateur.
+        tokensRecovered (int): Dernière époque pour laquelle le coordinateur a recréé les tokens perdus.
+        mutex (SuzukiKasami | None): L'exclusion mutuelle à la demande de la section globale, si mutexAlgorithm vaut "suzukiKasami".
+        mutexes (dict[str, SuzukiKasami]): L'exclusion mutuelle de chaque section critique nommée connue du processus, créée à son premier usage.
+        mutexesLock (Lock): Mutex protégeant mutexes.
+        barrierGeneration (int): Numéro de la dernière barrière de synchronisation commencée par le processus.
+        joinReceived (set[tuple[int, int]]): Couples (génération, tour) des messages de barrière reçus et pas encore attendus.
+        joinWaiters (dict[tuple[int, int], Future]): Futures des tours de barrière attendus et pas encore reçus.
+        joinLock (Lock): Mutex protégeant joinReceived et joinWaiters.
+        causal (CausalBroadcast | None): La diffusion causalement ordonnée, créée une fois les IDs attribués.
+        collectives (Collectives | None): Les opérations collectives (bcast, reduce, allreduce, scatter, gather), créées une fois les IDs attribués.
         alive (Event): Événement indiquant si le processus est actif.
         initializedEvent (Event): Événement indiquant si le processus est initialisé.
-        reorgEvent (Event): Événement indiquant si une réorganisation est attendue ou en cours.
+        reorgEvent (Event): Événement levé hors réorganisation, baissé entre la réception d'un retrait et son application.
         killEvent (Event): Événement pour arrêter les tâches de fond.
         sendHeartbitTask (LoopTask): Tâche de fond pour l'envoi périodique des heartbeats.
         checkHeartbitTask (LoopTask): Tâche de fond pour la vérification périodique des heartbeats.
     """
-    timeout = 1
-    maxRand = 100
+    stabilityWindow = 0.2
+    bootstrapTimeout = 10
     sendHeartbitEvery = 1
-    checkHeartbitEvery = 5
+    checkHeartbitEvery = 1
+    monitoredNeighbours = 2
+    phiThreshold = 8
+    dispatcherWorkers = 2
+    dispatcherQueueDepth = 1024
+    mutexAlgorithm = "suzukiKasami"
+    coalescingWindow = 0
+    causalOrder = False
+    mailboxCapacity = 0
+    highWatermark = 0.8
+    lowWatermark = 0.5
+    overflowPolicy = "block"
+    sendTimeout = 1
+    sharedMemoryThreshold = 0
 
-    def __init__(self, name: str):
+    def __init__(self, name: str, expectedProcesses: int | None = None, router: Router | None = None):
         """
         Initialise une instance de Com avec le nom du processus, les structures de synchronisation,
         les événements, la boîte aux lettres, l'horloge logique et démarre les tâches de fond.
         """
-        self.mailbox = Mailbox()
+        self.setup(name, expectedProcesses, router)
+        self.router.register(self)
+        self.autoId()
+        self.initialize()
+
+    def setup(self, name: str, expectedProcesses: int | None, router: Router | None) -> None:
+        """
+        Crée les structures du Com, sans encore communiquer.
+        """
+        self.router = router if router is not None else Router()
+        self.scheduler = self.router.scheduler if self.router.scheduler is not None else Scheduler.Instance()
+        self.metrics = Metrics(self.scheduler.now)
+        self.flow = FlowControl(self, Com.mailboxCapacity, Com.highWatermark, Com.lowWatermark)
+        self.mailbox = Mailbox(self.flow.consumed)
         self.clock = LamportClock()
-        PyBus.Instance().register(self, self)
 
         self.name = name
-        self.nameTable = dict[str, int]()
+        self.dispatcher = self.createDispatcher()
+        self.membership = Membership()
+        self.nameTable = self.membership.nameTable
+        self.idTable = self.membership.idTable
+        self.membershipLock = Lock()
+        self.suspected: set[str] = set()
+        self.announced: set[str] = set()
+        self.announcedEpoch = 0
+        self.pendingReorgs: dict[int, list[str]] = {}
+        self.reorgScheduled = False
+        self.heldMessages: list[Message] = []
         self.heartbitMutex = Lock()
         self.heartbitTable = dict[int, float]()
+        self.failureDetector = PhiAccrualDetector(self.heartbitTable, Com.sendHeartbitEvery, Com.sendHeartbitEvery / 4)
+        self.monitors: list[int] = []
 
-        self.receivedNumbers: list[tuple[int, str]] = []
-        self.receivedNumbersMutex = Lock()
+        self.expectedProcesses = expectedProcesses
+        self.members: set[str] = set()
+        self.membersLock = Lock()
+        self.membersFuture = Future()
+        self.lastMemberTime = self.scheduler.now()
         self.id: None | int = None
         self.nbProcess: None | int = None
 
-        self.ackEvent: Event = Event()
-        self.waitingForAck: int = 0
-        self.waitingForAckLock: Lock = Lock()
+        self.correlationIds = count()
+        self.pendingAcks: dict[int, list] = {}
+        self.pendingAcksLock: Lock = Lock()
+
+        self.coalesced: dict[int | None, list[any]] = {}
+        self.coalescedLock: Lock = Lock()
 
-        self.syncEvent: Event = Event()
-        self.receiveLock: Lock = Lock()
-        self.syncMessage: SyncMessage | None = None
+        self.syncMailbox = Mailbox()
 
-        self.requestTokenEvent: Event = Event()
-        self.releaseTokenEvent: Event = Event()
-        self.releaseTokenEvent.set()
-        self.waitingForToken: bool = False
+        self.tokenLock: Lock = Lock()
+        self.waitingForToken: Future | None = None
+        self.hasToken: bool = False
+        self.tokenHandoff: dict[str | None, int] = {}
+        self.tokenSent: dict[str | None, tuple[int, str]] = {}
+        self.tokenReports: dict[int, dict] = {}
+        self.tokensRecovered = 0
+        self.mutex: SuzukiKasami | None = None
+        self.mutexes: dict[str, SuzukiKasami] = {}
+        self.mutexesLock: Lock = Lock()
 
-        self.joinEvent: Event = Event()
-        self.joiningIds: set = set()
+        self.barrierGeneration: int = 0
+        self.joinReceived: set[tuple[int, int]] = set()
+        self.joinWaiters: dict[tuple[int, int], Future] = {}
+        self.joinLock: Lock = Lock()
+
+        self.causal: CausalBroadcast | None = None
+        self.collectives: Collectives | None = None
 
         self.alive: Event = Event()
         self.initializedEvent: Event = Event()
         self.reorgEvent: Event = Event()
         self.reorgEvent.set()
 
-        self.autoId()
-        self.startToken()
+        self.metrics.gauge("mailboxDepth", lambda: len(self.mailbox))
+        self.metrics.gauge("syncMailboxDepth", lambda: len(self.syncMailbox))
+        self.metrics.gauge("pendingAcks", lambda: len(self.pendingAcks))
+        self.metrics.gauge("handlerThreads", lambda: self.dispatcher.liveWorkers())
+
+    def createDispatcher(self) -> Dispatcher:
+        """
+        Crée le pool de threads exécutant les handlers de réception.
+        """
+        return Dispatcher(self.name, Com.dispatcherWorkers, Com.dispatcherQueueDepth)
+
+    def initialize(self) -> None:
+        """
+        Termine l'initialisation une fois les IDs attribués : exclusion mutuelle, diffusion causale, surveillance, Dispatcher et tâches de fond.
+        """
+        self.causal = CausalBroadcast(self)
+        self.collectives = Collectives(self)
+        self.flow.start(self.nbProcess)
+        if Com.mutexAlgorithm == "suzukiKasami":
+            self.mutex = SuzukiKasami(self, None, self.id == 0)
+        else:
+            self.startToken()
+        self.watchNeighbours()
         self.initializedEvent.set()
+        self.dispatcher.start()
 
         self.killEvent = Event()
-        self.sendHeartbitTask = LoopTask(Com.sendHeartbitEvery, self.sendHeartbit, (), self.killEvent)
-        self.chackHeartbitTask = LoopTask(Com.checkHeartbitEvery, self.checkHearbits, (), self.killEvent)
+        self.sendHeartbitTask = LoopTask(Com.sendHeartbitEvery, self.sendHeartbit, (), self.killEvent, self.scheduler)
+        self.chackHeartbitTask = LoopTask(Com.checkHeartbitEvery, self.checkHearbits, (), self.killEvent, self.scheduler)
     
     def stop(self):
         """
         Arrête le processus en désactivant les événements de vie et de boucle.
+        Les tokens éventuellement détenus sont d'abord cédés, pour ne pas être perdus.
         """
+        with self.mutexesLock:
+            mutexes = list(self.mutexes.values())
+        for mutex in mutexes:
+            mutex.leave()
+        if self.mutex is not None:
+            self.mutex.leave()
+        else:
+            with self.tokenLock:
+                forward = self.hasToken
+                self.hasToken = False
+            if forward:
+                self.router.post(self.tokenMessage((self.id + 1) % self.nbProcess))
+        self.flush()
         self.alive.clear()
+        self.router.unregister(self)
         self.killEvent.set()
         self.sendHeartbitTask.join()
         self.chackHeartbitTask.join()
+        self.dispatcher.stop()
 
-    @subscribe(threadMode= Mode.PARALLEL, onEvent=AutoIdMessage)
+    @subscribe(threadMode= Mode.POSTING, onEvent=AutoIdMessage)
     def onAutoIdReceive(self, message: AutoIdMessage):
         """
-        Handler pour la réception d'un message système de génération d'ID.
-        Ajoute le numéro reçu à la liste des numéros reçus.
+        Handler pour la réception d'une annonce de processus lors de la génération d'ID.
+        Ajoute le nom reçu aux membres connus et, si l'annonceur était inconnu, lui répond directement
+        pour qu'il nous connaisse même s'il s'est enregistré après notre propre annonce.
+        Exécuté directement par l'émetteur, le Dispatcher n'étant démarré qu'après l'initialisation.
+        """
+        if not self.addMember(message.content):
+            return
+        if self.id is not None:
+            bootstrapLog.error("<%s:%s> %s announced itself after the IDs were assigned, it does not share our nameTable", self.name, self.id, message.content)
+        if not message.reply and message.content != self.name:
+            self.router.postToName(AutoIdMessage(self.name, reply=True), message.content)
+
+    def addMember(self, name: str) -> bool:
+        """
+        Ajoute un processus aux membres connus lors de la génération d'ID, et signale quand tous les processus attendus sont connus.
+        Returns:
+            bool: True si le processus était inconnu.
         """
-        with self.receivedNumbersMutex:
-            self.receivedNumbers.append(message.content)
+        with self.membersLock:
+            if name in self.members:
+                return False
+            self.members.add(name)
+            self.lastMemberTime = self.scheduler.now()
+            complete = self.expectedProcesses is not None and len(self.members) >= self.expectedProcesses
+        if complete and not self.membersFuture.done():
+            self.membersFuture.set_result(None)
+        return True
 
     def autoId(self) -> None:
         """
         Génère un identifiant unique pour le processus et construit la table des noms.
+        Le processus s'annonce à tous, puis attend que tous les processus attendus se soient annoncés,
+        ou à défaut qu'aucune nouvelle annonce n'arrive pendant Com.stabilityWindow secondes.
+        Les IDs sont attribués dans l'ordre des noms, ce qui est déterministe et sans collision puisque les noms sont uniques.
+        Raises:
+            BootstrapFailure: Si les processus attendus ne se sont pas tous annoncés au bout de Com.bootstrapTimeout secondes,
+                ou s'il s'en est annoncé davantage.
+        """
+        self.announce()
+        if self.expectedProcesses is not None:
+            try:
+                self.membersFuture.result(Com.bootstrapTimeout)
+            except TimeoutError:
+                self.bootstrapTimedOut()
+        else:
+            while (remaining := self.stabilityRemaining()) > 0:
+                sleep(remaining)
+        self.buildNameTable()
+
+    def announce(self) -> None:
+        """
+        Annonce le processus à tous les autres, première étape de la génération d'ID.
         """
         self.alive.set()
+        self.router.post(AutoIdMessage(self.name))
 
-        myNumber = None
-        sleep(Com.timeout)
-        while True:
-            if myNumber == None:
-                myNumber = randint(0, Com.maxRand)
-                PyBus.Instance().post(AutoIdMessage([myNumber, self.name]))
-            sleep(Com.timeout)
-            
-            with self.receivedNumbersMutex:
-                numbers = [item[0] for item in self.receivedNumbers]
-            duplicate = [num for num, count in collections.Counter(numbers).items() if count > 1]
-            if len(duplicate) > 0:
-                with self.receivedNumbersMutex:
-                    self.receivedNumbers = [item for item in self.receivedNumbers if not item[0] in duplicate]
-                if myNumber in duplicate:
-                    myNumber = None
-            else:
-                break
+    def stabilityRemaining(self) -> float:
+        """
+        Retourne le temps restant avant que la composition du système soit considérée stable, faute de nouvelle annonce.
+        """
+        with self.membersLock:
+            return self.lastMemberTime + Com.stabilityWindow - self.scheduler.now()
 
-        with self.receivedNumbersMutex:
-            self.receivedNumbers.sort()
-            for i, item in enumerate(self.receivedNumbers):
-                self.nameTable[item[1]] = i
-                if item[0] == myNumber and item[1] == self.name:
-                    self.id = i
+    def bootstrapTimedOut(self) -> None:
+        """
+        Abandonne l'initialisation, les processus attendus ne s'étant pas tous annoncés à temps.
+        """
+        with self.membersLock:
+            members = sorted(self.members)
+        self.bootstrapFailed(f"only {len(members)} of {self.expectedProcesses} expected processes announced themselves after {Com.bootstrapTimeout}s: {members}")
+
+    def bootstrapFailed(self, reason: str) -> None:
+        """
+        Abandonne l'initialisation : retire le Com de l'annuaire, pour que les processus qui démarrent ensuite ne le comptent pas, puis lève BootstrapFailure.
+        """
+        bootstrapLog.error("<%s> %s", self.name, reason)
+        self.alive.clear()
+        self.router.unregister(self)
+        raise BootstrapFailure(reason)
+
+    def buildNameTable(self) -> None:
+        """
+        Attribue les IDs dans l'ordre des noms des processus annoncés et construit la table des noms et la table de routage.
+        Raises:
+            BootstrapFailure: Si plus de processus que prévu se sont annoncés.
+        """
+        with self.membersLock:
+            members = sorted(self.members)
+        if self.expectedProcesses is not None and len(members) != self.expectedProcesses:
+            self.bootstrapFailed(f"{len(members)} processes announced themselves, {self.expectedProcesses} expected: {members}")
+        with self.membersLock:
+            self.membership.build(self.members)
+            self.id = self.nameTable[self.name]
+            self.nbProcess = len(self.members)
 
-            print(f"<{self.name}:{self.id}> nameTable: {self.nameTable}", flush=True)
-            self.nbProcess = len(self.receivedNumbers)
+        bootstrapLog.info("<%s:%s> nameTable: %s", self.name, self.id, self.nameTable)
+        self.router.build(self.nameTable)
+        self.metrics.record("bootstrap", self.scheduler.now() - self.metrics.createdAt)
     
     def startToken(self) -> None:
         """
         Démarre la circulation du token si le processus est le dernier.
+        Le token reste en file chez son destinataire tant que celui-ci n'a pas fini son initialisation.
         """
         if self.id == self.nbProcess - 1:
-            sleep(Com.timeout)
-            PyBus.Instance().post(TokenMessage(self.id, 0))
+            self.router.post(self.tokenMessage(0))
+
+    def tokenMessage(self, recipient: int, state: any = None, resource: str | None = None) -> TokenMessage:
+        """
+        Crée le message transmettant le token d'une section critique à un processus, et retient cette transmission
+        pour pouvoir réparer le token si l'un des deux processus tombe en panne.
+        """
+        with self.tokenLock:
+            handoff = self.tokenHandoff[resource] = self.tokenHandoff.get(resource, 0) + 1
+            self.tokenSent[resource] = (handoff, self.idTable[recipient])
+            return TokenMessage(self.id, recipient, state, handoff, resource)
+
+    def tokenHome(self, resource: str | None) -> int | None:
+        """
+        Retourne l'ID courant du processus qui détient le token d'une section critique à sa création : pour une section nommée,
+        celui dont l'ID initial est le hachage de son nom modulo le nombre initial de processus, pour la section globale l'ID initial 0.
+        Le choix ne dépend pas des retraits : tous les processus en conviennent, quelle que soit l'époque où ils créent la section.
+        Returns:
+            int | None: L'ID courant du processus, None s'il a été retiré du système.
+        """
+        if resource is None:
+            return self.membership.translate(0, 0)
+        founders = len(self.idTable) + sum(len(removed) for removed in self.membership.removals)
+        return self.membership.translate(crc32(resource.encode()) % founders, 0)
+
+    def mutexFor(self, resource: str | None) -> SuzukiKasami | None:
+        """
+        Retourne l'exclusion mutuelle d'une section critique : celle de la section globale (None avec l'algorithme "ring"),
+        ou celle d'une section nommée, créée au premier usage, à la première requête ou au premier message qui la concerne.
+        Le token d'une section nommée est détenu à sa création par le processus désigné par tokenHome ; si celui-ci a été retiré,
+        par le coordinateur une fois qu'il a recréé les tokens perdus connus, le token n'ayant alors jamais existé.
+        """
+        if resource is None:
+            return self.mutex
+        with self.mutexesLock:
+            mutex = self.mutexes.get(resource)
+            if mutex is None:
+                home = self.tokenHome(resource)
+                if home is not None:
+                    holds = home == self.id
+                else:
+                    holds = self.id == 0 and self.tokensRecovered == self.membership.epoch
+                mutex = self.mutexes[resource] = SuzukiKasami(self, resource, holds)
+            return mutex
+
+    def waitReorganized(self) -> None:
+        """
+        Attend la fin d'une éventuelle réorganisation avant de commencer une opération.
+        """
+        self.reorgEvent.wait()
+
+    def acquireCredits(self, dest: str | None, count: int) -> None:
+        """
+        Prend les crédits de count messages asynchrones vers un destinataire (vers tous pour None), selon Com.overflowPolicy.
+        Lève MailboxFull si la boîte aux lettres du destinataire reste pleine, ProcessFailure s'il est retiré du système pendant l'attente.
+        """
+        self.flow.acquire(dest, count, Com.overflowPolicy, Com.sendTimeout)
 
     def getNbProcess(self) -> int:
         """
@@ -179,241 +483,1020 @@ class Com:
     def sendTo(self, message: any, dest: str):
         """
         Envoie un message asynchrone à un destinataire spécifique.
+        Si la boîte aux lettres du destinataire est bornée et pleine, se comporte selon Com.overflowPolicy.
         """
-        self.reorgEvent.wait()
+        self.waitReorganized()
         if dest not in self.nameTable:
-            print(f"<{self.name}:{self.id}> ERROR: destination {dest} unknown", flush=True)
+            messagesLog.error("<%s:%s> destination %s unknown", self.name, self.id, dest)
+            return
+        self.acquireCredits(dest, 1)
+        if Com.coalescingWindow > 0:
+            self.coalesce(message, self.nameTable[dest])
             return
 
         self.clock.inc_clock()
-        print(f'<{self.name}:{self.id}> sending "{message}" to <{dest}:{self.nameTable[dest]}> with clock {self.clock.clock}', flush=True)
-        PyBus.Instance().post(Message(self.id, self.nameTable[dest], message, self.clock.clock))
+        messagesLog.debug('<%s:%s> sending "%s" to <%s:%s> with clock %s', self.name, self.id, message, dest, self.nameTable[dest], self.clock.clock)
+        self.router.post(Message(self.id, self.nameTable[dest], message, self.clock.clock))
+
+    def sendBatch(self, messages: list[any], dest: str):
+        """
+        Envoie plusieurs messages asynchrones à un destinataire dans une seule enveloppe.
+        Ils reçoivent des horloges consécutives et sont rangés dans la boîte aux lettres du destinataire dans l'ordre de la liste.
+        Si la boîte aux lettres du destinataire est bornée, les messages sont envoyés par enveloppes d'au plus une fenêtre de crédits.
+        """
+        self.waitReorganized()
+        if dest not in self.nameTable:
+            messagesLog.error("<%s:%s> destination %s unknown", self.name, self.id, dest)
+            return
+        self.flushTo(self.nameTable[dest])
+        for chunk in self.flow.chunks(list(messages)):
+            self.acquireCredits(dest, len(chunk))
+            self.postBatch(chunk, self.nameTable[dest])
+
+    def broadcastBatch(self, messages: list[any]):
+        """
+        Diffuse plusieurs messages asynchrones à tous les processus dans une seule enveloppe, voir sendBatch.
+        """
+        self.waitReorganized()
+        self.flushTo(None)
+        for chunk in self.flow.chunks(list(messages)):
+            self.acquireCredits(None, len(chunk))
+            self.postBatch(chunk, None)
+
+    def postBatch(self, contents: list[any], recipient: int | None) -> None:
+        """
+        Poste une enveloppe contenant les messages donnés, en leur attribuant des horloges consécutives.
+        """
+        if not contents:
+            return
+        last = self.clock.inc_clock(len(contents))
+        first = last - len(contents) + 1
+        messagesLog.debug('<%s:%s> sending %s messages to %s with clocks %s..%s', self.name, self.id, len(contents), "everyone" if recipient is None else recipient, first, last)
+        self.router.post(BatchMessage(self.id, recipient, contents, first))
+
+    def coalesce(self, content: any, recipient: int | None) -> None:
+        """
+        Met un message asynchrone en attente de regroupement ; le premier message d'un regroupement
+        programme son envoi dans Com.coalescingWindow secondes.
+        """
+        with self.coalescedLock:
+            pending = self.coalesced.get(recipient)
+            if pending is None:
+                pending = self.coalesced[recipient] = []
+                self.scheduler.schedule(Com.coalescingWindow, self.flushTo, (recipient,))
+            pending.append(content)
+
+    def flushTo(self, recipient: int | None) -> None:
+        """
+        Envoie immédiatement les messages en attente de regroupement pour un destinataire (None pour les diffusions).
+        """
+        # posté sous le verrou, pour que deux regroupements vers le même destinataire restent dans l'ordre,
+        # sans attendre de place dans un Dispatcher : le Scheduler et les workers (applyReorgs) prennent aussi ce verrou
+        with self.coalescedLock, nonBlockingSection():
+            pending = self.coalesced.pop(recipient, None)
+            if pending is not None:
+                self.postBatch(pending, recipient)
+
+    def flush(self) -> None:
+        """
+        Envoie immédiatement tous les messages en attente de regroupement.
+        """
+        with self.coalescedLock:
+            recipients = list(self.coalesced)
+        for recipient in recipients:
+            self.flushTo(recipient)
 
     def sendToSync(self, message: any, dest: str):
         """
         Envoie un message synchronisé à un destinataire et attend l'ACK.
+        Lève ProcessFailure si le destinataire est retiré du système avant d'avoir acquitté.
+        """
+        self.waitReorganized()
+        future = self.sendToSyncFuture(message, dest)
+        if future is not None:
+            future.result()
+
+    def sendToSyncFuture(self, message: any, dest: str) -> Future | None:
+        """
+        Envoie un message synchronisé à un destinataire sans attendre, et retourne le Future résolu à la réception de l'ACK,
+        ou None si le destinataire est inconnu.
+        Plusieurs envois peuvent être en cours à la fois, chacun étant associé à son ACK par son identifiant ;
+        les Futures s'attendent ensemble avec concurrent.futures.wait.
         """
-        self.reorgEvent.wait()
         if dest not in self.nameTable:
-            print(f"<{self.name}:{self.id}> ERROR: destination {dest} unknown", flush=True)
-            return
+            messagesLog.error("<%s:%s> destination %s unknown", self.name, self.id, dest)
+            return None
 
-        with self.waitingForAckLock:
-            self.waitingForAck = 1
-        PyBus.Instance().post(SyncMessage(self.id, self.nameTable[dest], message, self.clock.clock))
-        self.ackEvent.wait()
-        self.ackEvent.clear()
+        self.flushTo(self.nameTable[dest])
+        correlationId, future = self.expectAcks(1, dest)
+        self.router.post(SyncMessage(self.id, self.nameTable[dest], message, self.clock.clock, correlationId))
+        return future
+
+    def expectAcks(self, count: int, dest: str | None, awaited: list[str] | None = None) -> tuple[int, Future]:
+        """
+        Enregistre un envoi attendant count ACK, adressé à dest, ou diffusé (dest None) aux processus de noms awaited.
+        Returns:
+            tuple[int, Future]: L'identifiant à porter par le message, et le Future résolu à la réception du dernier ACK.
+        """
+        correlationId = next(self.correlationIds)
+        future = Future()
+        with self.pendingAcksLock:
+            self.pendingAcks[correlationId] = [count, future, self.scheduler.now(), dest, set(awaited) if dest is None else None]
+        return correlationId, future
 
     def recevFromSync(self, src: str) -> Message:
         """
         Attend la réception d'un message synchronisé depuis une source spécifique et renvoie le message reçu.
+        Lève ProcessFailure si la source est retirée du système pendant l'attente.
         """
-        self.reorgEvent.wait()
+        self.waitReorganized()
         if src not in self.nameTable:
-            print(f"<{self.name}:{self.id}> ERROR: source {src} unknown", flush=True)
+            syncLog.error("<%s:%s> source %s unknown", self.name, self.id, src)
             return None
 
-        self.syncEvent.wait()
-        self.syncEvent.clear()
-        PyBus.Instance().post(AckMessage(self.id, self.nameTable[src]))
-        msg = self.syncMessage
-        self.clock.sync(msg.clock)
-        self.syncMessage = None
-        self.receiveLock.release()
+        msg = self.syncMailbox.getFuture(sender=self.nameTable[src]).result()
+        self.acknowledgeSync(msg)
+        return msg
+
+    def recevFromAnySync(self) -> Message:
+        """
+        Attend la réception d'un message synchronisé depuis n'importe quelle source et renvoie le premier arrivé.
+        """
+        self.waitReorganized()
+        msg = self.syncMailbox.get()
+        self.acknowledgeSync(msg)
         return msg
+
+    def acknowledgeSync(self, msg: SyncMessage) -> None:
+        """
+        Acquitte un message synchronisé consommé et synchronise l'horloge sur la sienne.
+        """
+        self.router.post(AckMessage(self.id, msg.sender, msg.correlationId))
+        self.clock.sync(msg.clock)
     
-    @subscribe(threadMode= Mode.PARALLEL, onEvent=AckMessage)
+    def release(self, message: Message) -> None:
+        """
+        Signale que le contenu d'un message reçu n'est plus utilisé. Un contenu reçu d'un autre processus OS par mémoire partagée
+        (voir Com.sharedMemoryThreshold) est une vue sur un segment, qui ne doit plus être utilisée ensuite ;
+        le segment est supprimé une fois libéré par tous ses destinataires. Sans effet sur les autres contenus.
+        """
+        self.router.release(message.content)
+
+    @subscribe(threadMode= Mode.POSTING, onEvent=AckMessage)
+    @dispatched
     def onAckReceive(self, message: AckMessage):
         """
         Handler pour la réception d'un message d'ACK.
         """
-        self.reorgEvent.wait()
-        if not self.alive.is_set():
-            return
-        self.initializedEvent.wait()
-        if message.recipient != self.id:
+        message = self.admit(message)
+        if message is None or message.recipient != self.id:
             return
         
-        with self.waitingForAckLock:
-            self.waitingForAck -= 1
-            if self.waitingForAck == 0:
-                self.ackEvent.set()
+        with self.pendingAcksLock:
+            pending = self.pendingAcks.get(message.correlationId)
+            if pending is None:
+                return
+            if pending[4] is not None:
+                pending[4].discard(self.idTable[message.sender])
+            pending[0] -= 1
+            future = None
+            if pending[0] == 0:
+                future = pending[1]
+                del self.pendingAcks[message.correlationId]
+        if future is not None:
+            self.metrics.record("ackRtt", self.scheduler.now() - pending[2])
+            future.set_result(None)
     
-    @subscribe(threadMode= Mode.PARALLEL, onEvent=SyncMessage)
+    @subscribe(threadMode= Mode.POSTING, onEvent=SyncMessage)
+    @dispatched
     def onSyncReceive(self, message: SyncMessage):
         """
         Handler pour la réception d'un message synchronisé.
         """
-        self.reorgEvent.wait()
-        if not self.alive.is_set():
-            return
-        self.initializedEvent.wait()
-        if message.recipient != self.id:
+        message = self.admit(message)
+        if message is None or message.recipient != self.id:
             return
         
-        self.syncEvent.set()
-        self.receiveLock.acquire()
-        self.syncMessage = message
+        self.syncMailbox.addMessage(message)
 
     def synchronize(self):
         """
-        Synchronise le processus avec tous les autres.
+        Synchronise le processus avec tous les autres, par une barrière de dissémination :
+        au tour k, le processus i prévient le processus i + 2^k et attend le message du processus i - 2^k.
+        La barrière coûte N.log2(N) messages en log2(N) tours, et chaque barrière porte un numéro de génération
+        pour que les messages d'une barrière suivante ne se mélangent pas à la barrière en cours.
+        Lève ProcessFailure si un processus est retiré du système pendant la barrière ; les numéros de génération repartent alors de zéro,
+        et la barrière peut être recommencée par tous les processus restants.
         """
-        self.reorgEvent.wait()
-        print(f"<{self.name}:{self.id}> is synchronizing", flush=True)
-        PyBus.Instance().post(JoinMessage(self.id))
-        self.joinEvent.wait()
-        self.joinEvent.clear()
-        self.joiningIds.clear()
-        print(f"<{self.name}:{self.id}> synchronized with {self.nbProcess - 1} others", flush=True)
-
-    @subscribe(threadMode= Mode.PARALLEL, onEvent=JoinMessage)
+        self.waitReorganized()
+        barrierLog.info("<%s:%s> is synchronizing", self.name, self.id)
+        for future in self.barrier():
+            future.result()
+        barrierLog.info("<%s:%s> synchronized with %s others", self.name, self.id, self.nbProcess - 1)
+
+    def barrier(self):
+        """
+        Générateur des tours de la barrière de dissémination : pour chaque tour, envoie le message du tour
+        puis produit le Future à attendre avant de passer au tour suivant.
+        """
+        start = self.scheduler.now()
+        epoch = self.membership.epoch
+        self.barrierGeneration += 1
+        generation = self.barrierGeneration
+        distance = 1
+        round = 0
+        while distance < self.nbProcess:
+            if self.membership.epoch != epoch:
+                raise ProcessFailure("membership changed during barrier")
+            self.router.post(JoinMessage(self.id, (self.id + distance) % self.nbProcess, generation, round))
+            yield self.joinFuture(generation, round, epoch)
+            distance *= 2
+            round += 1
+        self.metrics.record("barrierWait", self.scheduler.now() - start)
+
+    def joinFuture(self, generation: int, round: int, epoch: int) -> Future:
+        """
+        Retourne le Future résolu à la réception du message d'un tour de barrière, immédiatement s'il a déjà été reçu,
+        ou en échec si la composition du système a changé depuis l'époque epoch du début de la barrière.
+        """
+        future = Future()
+        with self.joinLock:
+            if self.membership.epoch != epoch:
+                future.set_exception(ProcessFailure("membership changed during barrier"))
+            elif (generation, round) in self.joinReceived:
+                self.joinReceived.remove((generation, round))
+                future.set_result(None)
+            else:
+                self.joinWaiters[(generation, round)] = future
+        return future
+
+    @subscribe(threadMode= Mode.POSTING, onEvent=JoinMessage)
+    @dispatched
     def onJoinRecieve(self, message: JoinMessage):
         """
         Handler pour la réception d'un message de synchronisation.
         """
-        self.reorgEvent.wait()
-        if not self.alive.is_set():
+        message = self.admit(message)
+        if message is None or message.recipient != self.id or message.epoch != self.membership.epoch:
             return
-        self.initializedEvent.wait()
 
-        self.joiningIds.add(message.sender)
-        print(f"<{self.name}:{self.id}> received join from {message.sender}, currently at {len(self.joiningIds)}/{self.nbProcess}", flush=True)
-        if len(self.joiningIds) == self.nbProcess:
-            self.joinEvent.set()
+        generation, round = message.content
+        barrierLog.debug("<%s:%s> received join from %s for barrier %s, round %s", self.name, self.id, message.sender, generation, round)
+        with self.joinLock:
+            future = self.joinWaiters.pop((generation, round), None)
+            if future is None:
+                self.joinReceived.add((generation, round))
+        if future is not None:
+            future.set_result(None)
 
-    def requestSC(self):
+    def bcast(self, value: any = None, root: str | None = None) -> any:
         """
-        Demande l'accès à la section critique en attendant le token.
+        Diffuse la valeur du processus racine à tous les processus, en log2(N) tours, voir Collectives.
+        Opération collective : tous les processus doivent l'appeler, seule la valeur de la racine est utilisée.
+        Args:
+            value (any): La valeur à diffuser, à la racine.
+            root (str | None): Le nom du processus racine, None pour le processus d'ID 0.
+        Returns:
+            any: La valeur de la racine.
+        Lève ProcessFailure si un processus est retiré du système pendant l'opération.
         """
-        self.reorgEvent.wait()
-        print(f"<{self.name}:{self.id}> is requesting critical section", flush=True)
-        self.waitingForToken = True
-        self.releaseTokenEvent.clear()
-        self.requestTokenEvent.wait()
-        self.requestTokenEvent.clear()
-        print(f"<{self.name}:{self.id}> got the token", flush=True)
+        self.waitReorganized()
+        return self.collective(self.collectives.bcast(value, self.rootId(root)))
 
-    def releaseSC(self):
+    def reduce(self, value: any, op="sum", root: str | None = None) -> any:
         """
-        Libère la section critique et le token.
+        Combine les valeurs de tous les processus à la racine, en log2(N) tours, voir Collectives.
+        Args:
+            value (any): La valeur du processus.
+            op (str | callable): "sum", "prod", "max", "min", ou une fonction associative de deux valeurs.
+            root (str | None): Le nom du processus racine, None pour le processus d'ID 0.
+        Returns:
+            any: Le résultat à la racine, None ailleurs.
         """
-        self.reorgEvent.wait()
-        print(f"<{self.name}:{self.id}> is releasing critical section", flush=True)
-        self.releaseTokenEvent.set()
+        self.waitReorganized()
+        return self.collective(self.collectives.reduce(value, op, self.rootId(root)))
+
+    def allreduce(self, value: any, op="sum") -> any:
+        """
+        Combine les valeurs de tous les processus et retourne le résultat à chacun, en log2(N) tours, voir reduce et Collectives.
+        """
+        self.waitReorganized()
+        return self.collective(self.collectives.allreduce(value, op))
+
+    def scatter(self, values: list[any] | None = None, root: str | None = None) -> any:
+        """
+        Distribue à chaque processus une valeur de la liste de la racine, en log2(N) tours, voir Collectives.
+        Args:
+            values (list[any] | None): À la racine, une valeur par processus, dans l'ordre des IDs.
+            root (str | None): Le nom du processus racine, None pour le processus d'ID 0.
+        Returns:
+            any: La valeur d'indice l'ID du processus.
+        """
+        self.waitReorganized()
+        return self.collective(self.collectives.scatter(values, self.rootId(root)))
+
+    def gather(self, value: any, root: str | None = None) -> list[any] | None:
+        """
+        Collecte à la racine les valeurs de tous les processus, en log2(N) tours, voir Collectives.
+        Returns:
+            list[any] | None: À la racine, les valeurs dans l'ordre des IDs ; None ailleurs.
+        """
+        self.waitReorganized()
+        return self.collective(self.collectives.gather(value, self.rootId(root)))
+
+    def rootId(self, root: str | None) -> int:
+        """
+        Retourne l'ID du processus racine d'une opération collective. Lève ValueError pour un processus inconnu.
+        """
+        if root is None:
+            return 0
+        if root not in self.nameTable:
+            raise ValueError(f"root {root} unknown")
+        return self.nameTable[root]
+
+    def collective(self, operation) -> any:
+        """
+        Exécute une opération collective, en attendant chacun des Futures qu'elle produit et en lui renvoyant leur valeur.
+        """
+        start = self.scheduler.now()
+        try:
+            future = next(operation)
+            while True:
+                future = operation.send(future.result())
+        except StopIteration as done:
+            self.metrics.record("collectiveWait", self.scheduler.now() - start)
+            return done.value
+
+    @subscribe(threadMode= Mode.POSTING, onEvent=CollectiveMessage)
+    @dispatched
+    def onCollectiveReceive(self, message: CollectiveMessage):
+        """
+        Handler pour la réception d'une valeur d'une opération collective.
+        """
+        message = self.admit(message)
+        if message is None or message.recipient != self.id or message.epoch != self.membership.epoch:
+            return
+        self.collectives.onMessage(message)
+
+    def requestSC(self, resource: str | None = None, shared: bool = False):
+        """
+        Demande l'accès à une section critique en attendant le token.
+        Args:
+            resource (str | None): Nom de la section critique, None pour la section globale.
+            shared (bool): True pour un accès partagé avec les autres accès partagés (lecteurs), False pour un accès exclusif (rédacteur).
+        """
+        self.waitReorganized()
+        mutexLog.info("<%s:%s> is requesting critical section%s", self.name, self.id, "" if resource is None else " " + resource)
+        self.requestSCFuture(resource, shared).result()
+        mutexLog.info("<%s:%s> got the token", self.name, self.id)
+
+    def requestSCFuture(self, resource: str | None = None, shared: bool = False) -> Future:
+        """
+        Demande l'accès à une section critique sans attendre, et retourne le Future résolu à l'obtention du token, voir requestSC.
+        Raises:
+            ValueError: Si un accès partagé à la section globale est demandé avec l'algorithme "ring".
+        """
+        start = self.scheduler.now()
+        mutex = self.mutexFor(resource)
+        if mutex is not None:
+            future = mutex.request(shared)
+        elif shared:
+            raise ValueError("shared access to the global critical section needs the suzukiKasami algorithm")
+        else:
+            future = Future()
+            with self.tokenLock:
+                self.waitingForToken = future
+        future.add_done_callback(lambda _: self.metrics.record("tokenWait", self.scheduler.now() - start))
+        return future
+
+    def releaseSC(self, resource: str | None = None):
+        """
+        Libère une section critique et son token.
+        Args:
+            resource (str | None): Nom de la section critique, None pour la section globale.
+        """
+        self.waitReorganized()
+        mutexLog.info("<%s:%s> is releasing critical section%s", self.name, self.id, "" if resource is None else " " + resource)
+        mutex = self.mutexFor(resource)
+        if mutex is not None:
+            mutex.release()
+            return
+        with self.tokenLock:
+            if not self.hasToken:
+                return
+            self.hasToken = False
+        self.router.post(self.tokenMessage((self.id + 1) % self.nbProcess))
 
-    @subscribe(threadMode= Mode.PARALLEL, onEvent=TokenMessage)
+    @subscribe(threadMode= Mode.POSTING, onEvent=TokenMessage)
+    @dispatched
     def onTokenReceive(self, message: TokenMessage):
         """
         Handler pour la réception d'un message TokenMessage.
         Gère la circulation du token et l'accès à la section critique.
+        Le token est conservé jusqu'à l'appel de releaseSC si le processus l'attend, transmis au suivant sinon.
         """
-        self.reorgEvent.wait()
-        if not self.alive.is_set():
+        message = self.admit(message)
+        if message is None or message.recipient != self.id:
             return
-        self.initializedEvent.wait()
-        if message.recipient != self.id:
+        handoff, state, resource = message.content
+        with self.tokenLock:
+            self.tokenHandoff[resource] = max(self.tokenHandoff.get(resource, 0), handoff)
+        mutex = self.mutexFor(resource)
+        if mutex is not None:
+            mutex.onToken(state)
             return
-        
-        if self.waitingForToken:
-            self.waitingForToken = False
-            self.requestTokenEvent.set()
-        self.releaseTokenEvent.wait()
-        PyBus.Instance().post(TokenMessage(self.id, (self.id + 1) % self.nbProcess))
+        self.takeRingToken()
+
+    def takeRingToken(self) -> None:
+        """
+        Prend le token de l'anneau : le conserve jusqu'à l'appel de releaseSC si le processus l'attend, le transmet au suivant sinon.
+        """
+        with self.tokenLock:
+            future = self.waitingForToken
+            self.waitingForToken = None
+            self.hasToken = future is not None
+        if future is not None:
+            future.set_result(None)
+            return
+        self.router.post(self.tokenMessage((self.id + 1) % self.nbProcess))
+
+    @subscribe(threadMode= Mode.POSTING, onEvent=TokenRequestMessage)
+    @dispatched
+    def onTokenRequestReceive(self, message: TokenRequestMessage):
+        """
+        Handler pour la réception d'une requête de token de l'exclusion mutuelle à la demande.
+        """
+        message = self.admit(message)
+        if message is None or message.sender == self.id:
+            return
+        number, resource, shared = message.content
+        mutex = self.mutexFor(resource)
+        if mutex is not None:
+            mutex.onRequest(message.sender, number, shared)
+
+    @subscribe(threadMode= Mode.POSTING, onEvent=SharedGrantMessage)
+    @dispatched
+    def onSharedGrantReceive(self, message: SharedGrantMessage):
+        """
+        Handler pour la réception d'un accès partagé accordé par le détenteur du token d'une section critique.
+        """
+        message = self.admit(message)
+        if message is None or message.recipient != self.id:
+            return
+        resource, number = message.content
+        mutex = self.mutexFor(resource)
+        if mutex is not None:
+            mutex.onSharedGrant(number)
+
+    @subscribe(threadMode= Mode.POSTING, onEvent=SharedReleaseMessage)
+    @dispatched
+    def onSharedReleaseReceive(self, message: SharedReleaseMessage):
+        """
+        Handler pour la réception de la fin d'un accès partagé à une section critique.
+        """
+        message = self.admit(message)
+        if message is None or message.sender == self.id:
+            return
+        resource, number = message.content
+        mutex = self.mutexFor(resource)
+        if mutex is not None:
+            mutex.onSharedRelease(message.sender, number)
+
+    def watchNeighbours(self) -> None:
+        """
+        Met en place la surveillance en anneau : le processus surveille ses Com.monitoredNeighbours successeurs
+        et envoie ses heartbeats à autant de prédécesseurs, soit O(N) heartbeats par période pour tout le système.
+        """
+        now = self.scheduler.now()
+        with self.heartbitMutex:
+            for k in range(1, min(Com.monitoredNeighbours, self.nbProcess - 1) + 1):
+                self.failureDetector.watch((self.id + k) % self.nbProcess, now)
+                self.monitors.append((self.id - k) % self.nbProcess)
+
+    def noteAlive(self, id: int) -> None:
+        """
+        Enregistre un signe de vie d'un processus, tout message reçu valant heartbeat.
+        Un processus non surveillé est ignoré sans prendre le mutex, ce qui est le cas de la plupart des émetteurs.
+        """
+        if id not in self.heartbitTable:
+            return
+        with self.heartbitMutex:
+            self.failureDetector.heartbeat(id, self.scheduler.now())
+
+    def suspicion(self, id: int) -> float:
+        """
+        Retourne le niveau de suspicion phi d'un processus surveillé, 0 pour un processus non surveillé.
+        """
+        with self.heartbitMutex:
+            return self.failureDetector.phi(id, self.scheduler.now())
 
     def sendHeartbit(self):
         """
-        Envoie un message Heartbit pour signaler que le processus est vivant.
+        Envoie un message Heartbit aux processus qui surveillent celui-ci, sauf à ceux à qui un autre message
+        a été envoyé récemment, ce message ayant déjà servi de heartbeat.
         """
-        PyBus.Instance().post(HeartbitMessage(self.id))
+        now = self.scheduler.now()
+        for id in self.monitors:
+            if now - max(self.router.lastSent.get(id, 0.0), self.router.lastBroadcast) >= Com.sendHeartbitEvery / 2:
+                self.router.post(HeartbitMessage(self.id, id))
     
-    @subscribe(threadMode= Mode.PARALLEL, onEvent= HeartbitMessage)
+    @subscribe(threadMode= Mode.POSTING, onEvent= HeartbitMessage)
+    @dispatched
     def receiveHeartbit(self, message: HeartbitMessage):
         """
         Handler pour la réception d'un message de heartbeat.
         """
-        if not self.alive.is_set():
-            return
-        self.initializedEvent.wait()
-
-        t = time.time()
-        with self.heartbitMutex:
-            self.heartbitTable[message.sender] = time.time()
+        self.admit(message)
 
     def broadcast(self, message: any):
         """
         Diffuse un message asynchrone à tous les processus.
         """
-        self.reorgEvent.wait()
+        self.waitReorganized()
+        if Com.causalOrder:
+            self.causalBroadcast(message)
+            return
+        self.acquireCredits(None, 1)
+        if Com.coalescingWindow > 0:
+            self.coalesce(message, None)
+            return
         self.clock.inc_clock()
-        print(f'<{self.name}:{self.id}> broadcasting "{message}" with clock {self.clock.clock}', flush=True)
-        PyBus.Instance().post(Message(self.id, None, message, self.clock.clock))
+        messagesLog.debug('<%s:%s> broadcasting "%s" with clock %s', self.name, self.id, message, self.clock.clock)
+        self.router.post(Message(self.id, None, message, self.clock.clock))
+
+    def causalBroadcast(self, message: any):
+        """
+        Diffuse un message asynchrone à tous les processus en ordre causal : chaque processus ne le range dans sa boîte aux lettres
+        qu'après tous les messages diffusés en ordre causal que l'émetteur avait reçus (ou diffusés) avant de l'envoyer.
+        """
+        self.waitReorganized()
+        self.acquireCredits(None, 1)
+        clock = self.clock.inc_clock()
+        messagesLog.debug('<%s:%s> broadcasting "%s" in causal order with clock %s', self.name, self.id, message, clock)
+        self.causal.broadcast(message, clock)
     
     def ackNeededBroadcast(self, message: any):
         """
         Diffuse un message à tous les processus en attendant un ACK de chacun.
         """
-        self.reorgEvent.wait()
+        self.waitReorganized()
+        self.ackNeededBroadcastFuture(message).result()
+
+    def ackNeededBroadcastFuture(self, message: any) -> Future:
+        """
+        Diffuse un message à tous les processus sans attendre, et retourne le Future résolu à la réception de l'ACK de chacun.
+        """
+        self.acquireCredits(None, 1)
+        self.flush()
+        self.clock.inc_clock()
+        messagesLog.debug('<%s:%s> broadcasting "%s" asking for ACK with clock %s', self.name, self.id, message, self.clock.clock)
+        correlationId, future = self.expectAcks(self.nbProcess, None, self.idTable)
+        self.router.post(Message(self.id, None, message, self.clock.clock, ackNeeded=True, correlationId=correlationId))
+        return future
+
+    def joinGroup(self, group: str) -> None:
+        """
+        Fait entrer le processus dans un groupe de diffusion, et l'annonce à tous pour qu'ils l'ajoutent à leur index des groupes.
+        Un message envoyé au groupe par un processus qui n'a pas encore reçu l'annonce ne parvient pas au nouveau membre.
+        """
+        self.waitReorganized()
+        with self.membershipLock:
+            self.membership.join(group, self.name)
+        self.router.post(GroupMessage(self.id, group, True))
+
+    def leaveGroup(self, group: str) -> None:
+        """
+        Fait sortir le processus d'un groupe de diffusion, et l'annonce à tous.
+        """
+        self.waitReorganized()
+        with self.membershipLock:
+            self.membership.leave(group, self.name)
+        self.router.post(GroupMessage(self.id, group, False))
+
+    def groupMembers(self, group: str) -> list[str]:
+        """
+        Retourne les noms des membres connus d'un groupe de diffusion, dans l'ordre de leurs IDs.
+        """
+        with self.membershipLock:
+            return self.membership.members(group)
+
+    def sendToGroup(self, message: any, group: str):
+        """
+        Diffuse un message asynchrone aux seuls membres d'un groupe, le processus compris s'il en est membre.
+        Le message n'est transmis qu'aux membres, et leurs boîtes aux lettres bornées ne sont attendues qu'elles, voir Com.overflowPolicy.
+        """
+        self.waitReorganized()
+        members = self.groupMembers(group)
+        if not members:
+            messagesLog.error("<%s:%s> group %s is empty", self.name, self.id, group)
+            return
+        self.acquireCredits(members, 1)
+        recipients = self.groupRecipients(members)
         self.clock.inc_clock()
-        print(f'<{self.name}:{self.id}> broadcasting "{message}" asking for ACK with clock {self.clock.clock}', flush=True)
-        with self.waitingForAckLock:
-            self.waitingForAck = self.nbProcess
-        PyBus.Instance().post(Message(self.id, None, message, self.clock.clock, ackNeeded=True))
-        self.ackEvent.wait()
-        self.ackEvent.clear()
+        messagesLog.debug('<%s:%s> sending "%s" to group %s with clock %s', self.name, self.id, message, group, self.clock.clock)
+        self.router.multicast(Message(self.id, None, message, self.clock.clock), recipients)
+
+    def ackNeededSendToGroup(self, message: any, group: str):
+        """
+        Diffuse un message aux membres d'un groupe en attendant un ACK de chacun.
+        """
+        self.waitReorganized()
+        self.ackNeededSendToGroupFuture(message, group).result()
+
+    def ackNeededSendToGroupFuture(self, message: any, group: str) -> Future:
+        """
+        Diffuse un message aux membres d'un groupe sans attendre, et retourne le Future résolu à la réception de l'ACK de chacun.
+        Un membre retiré du système n'est plus attendu.
+        """
+        members = self.groupMembers(group)
+        if not members:
+            future = Future()
+            future.set_result(None)
+            return future
+        self.acquireCredits(members, 1)
+        recipients = self.groupRecipients(members)
+        self.clock.inc_clock()
+        messagesLog.debug('<%s:%s> sending "%s" to group %s asking for ACK with clock %s', self.name, self.id, message, group, self.clock.clock)
+        correlationId, future = self.expectAcks(len(members), None, members)
+        self.router.multicast(Message(self.id, None, message, self.clock.clock, ackNeeded=True, correlationId=correlationId), recipients)
+        return future
+
+    def groupRecipients(self, members: list[str]) -> list[int]:
+        """
+        Retourne les IDs des membres d'un groupe, après avoir envoyé les messages en attente de regroupement qui leur sont destinés.
+        """
+        recipients = [self.nameTable[name] for name in members if name in self.nameTable]
+        for id in recipients:
+            self.flushTo(id)
+        return recipients
 
     def checkHearbits(self):
         """
-        Vérifie les heartbeats reçus et détecte les processus défaillants.
+        Vérifie les heartbeats reçus et détecte les processus défaillants, dont le niveau de suspicion dépasse Com.phiThreshold,
+        puis propose le retrait des processus suspectés, à chaque vérification tant qu'ils n'ont pas été retirés.
         """
-        with self.heartbitMutex:
+        with self.membershipLock, self.heartbitMutex:
+            now = self.scheduler.now()
             fails = []
-            for id, lastTime in list(self.heartbitTable.items()):
-                # print(f"<{self.name}:{self.id}> last heartbit from {id} {time.time() - lastTime} ago", flush=True)
-                if time.time() - lastTime > Com.checkHeartbitEvery:
+            for id in list(self.heartbitTable):
+                phi = self.failureDetector.phi(id, now)
+                failureLog.debug("<%s:%s> suspicion of %s: %.2f", self.name, self.id, id, phi)
+                if phi > Com.phiThreshold:
                     fails.append(id)
-            if len(fails) > 0:
-                print(f"<{self.name}:{self.id}> detected failure of process {fails}", flush=True)
-                for id in fails:
-                    del self.heartbitTable[id]
-                    # n = list(self.nameTable.keys())[list(self.nameTable.values()).index(id)]
-                    # self.nbProcess -= 1
-                    # self.nameTable[n] = None
-
-                    # ### will block all operations until reorg is done
-                    # PyBus.Instance().post(ReorgMessage(self.id, fails))
+            for id in fails:
+                self.failureDetector.remove(id)
+                self.suspected.add(self.idTable[id])
+        if len(fails) > 0:
+            failureLog.warning("<%s:%s> detected failure of process %s", self.name, self.id, fails)
+        self.proposeReorg()
+
+    def proposeReorg(self) -> None:
+        """
+        Transmet les processus suspectés au coordinateur, le processus d'ID le plus petit qui n'est pas suspecté,
+        ou diffuse leur retrait si le processus est lui-même le coordinateur.
+        """
+        with self.membershipLock:
+            self.suspected &= self.nameTable.keys()
+            if not self.suspected:
+                return
+            fails = sorted(self.suspected)
+            coordinator = next(name for name in self.idTable if name not in self.suspected)
+        if coordinator == self.name:
+            self.announceReorg(fails)
+        else:
+            self.router.post(SuspicionMessage(self.id, self.nameTable[coordinator], fails))
+
+    @subscribe(threadMode= Mode.POSTING, onEvent=SuspicionMessage)
+    @dispatched
+    def onSuspicionReceive(self, message: SuspicionMessage):
+        """
+        Handler pour la réception d'une suspicion par le coordinateur, qui diffuse le retrait des processus suspectés.
+        """
+        message = self.admit(message)
+        if message is None or message.recipient != self.id:
+            return
+        self.announceReorg(message.content)
+
+    def announceReorg(self, fails: list[str]) -> None:
+        """
+        Diffuse, en tant que coordinateur, le retrait de processus défaillants dont le retrait n'a pas déjà été diffusé.
+        Chaque retrait ouvre une nouvelle époque ; les retraits sont appliqués par tous dans l'ordre des époques.
+        La diffusion est confiée au Scheduler : sa livraison au processus lui-même planifie l'application du retrait auprès
+        de son Dispatcher, ce qu'un worker ne doit pas faire depuis un handler.
+        """
+        with self.membershipLock:
+            fails = [name for name in fails if name in self.nameTable and name not in self.announced and name != self.name]
+            if not fails:
+                return
+            self.announced.update(fails)
+            self.announcedEpoch = max(self.announcedEpoch, self.membership.epoch) + 1
+            epoch = self.announcedEpoch
+        reorgLog.warning("<%s:%s> announcing removal of %s, epoch %s", self.name, self.id, fails, epoch)
+        self.scheduler.schedule(0, self.router.post, (ReorgMessage(self.id, fails, epoch),))
     
-    @subscribe(threadMode= Mode.PARALLEL, onEvent= ReorgMessage)
+    @subscribe(threadMode= Mode.POSTING, onEvent= ReorgMessage)
     def receiveReorg(self, message: ReorgMessage):
         """
-        Handler pour la réception d'un message de réorganisation.
-        Bloque les autres opérations pendant la réorganisation.
+        Handler pour la réception d'un retrait de processus défaillants.
+        Bloque les nouvelles opérations du processus jusqu'à ce que le retrait soit appliqué par le Dispatcher,
+        une fois les messages déjà en file traités.
         """
         if not self.alive.is_set():
             return
-        self.initializedEvent.wait()
 
+        epoch, fails = message.content
+        reorgLog.warning("<%s:%s> received reorganization message, fails: %s, epoch %s", self.name, self.id, fails, epoch)
+        with self.membershipLock:
+            if epoch <= self.membership.epoch or epoch in self.pendingReorgs:
+                return
+            self.pendingReorgs[epoch] = fails
+            if epoch != self.membership.epoch + 1 or self.reorgScheduled:
+                return
+            self.reorgScheduled = True
         self.reorgEvent.clear()
-        print(f"<{self.name}:{self.id}> received reorganization message, fails: {message.content}", flush=True)
+        self.dispatcher.exclusive(self.applyReorgs)
+
+    def applyReorgs(self) -> None:
+        """
+        Applique dans l'ordre des époques les retraits reçus, alors qu'aucun handler ne s'exécute,
+        puis traite les messages émis dans les nouvelles époques qui avaient été retenus, et rapporte l'état du token au coordinateur.
+        S'exécutant sur un worker pendant que les autres sont arrêtés au point de rendez-vous, elle ne fait que des envois
+        qui ne bloquent pas (voir Dispatcher) ; le rapport, qui peut être destiné au processus lui-même, est confié au Scheduler
+        et part une fois les workers repartis.
+        """
+        self.flush()
+        with self.membershipLock:
+            while self.alive.is_set() and (fails := self.pendingReorgs.pop(self.membership.epoch + 1, None)) is not None:
+                self.removeProcesses(fails)
+            self.reorgScheduled = False
+            held = self.heldMessages
+            self.heldMessages = []
+        for message in held:
+            Router.handle(self, message)
+        self.reorgEvent.set()
+        if self.alive.is_set():
+            self.scheduler.schedule(0, self.reportToken)
+
+    def removeProcesses(self, fails: list[str]) -> None:
+        """
+        Retire des processus défaillants du système : renumérote les IDs à partir du premier retiré,
+        et fait échouer ou termine les opérations en cours qui les impliquaient. Doit être appelé avec membershipLock pris.
+        """
+        if self.name in fails:
+            reorgLog.error("<%s:%s> was removed from the system", self.name, self.id)
+            self.alive.clear()
+            return
+        size = self.nbProcess
+        removed = self.membership.remove(fails)
+        if not removed:
+            return
+        self.id = self.nameTable[self.name]
+        self.nbProcess = len(self.idTable)
+        self.suspected.difference_update(fails)
+        self.announced.difference_update(fails)
+        self.tokenReports = {}
+        reorgLog.warning("<%s:%s> removed %s, epoch %s, %s processes left", self.name, self.id, fails, self.membership.epoch, self.nbProcess)
+
+        self.router.renumber(removed, size)
+        with self.heartbitMutex:
+            for id in list(self.heartbitTable):
+                self.failureDetector.remove(id)
+            self.monitors.clear()
+        self.watchNeighbours()
+
+        failure = ProcessFailure(f"processes {fails} failed")
+        translate = lambda id: renumber(id, removed)
+        self.mailbox.renumber(translate, False, failure)
+        self.syncMailbox.renumber(translate, True, failure)
+        self.failAcks(set(fails), failure)
+        with self.joinLock:
+            waiters = list(self.joinWaiters.values())
+            self.joinWaiters.clear()
+            self.joinReceived.clear()
+            self.barrierGeneration = 0
+        for future in waiters:
+            future.set_exception(failure)
+        self.collectives.fail(failure)
+        if self.mutex is not None:
+            self.mutex.renumber(removed)
+        with self.mutexesLock:
+            mutexes = list(self.mutexes.values())
+        for mutex in mutexes:
+            mutex.renumber(removed)
+        self.causal.renumber(removed)
+        self.flow.renumber(removed, size)
+
+    def failAcks(self, fails: set[str], failure: ProcessFailure) -> None:
+        """
+        Termine les envois en attente d'ACK des processus retirés : un envoi synchronisé vers l'un d'eux échoue,
+        une diffusion n'attend plus leur ACK.
+        """
+        failed = []
+        done = []
+        with self.pendingAcksLock:
+            for correlationId, pending in list(self.pendingAcks.items()):
+                remaining, future, start, dest, awaited = pending
+                if dest is not None:
+                    if dest in fails:
+                        failed.append(future)
+                        del self.pendingAcks[correlationId]
+                    continue
+                pending[0] -= len(fails & awaited)
+                awaited.difference_update(fails)
+                if pending[0] <= 0:
+                    done.append(future)
+                    del self.pendingAcks[correlationId]
+        for future in failed:
+            future.set_exception(failure)
+        for future in done:
+            future.set_result(None)
 
-    @subscribe(threadMode= Mode.PARALLEL, onEvent=Message)
+    def admit(self, message: Message) -> Message | None:
+        """
+        Prépare le traitement d'un message reçu : l'ignore si le processus est arrêté, le retient jusqu'à la réorganisation
+        s'il a été émis dans une époque que le processus n'a pas encore atteinte, le traduit dans l'époque courante s'il a été
+        émis dans une époque antérieure, puis enregistre le signe de vie de l'émetteur.
+        Returns:
+            Message | None: Le message à traiter, None s'il est ignoré, retenu, ou émis par un processus retiré depuis.
+        """
+        if not self.alive.is_set():
+            return None
+        if message.epoch != self.membership.epoch:
+            if message.epoch > self.membership.epoch:
+                self.heldMessages.append(message)
+                return None
+            message = self.translate(message)
+            if message is None:
+                return None
+        self.noteAlive(message.sender)
+        return message
+
+    def translate(self, message: Message) -> Message | None:
+        """
+        Retourne une copie d'un message émis dans une époque antérieure, dont les IDs sont traduits dans l'époque courante,
+        ou None si son émetteur ou son destinataire a été retiré depuis.
+        """
+        translated = copy(message)
+        for removed in self.membership.removals[message.epoch:]:
+            if translated.sender is not None:
+                translated.sender = renumber(translated.sender, removed)
+                if translated.sender is None:
+                    return None
+            if translated.recipient is not None:
+                translated.recipient = renumber(translated.recipient, removed)
+                if translated.recipient is None:
+                    return None
+            if isinstance(translated, TokenMessage) and translated.content[1] is not None:
+                handoff, state, resource = translated.content
+                translated.content = (handoff, SuzukiKasami.translateState(state, removed), resource)
+            elif isinstance(translated, CausalMessage):
+                translated.content = (translated.content[0], CausalBroadcast.translateDelta(translated.delta, removed))
+        return translated
+
+    def reportToken(self) -> None:
+        """
+        Rapporte au coordinateur ce que le processus sait du token de chaque section critique qu'il connaît, après une réorganisation.
+        """
+        if self.mutex is not None:
+            statuses = {None: self.mutex.status()}
+        else:
+            with self.tokenLock:
+                statuses = {None: (self.hasToken, 0, self.waitingForToken is not None, 0)}
+        with self.mutexesLock:
+            mutexes = list(self.mutexes.items())
+        for resource, mutex in mutexes:
+            statuses[resource] = mutex.status()
+        report = {}
+        with self.tokenLock:
+            for resource, (holds, number, waiting, reading) in statuses.items():
+                handoff, sentTo = self.tokenSent.get(resource, (0, None))
+                report[resource] = (holds, handoff, sentTo, number, waiting, reading)
+        self.router.post(TokenStatusMessage(self.id, 0, (self.membership.epoch, report)))
+
+    @subscribe(threadMode= Mode.POSTING, onEvent=TokenStatusMessage)
+    @dispatched
+    def onTokenStatusReceive(self, message: TokenStatusMessage):
+        """
+        Handler pour la réception par le coordinateur de l'état des tokens rapporté par un processus.
+        Une fois l'état de tous les processus reçu, le token de chaque section critique connue est recréé s'il a été perdu, voir recoverToken.
+        """
+        message = self.admit(message)
+        if message is None or message.recipient != self.id or message.content[0] != self.membership.epoch:
+            return
+        self.tokenReports[message.sender] = message.content[1]
+        if len(self.tokenReports) < self.nbProcess:
+            return
+
+        reports = self.tokenReports
+        self.tokenReports = {}
+        with self.mutexesLock:
+            resources = set(self.mutexes)
+        for report in reports.values():
+            resources.update(report)
+        for resource in resources:
+            self.recoverToken(resource, {id: report[resource] for id, report in reports.items() if resource in report})
+        self.tokensRecovered = self.membership.epoch
+
+    def recoverToken(self, resource: str | None, reports: dict[int, tuple]) -> None:
+        """
+        Recrée le token d'une section critique s'il n'est détenu par personne et qu'il a été perdu : sa dernière transmission
+        était destinée à un processus retiré, ou, s'il n'a jamais été transmis, son détenteur initial a été retiré.
+        Un token en transit entre deux processus vivants n'est pas recréé.
+        Args:
+            resource (str | None): Nom de la section critique, None pour la section globale.
+            reports (dict[int, tuple]): État du token rapporté par chaque processus qui connaît la section, voir TokenStatusMessage.
+        """
+        if any(holds for holds, _, _, _, _, _ in reports.values()):
+            return
+        _, handoff, sentTo, _, _, _ = max(reports.values(), key=lambda report: report[1], default=(False, 0, None, 0, False, 0))
+        if sentTo is not None:
+            if sentTo in self.nameTable:
+                return
+        elif resource is not None and self.tokenHome(resource) is not None:
+            return
+        mutex = self.mutexFor(resource)
+        if mutex is not None and mutex.status()[0]:
+            return
+        mutexLog.warning("<%s:%s> token %s was lost (last sent to %s), regenerating it", self.name, self.id, resource, sentTo)
+        with self.tokenLock:
+            self.tokenHandoff[resource] = max(self.tokenHandoff.get(resource, 0), handoff)
+        if mutex is not None:
+            mutex.regenerate({id: (number, waiting, reading) for id, (_, _, _, number, waiting, reading) in reports.items()})
+        else:
+            self.takeRingToken()
+
+    @subscribe(threadMode= Mode.POSTING, onEvent=GroupMessage)
+    @dispatched
+    def onGroupReceive(self, message: GroupMessage):
+        """
+        Handler pour la réception de l'entrée d'un processus dans un groupe de diffusion, ou de sa sortie.
+        """
+        message = self.admit(message)
+        if message is None or message.sender == self.id:
+            return
+        group, joined = message.content
+        with self.membershipLock:
+            if joined:
+                self.membership.join(group, self.idTable[message.sender])
+            else:
+                self.membership.leave(group, self.idTable[message.sender])
+
+    @subscribe(threadMode= Mode.POSTING, onEvent=CreditMessage)
+    @dispatched
+    def onCreditReceive(self, message: CreditMessage):
+        """
+        Handler pour la réception des crédits rendus par un destinataire dont la boîte aux lettres s'est libérée.
+        """
+        message = self.admit(message)
+        if message is None or message.recipient != self.id:
+            return
+        self.flow.grant(message.sender, message.content)
+
+    @subscribe(threadMode= Mode.POSTING, onEvent=BatchMessage)
+    @dispatched
+    def onBatchReceive(self, message: BatchMessage):
+        """
+        Handler pour la réception d'une enveloppe de messages asynchrones.
+        Range d'un coup les messages qu'elle contient dans la boîte aux lettres, dans leur ordre d'envoi.
+        """
+        message = self.admit(message)
+        if message is None or (message.recipient != self.id and message.recipient is not None):
+            return
+
+        messages = message.unpack()
+        for unpacked in messages:
+            self.clock.sync(unpacked.clock)
+        messagesLog.debug('<%s:%s> receiving %s messages from %s with clock %s', self.name, self.id, len(messages), message.sender, self.clock.clock)
+        self.mailbox.addMessages(messages)
+
+    @subscribe(threadMode= Mode.POSTING, onEvent=CausalMessage)
+    @dispatched
+    def onCausalReceive(self, message: CausalMessage):
+        """
+        Handler pour la réception d'un message diffusé en ordre causal, retenu jusqu'à ce que ses dépendances aient été livrées.
+        """
+        message = self.admit(message)
+        if message is None:
+            return
+        messagesLog.debug('<%s:%s> receiving causal broadcast "%s" from %s with clock %s', self.name, self.id, message.content[0], message.sender, message.clock)
+        self.causal.onMessage(message)
+
+    @subscribe(threadMode= Mode.POSTING, onEvent=Message)
+    @dispatched
     def onReceive(self, message: Message):
         """
         Handler pour la réception d'un message générique.
         Met à jour l'horloge, ajoute le message à la boîte aux lettres et gère les ACK si nécessaire.
         """
-        self.reorgEvent.wait()
-        if not self.alive.is_set():
-            return
-        self.initializedEvent.wait()
-        if message.recipient != self.id and message.recipient is not None:
+        message = self.admit(message)
+        if message is None or (message.recipient != self.id and message.recipient is not None):
             return
         if message.isSystem:
             return
         
         self.clock.sync(message.clock)
-        print(f'<{self.name}:{self.id}> receiving "{message.content}" from {message.sender} with clock {self.clock.clock}', flush=True)
+        messagesLog.debug('<%s:%s> receiving "%s" from %s with clock %s', self.name, self.id, message.content, message.sender, self.clock.clock)
         self.mailbox.addMessage(message)
         if message.ackNeeded:
-            print(f'<{self.name}:{self.id}> sending ACK to {message.sender}', flush=True)
-            PyBus.Instance().post(AckMessage(self.id, message.sender))
\ No newline at end of file
+            messagesLog.debug('<%s:%s> sending ACK to %s', self.name, self.id, message.sender)
+            self.router.post(AckMessage(self.id, message.sender, message.correlationId))
\ No newline at end of file
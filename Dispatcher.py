@@ -0,0 +1,304 @@
+import asyncio
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from queue import Queue
+from threading import Thread, Lock, Semaphore, Barrier, BrokenBarrierError, current_thread, local
+
+from Log import getLogger
+
+dispatcherLog = getLogger("dispatcher")
+
+context = local()
+
+def markNonBlocking() -> None:
+    """
+    Marque le thread appelant comme ne devant jamais être bloqué par un Dispatcher plein : ses soumissions sont toujours acceptées.
+    Appelé par les workers des Dispatcher, les threads de réception des sockets et le thread du Scheduler,
+    qui portent aussi le trafic système et dont le blocage peut empêcher les files de se vider ou geler la détection des pannes.
+    """
+    context.nonBlocking = True
+
+@contextmanager
+def nonBlockingSection():
+    """
+    Rend les soumissions du thread appelant non bloquantes le temps d'un bloc with,
+    pour les envois faits sous un verrou que les threads marqués par markNonBlocking peuvent attendre.
+    """
+    previous = nonBlocking()
+    context.nonBlocking = True
+    try:
+        yield
+    finally:
+        context.nonBlocking = previous
+
+def nonBlocking() -> bool:
+    """
+    Indique si le thread appelant a été marqué par markNonBlocking.
+    """
+    return getattr(context, "nonBlocking", False)
+
+class Dispatcher:
+    """
+    Pool fixe de threads exécutant les handlers de réception d'un Com.
+    Chaque émetteur est associé à un unique worker, ce qui conserve l'ordre FIFO des messages par émetteur,
+    et le nombre de threads reste constant quel que soit le trafic.
+    Les handlers exécutés par le Dispatcher ne doivent pas bloquer, sous peine de bloquer les messages suivants du même worker.
+
+    Seuls les messages applicatifs soumis par les threads de l'application sont soumis à la contre-pression : les messages système,
+    les points de rendez-vous d'exclusive et toute soumission depuis un thread marqué par markNonBlocking (un worker, y compris
+    d'un autre Com, un thread de réception, le Scheduler) sont toujours acceptés, même au-delà de queueDepth. Un worker qui
+    se poste un message ne peut donc pas se bloquer sur sa propre file, ni deux workers s'attendre mutuellement.
+
+    Args:
+        name (str): Nom utilisé pour nommer les threads du pool.
+        nbWorkers (int): Nombre de threads du pool.
+        queueDepth (int): Nombre maximal de messages applicatifs soumis par l'application dans la file de chaque worker, 0 pour ne pas
+            les limiter. Un émetteur applicatif est bloqué tant que la file du worker qui lui est associé en contient autant.
+
+    Attributs:
+        queues (list[Queue]): Files des livraisons en attente, une par worker, non bornées.
+        slots (list[Semaphore] | None): Places restantes pour les messages applicatifs dans chaque file, None si elles ne sont pas limitées.
+        workers (list[Thread]): Threads du pool.
+        stopped (bool): Indique si le Dispatcher a été arrêté.
+    """
+
+    def __init__(self, name: str, nbWorkers: int, queueDepth: int):
+        self.queues: list[Queue] = [Queue() for _ in range(nbWorkers)]
+        self.slots: list[Semaphore] | None = [Semaphore(queueDepth) for _ in range(nbWorkers)] if queueDepth > 0 else None
+        self.workers: list[Thread] = [Thread(target=self.run, args=(queue,), name=f"{name}-dispatch-{i}", daemon=True) for i, queue in enumerate(self.queues)]
+        self.stopped = False
+
+    def start(self) -> None:
+        """
+        Démarre les threads du pool. Les livraisons soumises avant le démarrage restent en file jusque-là.
+        """
+        for worker in self.workers:
+            worker.start()
+
+    def liveWorkers(self) -> int:
+        """
+        Retourne le nombre de threads du pool en cours d'exécution.
+        """
+        return sum(worker.is_alive() for worker in self.workers)
+
+    def submit(self, handler, subscriber, message) -> None:
+        """
+        Place une livraison dans la file du worker associé à l'émetteur du message, en attendant qu'elle ait de la place
+        pour un message applicatif soumis par l'application.
+        Args:
+            handler (callable): Handler à appeler.
+            subscriber (any): Objet sur lequel appeler le handler.
+            message (Message): Message à livrer.
+        """
+        if self.stopped:
+            return
+        worker = hash(message.sender) % len(self.queues)
+        counted = self.slots is not None and not message.isSystem and not nonBlocking()
+        if counted:
+            self.slots[worker].acquire()
+        self.queues[worker].put((handler, subscriber, message, counted))
+
+    def exclusive(self, callback) -> None:
+        """
+        Planifie l'exécution d'une fonction pendant que tous les workers sont arrêtés, après les livraisons déjà en file :
+        chaque worker s'arrête en atteignant le point de rendez-vous placé dans sa file, le dernier arrivé exécute la fonction,
+        puis tous reprennent. Aucun handler ne s'exécute donc en même temps que la fonction.
+        Ne bloque jamais, les files n'étant pas bornées : peut être appelée depuis un worker, même sur le point de rendez-vous.
+        Args:
+            callback (callable): Fonction sans argument à exécuter.
+        """
+        if self.stopped:
+            return
+        def action():
+            try:
+                callback()
+            except Exception:
+                dispatcherLog.exception("exclusive callback %s failed", callback.__name__)
+
+        barrier = Barrier(len(self.queues), action=action)
+        for queue in self.queues:
+            queue.put(barrier)
+
+    def stop(self) -> None:
+        """
+        Arrête les threads du pool après la livraison des messages déjà en file.
+        """
+        self.stopped = True
+        for queue, worker in zip(self.queues, self.workers):
+            if worker.is_alive():
+                queue.put(None)
+        for worker in self.workers:
+            if worker.is_alive() and worker is not current_thread():
+                worker.join()
+
+    def run(self, queue: Queue) -> None:
+        """Exécute les livraisons de la file jusqu'à réception du signal d'arrêt."""
+        markNonBlocking()
+        slot = self.slots[self.queues.index(queue)] if self.slots is not None else None
+        while True:
+            item = queue.get()
+            if item is None:
+                return
+            if isinstance(item, Barrier):
+                try:
+                    item.wait()
+                except BrokenBarrierError:
+                    pass
+                continue
+            handler, subscriber, message, counted = item
+            try:
+                handler(subscriber, message)
+            except Exception:
+                dispatcherLog.exception("handler %s failed on %s", handler.__name__, message.__class__.__name__)
+            if counted:
+                slot.release()
+
+class LoopDispatcher:
+    """
+    Variante du Dispatcher exécutant les handlers de réception sur une boucle d'événements asyncio plutôt que sur un pool de threads.
+    Les livraisons sont exécutées dans l'ordre de soumission, ce qui conserve l'ordre FIFO par émetteur, et aucun thread n'est créé.
+    Elles sont mises en file et exécutées par lots : un seul rappel de la boucle est planifié tant que la file n'a pas été vidée.
+    Un lot soumis depuis la boucle elle-même est planifié sans réveiller la boucle par son descripteur d'éveil.
+    Avec inline, une livraison soumise alors qu'aucune n'est en file ni en cours est exécutée immédiatement, sans rappel de la boucle :
+    réservé aux couches de routage qui ne livrent que depuis la boucle, et jamais depuis un handler ou un envoi (simulation).
+    Comme pour le Dispatcher, les handlers ne doivent pas bloquer.
+
+    Args:
+        loop (asyncio.AbstractEventLoop): La boucle d'événements exécutant les handlers.
+        inline (bool): Si vrai, exécute si possible les livraisons dès leur soumission.
+
+    Attributs:
+        pending (list[tuple]): Livraisons soumises avant le démarrage.
+        ready (deque[tuple]): Livraisons en attente du prochain lot.
+        scheduled (bool): Indique si l'exécution d'un lot est planifiée sur la boucle.
+        running (bool): Indique si une livraison est en cours d'exécution, modifié par la boucle seule.
+        lock (Lock): Mutex protégeant started, pending, ready et scheduled ; une livraison exécutée immédiatement ne le prend pas,
+            toutes les soumissions venant alors de la boucle.
+        started (bool): Indique si le LoopDispatcher a été démarré.
+        stopped (bool): Indique si le LoopDispatcher a été arrêté.
+    """
+
+    def __init__(self, loop, inline: bool = False):
+        self.loop = loop
+        self.inline = inline
+        self.pending: list[tuple] = []
+        self.ready: deque[tuple] = deque()
+        self.scheduled = False
+        self.running = False
+        self.lock = Lock()
+        self.started = False
+        self.stopped = False
+
+    def start(self) -> None:
+        """
+        Démarre le LoopDispatcher en planifiant les livraisons soumises avant le démarrage.
+        """
+        with self.lock:
+            self.started = True
+            self.ready.extend(self.pending)
+            self.pending.clear()
+            if self.ready:
+                self.schedule()
+
+    def liveWorkers(self) -> int:
+        """
+        Retourne 0 : les handlers sont exécutés par la boucle d'événements, sans thread dédié.
+        """
+        return 0
+
+    def submit(self, handler, subscriber, message) -> None:
+        """
+        Planifie une livraison sur la boucle d'événements, ou l'ignore si la boucle est fermée.
+        Args:
+            handler (callable): Handler à appeler.
+            subscriber (any): Objet sur lequel appeler le handler.
+            message (Message): Message à livrer.
+        """
+        if self.stopped:
+            return
+        if self.inline and self.started and not self.running and not self.ready:
+            self.running = True
+            try:
+                handler(subscriber, message)
+            except Exception:
+                dispatcherLog.exception("handler %s failed on %s", handler.__name__, message.__class__.__name__)
+            finally:
+                self.running = False
+            return
+        with self.lock:
+            if not self.started:
+                self.pending.append((handler, subscriber, message))
+                return
+            self.ready.append((handler, subscriber, message))
+            if not self.scheduled:
+                self.schedule()
+
+    def schedule(self) -> None:
+        """
+        Planifie l'exécution du prochain lot sur la boucle, sans effet si la boucle est fermée. Appelé sous lock.
+        """
+        try:
+            if self.onLoop():
+                self.loop.call_soon(self.drain)
+            else:
+                self.loop.call_soon_threadsafe(self.drain)
+            self.scheduled = True
+        except RuntimeError:
+            pass
+
+    def drain(self) -> None:
+        """Exécute les livraisons en file ; celles soumises pendant le lot forment le lot suivant."""
+        with self.lock:
+            items = self.ready
+            self.ready = deque()
+            self.scheduled = False
+            self.running = True
+        try:
+            for item in items:
+                self.run(*item)
+        finally:
+            self.running = False
+
+    def onLoop(self) -> bool:
+        """
+        Indique si l'appelant s'exécute sur la boucle d'événements du LoopDispatcher.
+        """
+        try:
+            return asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            return False
+
+    def stop(self) -> None:
+        """
+        Arrête le LoopDispatcher : les livraisons suivantes sont ignorées.
+        """
+        self.stopped = True
+
+    def exclusive(self, callback) -> None:
+        """
+        Planifie l'exécution d'une fonction après les livraisons déjà soumises ; les handlers étant exécutés un à un sur la boucle,
+        aucun ne s'exécute en même temps qu'elle.
+        Args:
+            callback (callable): Fonction sans argument à exécuter.
+        """
+        self.submit(lambda subscriber, message: callback(), None, None)
+
+    def run(self, handler, subscriber, message) -> None:
+        """Exécute une livraison."""
+        try:
+            handler(subscriber, message)
+        except Exception:
+            dispatcherLog.exception("handler %s failed on %s", handler.__name__, message.__class__.__name__)
+
+def dispatched(function):
+    """
+    Décorateur redirigeant l'appel d'un handler vers le Dispatcher de son objet (attribut dispatcher).
+    À utiliser sous un @subscribe(threadMode=Mode.POSTING, ...) : le PyBus et le Router ne font alors que mettre le message en file.
+    Le wrapper est marqué dispatched, ce qui permet au Router de soumettre directement la fonction décorée (__wrapped__).
+    """
+    @wraps(function)
+    def wrapper(self, message):
+        self.dispatcher.submit(function, self, message)
+    wrapper.dispatched = True
+    return wrapper
@@ -0,0 +1,216 @@
+from __future__ import annotations
+from concurrent.futures import Future
+from threading import Lock, Condition
+from time import monotonic
+
+from Membership import ProcessFailure, shiftKeys
+from Message import Message, CreditMessage
+
+class MailboxFull(Exception):
+    """
+    Levée par un envoi asynchrone lorsque la boîte aux lettres d'un destinataire n'a plus de place pour l'émetteur :
+    immédiatement avec la politique "reject", après Com.sendTimeout secondes avec la politique "timeout".
+    """
+
+class FlowControl:
+    """
+    Contrôle de flux par crédits, qui borne la boîte aux lettres de chaque processus à Com.mailboxCapacity messages.
+
+    Chaque processus accorde à chaque émetteur (lui compris) une fenêtre de capacity // N crédits ; un message asynchrone destiné
+    à la boîte aux lettres coûte un crédit à son émetteur, et une diffusion un crédit auprès de chaque destinataire, pris tous à la fois.
+    Le destinataire rend les crédits à mesure que les messages sont retirés de sa boîte aux lettres, par lots d'une demi-fenêtre.
+    Lorsque la boîte atteint la marque haute, il cesse de rendre les crédits, jusqu'à ce qu'elle soit redescendue sous la marque basse ;
+    il rend alors d'un coup tous ceux qu'il doit. Un émetteur sans crédit attend, échoue ou patiente selon la politique de débordement.
+    Les messages synchronisés et les messages système ne sont pas comptés.
+
+    Une capacité nulle désactive le contrôle de flux : les boîtes aux lettres ne sont pas bornées.
+
+    Args:
+        com (Com): Le Com associé.
+        capacity (int): Capacité de la boîte aux lettres, 0 pour une boîte non bornée.
+        highWatermark (float): Fraction de la capacité au-delà de laquelle les crédits ne sont plus rendus.
+        lowWatermark (float): Fraction de la capacité en deçà de laquelle les crédits sont de nouveau rendus.
+
+    Attributs:
+        window (int): Nombre de crédits accordés à chaque émetteur, fixé par start, 0 si le contrôle de flux est désactivé.
+        credits (dict[int, int]): Crédits restants auprès de chaque destinataire, window pour un destinataire absent.
+        owed (dict[int, int]): Crédits dus à chaque émetteur pour ses messages retirés de la boîte aux lettres.
+        paused (bool): Indique si la boîte a atteint la marque haute et que les crédits ne sont plus rendus.
+        lock (Lock): Mutex protégeant l'état.
+        available (Condition): Condition notifiée à chaque retour de crédits et à chaque réorganisation.
+        waiters (list[tuple[Future, str | list[str] | None, int]]): Futures en attente de crédits, avec le destinataire et le nombre de crédits attendus.
+    """
+
+    def __init__(self, com: "Com", capacity: int, highWatermark: float, lowWatermark: float):
+        self.com = com
+        self.capacity = capacity
+        self.highWatermark = highWatermark
+        self.lowWatermark = lowWatermark
+        self.window = 0
+        self.credits: dict[int, int] = {}
+        self.owed: dict[int, int] = {}
+        self.paused = False
+        self.lock = Lock()
+        self.available = Condition(self.lock)
+        self.waiters: list[tuple[Future, str | list[str] | None, int]] = []
+
+    def start(self, nbProcess: int) -> None:
+        """
+        Répartit la capacité entre les émetteurs, une fois leur nombre connu.
+        """
+        if self.capacity > 0:
+            self.window = max(1, self.capacity // nbProcess)
+
+    def chunks(self, contents: list[any]) -> list[list[any]]:
+        """
+        Découpe une liste de messages en enveloppes d'au plus une fenêtre, pour qu'aucune ne demande plus de crédits qu'il n'en existe.
+        """
+        if not self.window:
+            return [contents]
+        return [contents[start:start + self.window] for start in range(0, len(contents), self.window)]
+
+    def acquire(self, dest: str | list[str] | None, count: int, policy: str, timeout: float | None) -> None:
+        """
+        Prend count crédits auprès d'un destinataire, de plusieurs pour une diffusion à un groupe, ou de chaque processus pour une diffusion.
+        Args:
+            dest (str | list[str] | None): Le nom du destinataire, les noms des destinataires, ou None pour une diffusion.
+            count (int): Le nombre de messages à envoyer, au plus une fenêtre.
+            policy (str): "block" pour attendre les crédits, "timeout" pour les attendre au plus timeout secondes, "reject" pour ne pas attendre.
+            timeout (float | None): Temps d'attente maximal de la politique "timeout".
+        Raises:
+            MailboxFull: Si les crédits manquent et que la politique interdit de les attendre plus longtemps.
+            ProcessFailure: Si le destinataire est retiré du système pendant l'attente ; une diffusion n'attend plus les processus retirés.
+        """
+        if not self.window:
+            return
+        deadline = None if policy != "timeout" or timeout is None else monotonic() + timeout
+        target = dest if isinstance(dest, str) else "some process"
+        start = None
+        with self.lock:
+            while not self._take(dest, count):
+                if policy == "reject":
+                    raise MailboxFull(f"mailbox of {target} is full")
+                if start is None:
+                    start = self.com.scheduler.now()
+                if deadline is None:
+                    self.available.wait()
+                else:
+                    remaining = deadline - monotonic()
+                    if remaining <= 0:
+                        raise MailboxFull(f"mailbox of {target} is still full after {timeout}s")
+                    self.available.wait(remaining)
+        if start is not None:
+            self.com.metrics.record("creditWait", self.com.scheduler.now() - start)
+
+    def whenAvailable(self, dest: str | list[str] | None, count: int) -> Future:
+        """
+        Retourne un Future résolu dès que count crédits sont disponibles auprès des destinataires d'un envoi, voir acquire,
+        sans les prendre, ou en échec avec ProcessFailure si le destinataire est retiré du système.
+        """
+        future = Future()
+        with self.lock:
+            try:
+                ready = not self.window or self._available(dest, count)
+            except ProcessFailure as failure:
+                future.set_exception(failure)
+                return future
+            if not ready:
+                self.waiters.append((future, dest, count))
+                return future
+        future.set_result(None)
+        return future
+
+    def grant(self, sender: int, count: int) -> None:
+        """
+        Ajoute les crédits rendus par un destinataire, et réveille les envois qui les attendaient.
+        """
+        with self.lock:
+            self.credits[sender] = self.credits.get(sender, self.window) + count
+            self._notify()
+
+    def consumed(self, messages: list[Message]) -> None:
+        """
+        Enregistre des messages retirés de la boîte aux lettres, et rend à leurs émetteurs les crédits dus, sauf au-delà de la marque haute.
+        """
+        if not self.window:
+            return
+        depth = len(self.com.mailbox)
+        with self.lock:
+            for message in messages:
+                if message.sender is not None:
+                    self.owed[message.sender] = self.owed.get(message.sender, 0) + 1
+            if self.paused and depth <= self.lowWatermark * self.capacity:
+                self.paused = False
+                returned = list(self.owed.items())
+            elif self.paused or depth >= self.highWatermark * self.capacity:
+                self.paused = True
+                returned = []
+            else:
+                batch = max(1, self.window // 2)
+                returned = [(sender, count) for sender, count in self.owed.items() if count >= batch]
+            for sender, _ in returned:
+                del self.owed[sender]
+        for sender, count in returned:
+            if sender == self.com.id:
+                self.grant(sender, count)
+            else:
+                self.com.router.post(CreditMessage(self.com.id, sender, count))
+
+    def renumber(self, removed: list[int], size: int) -> None:
+        """
+        Renumérote les crédits après le retrait de processus défaillants, et réveille les envois en attente :
+        ceux qui attendaient un processus retiré échouent, les diffusions n'attendent plus que les processus restants.
+        """
+        with self.lock:
+            shiftKeys(self.credits, removed, size)
+            shiftKeys(self.owed, removed, size)
+            self._notify()
+
+    def _recipients(self, dest: str | list[str] | None) -> range | tuple[int] | list[int]:
+        """
+        Retourne les IDs des destinataires d'un envoi. Lève ProcessFailure si l'unique destinataire n'est plus dans le système.
+        """
+        if dest is None:
+            return range(self.com.nbProcess)
+        if not isinstance(dest, str):
+            return [self.com.nameTable[name] for name in dest if name in self.com.nameTable]
+        id = self.com.nameTable.get(dest)
+        if id is None:
+            raise ProcessFailure(f"process {dest} failed")
+        return (id,)
+
+    def _available(self, dest: str | list[str] | None, count: int) -> bool:
+        """
+        Indique si count crédits sont disponibles auprès de chaque destinataire. Doit être appelé avec le verrou pris.
+        """
+        return all(self.credits.get(id, self.window) >= count for id in self._recipients(dest))
+
+    def _take(self, dest: str | list[str] | None, count: int) -> bool:
+        """
+        Prend count crédits auprès de chaque destinataire s'ils sont tous disponibles. Doit être appelé avec le verrou pris.
+        """
+        if not self._available(dest, count):
+            return False
+        for id in self._recipients(dest):
+            self.credits[id] = self.credits.get(id, self.window) - count
+        return True
+
+    def _notify(self) -> None:
+        """
+        Réveille les envois en attente de crédits et résout les Futures satisfaits. Doit être appelé avec le verrou pris.
+        """
+        self.available.notify_all()
+        waiters = []
+        for waiter in self.waiters:
+            future, dest, count = waiter
+            if future.cancelled():
+                continue
+            try:
+                if self._available(dest, count):
+                    future.set_result(None)
+                    continue
+            except ProcessFailure as failure:
+                future.set_exception(failure)
+                continue
+            waiters.append(waiter)
+        self.waiters = waiters
@@ -16,12 +16,17 @@ class LamportClock:
         self.semaphore = Lock()
         self.clock = 0
 
-    def inc_clock(self):
+    def inc_clock(self, count: int = 1) -> int:
         """
-        Incrémente la valeur de l'horloge Lamport de 1.
+        Incrémente la valeur de l'horloge Lamport de count, une fois par événement.
+        Args:
+            count (int): Nombre d'événements à compter.
+        Returns:
+            int: La nouvelle valeur de l'horloge, celle du dernier événement.
         """
         with self.semaphore:
-            self.clock += 1
+            self.clock += count
+            return self.clock
 
     def sync(self, other: int):
         """
@@ -1,11 +1,37 @@
-from time import sleep
-from Process import Process
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import tempfile
+from time import perf_counter, sleep
+import Log
+from AsyncCom import AsyncCom
+from Process import Process, play
+from Simulation import Simulation
+from SocketRouter import SocketRouter
 
-def launch(nbProcess, runningTime=5):
+def runProcess(name, nbProcess, directory, logLevel):
+    """Point d'entrée d'un processus OS hébergeant un unique Process, relié aux autres par un SocketRouter."""
+    Log.configure(logLevel)
+    Process(name, nbProcess, SocketRouter(directory)).waitStopped()
+
+def launch(nbProcess, runningTime=5, multiprocess=False, logLevel=logging.DEBUG):
     processes = []
 
+    if multiprocess:
+        context = multiprocessing.get_context("spawn")
+        with tempfile.TemporaryDirectory(prefix="info901-") as directory:
+            for i in range(nbProcess):
+                processes.append(context.Process(target=runProcess, args=("P"+str(i), nbProcess, directory, logLevel)))
+            for p in processes:
+                p.start()
+            for p in processes:
+                p.join()
+        return
+
+    Log.configure(logLevel)
     for i in range(nbProcess):
-        processes.append(Process("P"+str(i)))
+        processes.append(Process("P"+str(i), nbProcess))
 
     # sleep(runningTime)
 
@@ -15,10 +41,37 @@ def launch(nbProcess, runningTime=5):
     for p in processes:
         p.waitStopped()
 
+def simulate(nbProcess, seed=0, logLevel=logging.WARNING) -> Simulation:
+    """
+    Joue la partie de Process avec nbProcess AsyncCom dans une simulation déterministe en temps virtuel,
+    puis affiche la durée virtuelle et réelle, le nombre de messages livrés et l'empreinte de la simulation.
+    Deux simulations de même graine livrent les mêmes messages dans le même ordre, et ont donc la même empreinte.
+    """
+    Log.configure(logLevel)
+    simulation = Simulation(seed)
+
+    async def main():
+        await asyncio.gather(*(play(AsyncCom("P"+str(i), nbProcess, simulation.router())) for i in range(nbProcess)))
+
+    start = perf_counter()
+    simulation.run(main())
+    print(f"simulated {simulation.now():.3f}s in {perf_counter() - start:.3f}s, {simulation.delivered} messages delivered, digest {simulation.digest()}", flush=True)
+    return simulation
+
 if __name__ == '__main__':
 
     #bus = EventBus.getInstance()
-    
-    launch(nbProcess=3, runningTime=30)
 
-    #bus.stop()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Lance une partie entre processus communiquant par Com.")
+    parser.add_argument("--processes", type=int, default=3, help="nombre de processus")
+    parser.add_argument("--multiprocess", action="store_true", help="un processus OS par processus, reliés par des sockets Unix")
+    parser.add_argument("--simulate", action="store_true", help="simulation déterministe en temps virtuel")
+    parser.add_argument("--seed", type=int, default=0, help="graine de la simulation")
+    args = parser.parse_args()
+
+    if args.simulate:
+        simulate(args.processes, args.seed)
+    else:
+        launch(nbProcess=args.processes, runningTime=30, multiprocess=args.multiprocess)
+
+    #bus.stop()
@@ -0,0 +1,69 @@
+"""
+Journalisation des Com, par catégorie et par niveau, écrite hors du chemin critique.
+
+Chaque catégorie est un logger du module logging nommé "Com.<catégorie>", dont le niveau se règle séparément.
+Les messages sont formatés paresseusement (arguments de style %), si bien qu'un niveau désactivé ne coûte qu'un test de niveau.
+Une fois configure() appelé, les enregistrements retenus sont placés dans une file et écrits par un thread de fond,
+sans que les threads d'envoi ou de réception n'attendent le terminal ou le fichier.
+Sans configuration, seuls les avertissements et les erreurs sont affichés, sur la sortie d'erreur.
+"""
+
+from __future__ import annotations
+import atexit
+import logging
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+from typing import TextIO
+
+CATEGORIES = ("bootstrap", "messages", "sync", "barrier", "mutex", "failure", "reorg", "dispatcher", "scheduler")
+
+root = logging.getLogger("Com")
+listener: QueueListener | None = None
+queueHandler: QueueHandler | None = None
+
+def getLogger(category: str) -> logging.Logger:
+    """
+    Retourne le logger d'une catégorie.
+    Args:
+        category (str): Une des CATEGORIES.
+    """
+    return root.getChild(category)
+
+def configure(level: int | str = logging.INFO, levels: dict[str, int | str] | None = None, stream: TextIO | None = None) -> None:
+    """
+    Active l'écriture asynchrone des journaux et règle les niveaux. Peut être rappelé pour changer les niveaux.
+    Args:
+        level (int | str): Niveau par défaut de toutes les catégories, par exemple logging.DEBUG pour suivre chaque message.
+        levels (dict[str, int | str] | None): Niveaux propres à certaines catégories, qui remplacent le niveau par défaut.
+        stream (TextIO | None): Flux de sortie, sys.stdout par défaut.
+    """
+    global listener, queueHandler
+    root.setLevel(level)
+    for category in CATEGORIES:
+        getLogger(category).setLevel(logging.NOTSET)
+    for category, categoryLevel in (levels or {}).items():
+        getLogger(category).setLevel(categoryLevel)
+
+    if listener is None:
+        queue = SimpleQueue()
+        handler = logging.StreamHandler(stream if stream is not None else sys.stdout)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        listener = QueueListener(queue, handler)
+        listener.start()
+        queueHandler = QueueHandler(queue)
+        root.addHandler(queueHandler)
+        root.propagate = False
+        atexit.register(shutdown)
+
+def shutdown() -> None:
+    """
+    Écrit les enregistrements encore en file et arrête le thread d'écriture ; les journaux reviennent au comportement sans configuration.
+    """
+    global listener, queueHandler
+    if listener is not None:
+        root.removeHandler(queueHandler)
+        root.propagate = True
+        listener.stop()
+        listener = None
+        queueHandler = None
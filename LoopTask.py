@@ -1,27 +1,36 @@
-from threading import Thread, Event
-from time import sleep
+from threading import Event
 
-class LoopTask(Thread):
+from Scheduler import Scheduler
+
+class LoopTask:
     """
-    Thread exécutant périodiquement une tâche jusqu'à réception d'un signal d'arrêt.
+    Tâche exécutée périodiquement par un Scheduler, par défaut le Scheduler partagé, jusqu'à réception d'un signal d'arrêt.
+    Ne crée aucun thread : toutes les LoopTask de l'interpréteur sont exécutées par le thread du Scheduler.
 
     Args:
         repeatEvery (float | int): Intervalle de répétition en secondes entre chaque exécution de la tâche.
         callback (callable): Fonction à appeler à chaque itération.
         parameters (tuple): Paramètres à passer à la fonction callback.
         killEvent (Event): Événement utilisé pour arrêter la boucle.
+        scheduler (Scheduler | None): L'ordonnanceur exécutant la tâche, None pour le Scheduler partagé.
     """
 
-    def __init__(self, repeatEvery: float | int, callback, parameters, killEvent: Event):
-        super(LoopTask, self).__init__()
+    def __init__(self, repeatEvery: float | int, callback, parameters, killEvent: Event, scheduler: Scheduler | None = None):
         self.repeatEvery = repeatEvery
         self.callback = callback
         self.parameters = parameters
         self.killEvent = killEvent
-        self.start()
+        self.scheduler = scheduler if scheduler is not None else Scheduler.Instance()
+        self.task = self.scheduler.schedule(0, self.run, (), repeatEvery)
 
     def run(self):
-        """Exécute le callable stocké dans self.callback périodiquement jusqu'à ce que self.killEvent soit set."""
-        while not self.killEvent.is_set():
-            self.callback(*self.parameters)
-            self.killEvent.wait(self.repeatEvery)
\ No newline at end of file
+        """Exécute le callable stocké dans self.callback, ou annule la tâche si self.killEvent est set."""
+        if self.killEvent.is_set():
+            self.task.cancel()
+            return
+        self.callback(*self.parameters)
+
+    def join(self):
+        """Annule la tâche et attend la fin de son exécution en cours, s'il y en a une."""
+        self.task.cancel()
+        self.scheduler.wait(self.task)
@@ -1,17 +1,46 @@
+from collections import deque
+from copy import copy
+from concurrent.futures import Future
+import asyncio
+from time import monotonic
 from Message import Message
-from threading import RLock
+from threading import RLock, Condition
 
 class Mailbox:
     """
     Classe représentant une boîte aux lettres pour stocker et gérer les messages reçus par un processus.
-    Utilise un verrou pour garantir la sécurité des accès concurrents.
+    Utilise un verrou pour garantir la sécurité des accès concurrents, et une condition pour permettre la réception bloquante.
+
+    Les messages sont rangés dans une file globale (ordre d'arrivée) et dans une file par émetteur, qui partagent les mêmes entrées [message, retiré].
+    Une entrée retirée via l'une des files est seulement marquée, puis ignorée dans l'autre ; les files sont compactées
+    dès que les entrées marquées sont plus nombreuses que les messages présents, ce qui garde toutes les opérations en O(1) amorti
+    (hors réception par prédicat, qui parcourt la file concernée).
+    La réception peut aussi se faire sans bloquer de thread, via getFuture ou en itérant la boîte avec async for.
+
+    Attributs:
+        messages (deque[list]): File globale des entrées, dans l'ordre d'arrivée.
+        bySender (dict[int, deque[list]]): Files des entrées par émetteur.
+        size (int): Nombre de messages présents.
+        stale (int): Nombre d'entrées retirées mais encore présentes dans l'une des files.
+        lock (RLock): Verrou protégeant la boîte aux lettres.
+        notEmpty (Condition): Condition notifiée à chaque ajout de message.
+        waiters (deque[tuple[Future, int | None, callable | None]]): Futures en attente d'un message, avec leurs critères, dans l'ordre d'appel.
+        onTake (callable | None): Fonction appelée, verrou relâché, avec la liste des messages retirés de la boîte ou remis directement à un Future.
     """
-    def __init__(self):
+    def __init__(self, onTake=None):
         """
         Initialise une boîte aux lettres vide et un verrou réentrant pour la synchronisation.
+        Args:
+            onTake (callable | None): Fonction appelée avec les messages retirés, par exemple pour rendre des crédits à leurs émetteurs.
         """
-        self.messages: list[Message] = []
+        self.messages: deque[list] = deque()
+        self.bySender: dict[int, deque[list]] = {}
+        self.size = 0
+        self.stale = 0
         self.lock = RLock()
+        self.notEmpty = Condition(self.lock)
+        self.waiters: deque[tuple[Future, int | None, any]] = deque()
+        self.onTake = onTake
 
     def isEmpty(self) -> bool:
         """
@@ -20,24 +49,245 @@ class Mailbox:
             bool: True si la boîte est vide, False sinon.
         """
         with self.lock:
-            return len(self.messages) == 0
+            return self.size == 0
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self.size
 
     def getMessage(self) -> Message | None:
         """
-        Récupère et retire le premier message de la boîte aux lettres.
+        Récupère et retire le premier message de la boîte aux lettres, sans attendre.
         Returns:
             Message | None: Le message retiré ou None si la boîte est vide.
         """
         with self.lock:
-            if not self.isEmpty():
-                return self.messages.pop(0)
-            return None
+            message = self._take(None, None)
+        if message is not None:
+            self._taken([message])
+        return message
+
+    def get(self, timeout: float | None = None, sender: int | None = None, predicate=None) -> Message | None:
+        """
+        Récupère et retire le plus ancien message correspondant aux critères, en attendant son arrivée si besoin.
+        Args:
+            timeout (float | None): Temps d'attente maximal en secondes, None pour attendre indéfiniment.
+            sender (int | None): Si donné, seuls les messages de cet émetteur sont considérés.
+            predicate (callable | None): Si donné, seuls les messages pour lesquels predicate(message) est vrai sont considérés.
+        Returns:
+            Message | None: Le message retiré ou None si le délai a expiré.
+        """
+        deadline = None if timeout is None else monotonic() + timeout
+        with self.lock:
+            while True:
+                message = self._take(sender, predicate)
+                if message is not None:
+                    break
+                if deadline is None:
+                    self.notEmpty.wait()
+                else:
+                    remaining = deadline - monotonic()
+                    if remaining <= 0:
+                        return None
+                    self.notEmpty.wait(remaining)
+        self._taken([message])
+        return message
+
+    def getFuture(self, sender: int | None = None, predicate=None) -> Future:
+        """
+        Retire le plus ancien message correspondant aux critères, sans bloquer : le Future retourné est résolu avec ce message,
+        immédiatement s'il est déjà présent, sinon à son arrivée. Annuler le Future abandonne la réception.
+        Args:
+            sender (int | None): Si donné, seuls les messages de cet émetteur sont considérés.
+            predicate (callable | None): Si donné, seuls les messages pour lesquels predicate(message) est vrai sont considérés.
+        Returns:
+            Future: Le Future résolu avec le message retiré.
+        """
+        future = Future()
+        with self.lock:
+            message = self._take(sender, predicate)
+            if message is None:
+                self.waiters.append((future, sender, predicate))
+                return future
+        self._taken([message])
+        future.set_result(message)
+        return future
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Message:
+        """
+        Attend le prochain message sans bloquer la boucle d'événements, pour une lecture par async for.
+        """
+        return await asyncio.wrap_future(self.getFuture())
+
+    def drain(self, max_n: int | None = None) -> list[Message]:
+        """
+        Retire d'un coup, sous une seule prise du verrou, jusqu'à max_n messages dans l'ordre d'arrivée, sans attendre.
+        Args:
+            max_n (int | None): Nombre maximal de messages à retirer, None pour tous.
+        Returns:
+            list[Message]: Les messages retirés, éventuellement aucun.
+        """
+        batch = []
+        with self.lock:
+            while self.size > 0 and (max_n is None or len(batch) < max_n):
+                batch.append(self._take(None, None))
+        if batch:
+            self._taken(batch)
+        return batch
 
     def addMessage(self, message: Message) -> None:
         """
-        Ajoute un message à la boîte aux lettres.
+        Ajoute un message à la boîte aux lettres et réveille les lecteurs en attente.
+        Si un Future en attente correspond au message, il lui est remis directement sans passer par la boîte.
         Args:
             message (Message): Le message à ajouter.
         """
         with self.lock:
-            self.messages.append(message)
\ No newline at end of file
+            future = self._add(message)
+        if future is not None:
+            self._taken([message])
+            future.set_result(message)
+
+    def addMessages(self, messages: list[Message]) -> None:
+        """
+        Ajoute plusieurs messages d'un coup, dans l'ordre, sous une seule prise du verrou.
+        Args:
+            messages (list[Message]): Les messages à ajouter.
+        """
+        with self.lock:
+            handed = [(future, message) for message in messages if (future := self._add(message)) is not None]
+        if handed:
+            self._taken([message for _, message in handed])
+        for future, message in handed:
+            future.set_result(message)
+
+    def renumber(self, translate, dropRemoved: bool, failure: Exception) -> None:
+        """
+        Renumérote les émetteurs des messages présents et des réceptions en attente après le retrait de processus défaillants.
+        Les messages dont l'émetteur change sont copiés, l'original pouvant être partagé avec d'autres boîtes aux lettres.
+        Args:
+            translate (callable): Fonction retournant le nouvel ID d'un émetteur, ou None s'il a été retiré.
+            dropRemoved (bool): Si vrai, les messages des processus retirés sont supprimés ; sinon ils sont conservés, d'émetteur None.
+            failure (Exception): Exception transmise aux Futures qui attendaient un message d'un processus retiré.
+        """
+        failed = []
+        with self.lock:
+            entries = [entry for entry in self.messages if not entry[1]]
+            self.messages = deque()
+            for entry in entries:
+                message = entry[0]
+                if message.sender is not None:
+                    sender = translate(message.sender)
+                    if sender is None and dropRemoved:
+                        self.size -= 1
+                        continue
+                    if sender != message.sender:
+                        message = copy(message)
+                        message.sender = sender
+                self.messages.append([message, False])
+            self.bySender = {}
+            for entry in self.messages:
+                self.bySender.setdefault(entry[0].sender, deque()).append(entry)
+            self.stale = 0
+
+            waiters = deque()
+            for future, sender, predicate in self.waiters:
+                if sender is not None:
+                    sender = translate(sender)
+                    if sender is None:
+                        failed.append(future)
+                        continue
+                waiters.append((future, sender, predicate))
+            self.waiters = waiters
+        for future in failed:
+            if future.set_running_or_notify_cancel():
+                future.set_exception(failure)
+
+    def _taken(self, messages: list[Message]) -> None:
+        """
+        Signale des messages retirés à onTake, s'il est donné. Doit être appelé verrou relâché.
+        """
+        if self.onTake is not None:
+            self.onTake(messages)
+
+    def _add(self, message: Message) -> Future | None:
+        """
+        Range un message dans les files et réveille les lecteurs en attente, ou retourne le Future en attente auquel le remettre.
+        Doit être appelé avec le verrou pris.
+        """
+        future = self._waiterFor(message)
+        if future is None:
+            entry = [message, False]
+            self.messages.append(entry)
+            self.bySender.setdefault(message.sender, deque()).append(entry)
+            self.size += 1
+            self.notEmpty.notify_all()
+        return future
+
+    def _waiterFor(self, message: Message) -> Future | None:
+        """
+        Retire et retourne le plus ancien Future en attente qui accepte le message, en écartant les Futures annulés.
+        Doit être appelé avec le verrou pris.
+        """
+        found = None
+        cancelled = False
+        for waiter in self.waiters:
+            future, sender, predicate = waiter
+            if future.cancelled():
+                cancelled = True
+            elif (sender is None or sender == message.sender) and (predicate is None or predicate(message)) and future.set_running_or_notify_cancel():
+                found = waiter
+                break
+        if cancelled or found is not None:
+            self.waiters = deque(waiter for waiter in self.waiters if waiter is not found and not waiter[0].cancelled())
+        return found[0] if found is not None else None
+
+    def _take(self, sender: int | None, predicate) -> Message | None:
+        """
+        Retire le plus ancien message correspondant aux critères. Doit être appelé avec le verrou pris.
+        """
+        if sender is None:
+            queue = self.messages
+        else:
+            queue = self.bySender.get(sender)
+            if queue is None:
+                return None
+
+        while queue and queue[0][1]:
+            queue.popleft()
+            self.stale -= 1
+
+        entry = None
+        if predicate is None:
+            if queue:
+                entry = queue.popleft()
+        else:
+            for i, candidate in enumerate(queue):
+                if not candidate[1] and predicate(candidate[0]):
+                    entry = candidate
+                    del queue[i]
+                    break
+        if entry is None:
+            return None
+
+        entry[1] = True
+        self.size -= 1
+        self.stale += 1
+        if sender is not None and not queue:
+            del self.bySender[sender]
+        if self.stale > self.size:
+            self._compact()
+        return entry[0]
+
+    def _compact(self) -> None:
+        """
+        Retire des files toutes les entrées marquées comme retirées. Doit être appelé avec le verrou pris.
+        """
+        self.messages = deque(entry for entry in self.messages if not entry[1])
+        self.bySender = {}
+        for entry in self.messages:
+            self.bySender.setdefault(entry[0].sender, deque()).append(entry)
+        self.stale = 0
@@ -0,0 +1,139 @@
+from __future__ import annotations
+from bisect import bisect_left
+
+class ProcessFailure(Exception):
+    """
+    Levée par une opération en cours qui impliquait un processus retiré du système après sa défaillance :
+    envoi synchronisé vers lui, réception synchronisée depuis lui, ou barrière en cours.
+    """
+
+class BootstrapFailure(Exception):
+    """
+    Levée à l'initialisation d'un Com lorsque les processus annoncés ne correspondent pas au nombre de processus attendus :
+    il en manque encore au bout de Com.bootstrapTimeout secondes, ou il s'en est annoncé davantage.
+    """
+
+def renumber(id: int, removed: list[int]) -> int | None:
+    """
+    Retourne le nouvel ID d'un processus après le retrait des processus d'IDs removed.
+    Args:
+        id (int): L'ancien ID.
+        removed (list[int]): Les anciens IDs retirés, triés.
+    Returns:
+        int | None: Le nouvel ID, ou None si le processus fait partie des retirés.
+    """
+    position = bisect_left(removed, id)
+    if position < len(removed) and removed[position] == id:
+        return None
+    return id - position
+
+def shiftKeys(table: dict[int, any], removed: list[int], size: int) -> None:
+    """
+    Renumérote en place une table indexée par ID après le retrait des processus d'IDs removed, dans un système de size processus.
+    Seules les entrées d'ID supérieur ou égal au premier retiré sont touchées.
+    """
+    shift = 0
+    for id in range(removed[0], size):
+        if shift < len(removed) and removed[shift] == id:
+            table.pop(id, None)
+            shift += 1
+        elif id in table:
+            table[id - shift] = table.pop(id)
+
+class Membership:
+    """
+    Composition du système : index bidirectionnel entre noms et IDs des processus, et historique des retraits.
+    Les IDs restent denses (de 0 à N-1, dans l'ordre des noms) : au retrait de processus défaillants, seuls les processus
+    d'ID supérieur au premier retiré sont renumérotés. Chaque retrait ouvre une nouvelle époque, et l'historique des IDs retirés
+    permet de traduire les IDs portés par un message émis lors d'une époque antérieure.
+    Elle tient aussi l'index des groupes de diffusion, par nom de processus, qui n'est donc pas touché par la renumérotation.
+
+    Attributs:
+        nameTable (dict[str, int]): Table des noms des processus vers leurs IDs.
+        idTable (list[str]): Table des IDs des processus vers leurs noms.
+        epoch (int): Numéro de la composition courante, incrémenté à chaque retrait.
+        removals (list[list[int]]): Anciens IDs retirés, triés, au passage de chaque époque à la suivante.
+        groups (dict[str, set[str]]): Noms des membres de chaque groupe, par nom de groupe ; un groupe vide n'y figure pas.
+    """
+
+    def __init__(self):
+        self.nameTable: dict[str, int] = {}
+        self.idTable: list[str] = []
+        self.epoch = 0
+        self.removals: list[list[int]] = []
+        self.groups: dict[str, set[str]] = {}
+
+    def build(self, names) -> None:
+        """
+        Attribue les IDs dans l'ordre des noms.
+        Args:
+            names (iterable[str]): Les noms des processus du système.
+        """
+        self.idTable[:] = sorted(names)
+        self.nameTable.clear()
+        for id, name in enumerate(self.idTable):
+            self.nameTable[name] = id
+
+    def nameOf(self, id: int) -> str:
+        """
+        Retourne le nom du processus d'ID donné.
+        """
+        return self.idTable[id]
+
+    def remove(self, names) -> list[int]:
+        """
+        Retire des processus du système et passe à l'époque suivante.
+        Args:
+            names (iterable[str]): Les noms des processus à retirer ; les noms inconnus sont ignorés.
+        Returns:
+            list[int]: Les anciens IDs des processus retirés, triés.
+        """
+        names = set(names)
+        removed = sorted(self.nameTable.pop(name) for name in names if name in self.nameTable)
+        if not removed:
+            return removed
+        for name in names:
+            for group in list(self.groups):
+                self.leave(group, name)
+        for id in reversed(removed):
+            del self.idTable[id]
+        for id in range(removed[0], len(self.idTable)):
+            self.nameTable[self.idTable[id]] = id
+        self.removals.append(removed)
+        self.epoch += 1
+        return removed
+
+    def translate(self, id: int, epoch: int) -> int | None:
+        """
+        Traduit un ID d'une époque antérieure dans l'époque courante.
+        Returns:
+            int | None: L'ID courant, ou None si le processus a été retiré depuis.
+        """
+        for removed in self.removals[epoch:]:
+            id = renumber(id, removed)
+            if id is None:
+                return None
+        return id
+
+    def join(self, group: str, name: str) -> None:
+        """
+        Ajoute un processus aux membres d'un groupe, créé s'il n'existe pas.
+        """
+        self.groups.setdefault(group, set()).add(name)
+
+    def leave(self, group: str, name: str) -> None:
+        """
+        Retire un processus des membres d'un groupe, supprimé s'il devient vide.
+        """
+        members = self.groups.get(group)
+        if members is None:
+            return
+        members.discard(name)
+        if not members:
+            del self.groups[group]
+
+    def members(self, group: str) -> list[str]:
+        """
+        Retourne les noms des membres d'un groupe, triés (donc dans l'ordre de leurs IDs), aucun pour un groupe inconnu.
+        """
+        return sorted(self.groups.get(group, ()))
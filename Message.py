@@ -1,5 +1,3 @@
-from random import randint
-
 class Message:
     """
     Classe de base pour tous les messages échangés entre processus.
@@ -11,14 +9,22 @@ class Message:
         clock (int): Horloge logique associée au message.
         isSystem (bool): Indique si le message est un message système.
         ackNeeded (bool): Indique si le message nécessite un accusé de réception (ACK).
+        correlationId (int | None): Identifiant de l'envoi, renvoyé par l'ACK pour l'associer à l'envoi qu'il acquitte.
+
+    Attributs:
+        epoch (int): Époque de la composition du système dans laquelle sender et recipient sont exprimés, fixée par la couche de routage à l'envoi.
     """
-    def __init__(self, sender: int, recipient: int, content: any, clock: int, isSystem=False, ackNeeded=False):
+    __slots__ = ("sender", "recipient", "content", "isSystem", "clock", "ackNeeded", "correlationId", "epoch")
+
+    def __init__(self, sender: int, recipient: int, content: any, clock: int, isSystem=False, ackNeeded=False, correlationId: int | None = None):
         self.sender = sender
         self.recipient = recipient
         self.content = content
         self.isSystem = isSystem
         self.clock = clock
         self.ackNeeded = ackNeeded
+        self.correlationId = correlationId
+        self.epoch = 0
 
     def getSender(self) -> int:
         return self.sender
@@ -28,13 +34,17 @@ class Message:
     
 class AutoIdMessage(Message):
     """
-    Message système utilisé pour l'attribution automatique d'identifiants aux processus.
+    Message système utilisé pour l'annonce des processus lors de l'attribution automatique d'identifiants.
 
     Args:
-        content (tuple[int, str]): Tuple contenant un nombre aléatoire et le nom du processus.
+        name (str): Nom du processus qui s'annonce.
+        reply (bool): Indique si le message est une réponse directe à l'annonce d'un autre processus, qui n'appelle pas de réponse.
     """
-    def __init__(self, content: tuple[int, str]):
-        super(AutoIdMessage, self).__init__(None, None, content, 0, True)
+    __slots__ = ("reply",)
+
+    def __init__(self, name: str, reply: bool = False):
+        super(AutoIdMessage, self).__init__(None, None, name, 0, True)
+        self.reply = reply
 
 class AckMessage(Message):
     """
@@ -43,9 +53,54 @@ class AckMessage(Message):
     Args:
         sender (int): Identifiant du processus émetteur.
         recipient (int): Identifiant du processus récepteur.
+        correlationId (int | None): Identifiant de l'envoi acquitté.
     """
-    def __init__(self, sender: int, recipient: int):
-        super(AckMessage, self).__init__(sender, recipient, None, 0, True)
+    __slots__ = ()
+
+    def __init__(self, sender: int, recipient: int, correlationId: int | None = None):
+        super(AckMessage, self).__init__(sender, recipient, None, 0, True, correlationId=correlationId)
+
+class BatchMessage(Message):
+    """
+    Enveloppe regroupant plusieurs messages asynchrones d'un même émetteur vers une même destination.
+    Les messages portent les horloges consécutives firstClock, firstClock + 1, ..., dans leur ordre d'envoi.
+
+    Args:
+        sender (int): Identifiant du processus émetteur.
+        recipient (int | None): Identifiant du processus récepteur, None pour une diffusion.
+        contents (list[any]): Contenus des messages, dans l'ordre d'envoi.
+        firstClock (int): Horloge logique du premier message.
+    """
+    __slots__ = ("firstClock",)
+
+    def __init__(self, sender: int, recipient: int | None, contents: list[any], firstClock: int):
+        super(BatchMessage, self).__init__(sender, recipient, contents, firstClock + len(contents) - 1)
+        self.firstClock = firstClock
+
+    def unpack(self) -> list[Message]:
+        """
+        Retourne les messages contenus dans l'enveloppe, dans l'ordre d'envoi et avec leur propre horloge.
+        """
+        return [Message(self.sender, self.recipient, content, self.firstClock + i) for i, content in enumerate(self.content)]
+
+class CausalMessage(Message):
+    """
+    Message diffusé en ordre causal, portant la part de l'horloge vectorielle de l'émetteur modifiée depuis sa diffusion précédente.
+
+    Args:
+        sender (int): Identifiant du processus émetteur.
+        content (any): Contenu du message.
+        clock (int): Horloge logique associée au message.
+        delta (dict[int, int]): Entrées modifiées de l'horloge vectorielle, dont le numéro de séquence de l'émetteur.
+    """
+    __slots__ = ()
+
+    def __init__(self, sender: int, content: any, clock: int, delta: dict[int, int]):
+        super(CausalMessage, self).__init__(sender, None, (content, delta), clock)
+
+    @property
+    def delta(self) -> dict[int, int]:
+        return self.content[1]
 
 class SyncMessage(Message):
     """
@@ -56,9 +111,12 @@ class SyncMessage(Message):
         recipient (int): Identifiant du processus récepteur.
         content (any): Contenu du message.
         clock (int): Horloge logique associée au message.
+        correlationId (int | None): Identifiant de l'envoi, renvoyé par l'ACK.
     """
-    def __init__(self, sender: int, recipient: int, content: any, clock: int):
-        super(SyncMessage, self).__init__(sender, recipient, content, clock, ackNeeded=True)
+    __slots__ = ()
+
+    def __init__(self, sender: int, recipient: int, content: any, clock: int, correlationId: int | None = None):
+        super(SyncMessage, self).__init__(sender, recipient, content, clock, ackNeeded=True, correlationId=correlationId)
 
 class TokenMessage(Message):
     """
@@ -67,9 +125,58 @@ class TokenMessage(Message):
     Args:
         sender (int): Identifiant du processus émetteur.
         recipient (int): Identifiant du processus récepteur.
+        state (any): État porté par le token, utilisé par l'exclusion mutuelle à la demande.
+        handoff (int): Nombre de transmissions du token, qui permet de savoir après une défaillance qui l'a transmis en dernier.
+        resource (str | None): Nom de la section critique du token, None pour la section globale.
     """
-    def __init__(self, sender: int, recipient: int):
-        super(TokenMessage, self).__init__(sender, recipient, randint(0,100), 0, True)
+    __slots__ = ()
+
+    def __init__(self, sender: int, recipient: int, state: any = None, handoff: int = 0, resource: str | None = None):
+        super(TokenMessage, self).__init__(sender, recipient, (handoff, state, resource), 0, True)
+
+class TokenRequestMessage(Message):
+    """
+    Message système diffusé par un processus qui demande le token de l'exclusion mutuelle à la demande.
+
+    Args:
+        sender (int): Identifiant du processus émetteur.
+        number (int): Numéro de la requête.
+        resource (str | None): Nom de la section critique demandée, None pour la section globale.
+        shared (bool): True pour un accès partagé, False pour un accès exclusif.
+    """
+    __slots__ = ()
+
+    def __init__(self, sender: int, number: int, resource: str | None = None, shared: bool = False):
+        super(TokenRequestMessage, self).__init__(sender, None, (number, resource, shared), 0, True)
+
+class SharedGrantMessage(Message):
+    """
+    Message système par lequel le détenteur du token d'une section critique accorde un accès partagé à un demandeur, sans lui céder le token.
+
+    Args:
+        sender (int): Identifiant du processus émetteur, détenteur du token.
+        recipient (int): Identifiant du processus demandeur.
+        resource (str | None): Nom de la section critique, None pour la section globale.
+        number (int): Numéro de la requête satisfaite.
+    """
+    __slots__ = ()
+
+    def __init__(self, sender: int, recipient: int, resource: str | None, number: int):
+        super(SharedGrantMessage, self).__init__(sender, recipient, (resource, number), 0, True)
+
+class SharedReleaseMessage(Message):
+    """
+    Message système diffusé par un processus qui termine un accès partagé à une section critique.
+
+    Args:
+        sender (int): Identifiant du processus émetteur.
+        resource (str | None): Nom de la section critique, None pour la section globale.
+        number (int): Numéro de la requête dont l'accès se termine.
+    """
+    __slots__ = ()
+
+    def __init__(self, sender: int, resource: str | None, number: int):
+        super(SharedReleaseMessage, self).__init__(sender, None, (resource, number), 0, True)
 
 class JoinMessage(Message):
     """
@@ -77,9 +184,14 @@ class JoinMessage(Message):
 
     Args:
         sender (int): Identifiant du processus émetteur.
+        recipient (int): Identifiant du processus récepteur.
+        generation (int): Numéro de la barrière.
+        round (int): Tour de la barrière de dissémination.
     """
-    def __init__(self, sender: int):
-        super(JoinMessage, self).__init__(sender, None, None, 0, True)
+    __slots__ = ()
+
+    def __init__(self, sender: int, recipient: int, generation: int, round: int):
+        super(JoinMessage, self).__init__(sender, recipient, (generation, round), 0, True)
 
 class HeartbitMessage(Message):
     """
@@ -87,17 +199,111 @@ class HeartbitMessage(Message):
 
     Args:
         sender (int): Identifiant du processus émetteur.
+        recipient (int): Identifiant du processus qui surveille l'émetteur.
     """
-    def __init__(self, sender: int):
-        super(HeartbitMessage,self).__init__(sender, None, None, 0, True)
+    __slots__ = ()
+
+    def __init__(self, sender: int, recipient: int):
+        super(HeartbitMessage,self).__init__(sender, recipient, None, 0, True)
 
 class ReorgMessage(Message):
     """
-    Message système pour indiquer une réorganisation suite à la détection de processus défaillants.
+    Message système diffusé par le coordinateur pour retirer du système des processus défaillants.
+
+    Args:
+        sender (int): Identifiant du processus émetteur.
+        fails (list[str]): Noms des processus défaillants.
+        epoch (int): Époque de la composition du système qui résulte du retrait.
+    """
+    __slots__ = ()
+
+    def __init__(self, sender: int, fails: list[str], epoch: int):
+        super(ReorgMessage,self).__init__(sender, None, (epoch, fails), 0, True)
+
+class SuspicionMessage(Message):
+    """
+    Message système par lequel un processus signale au coordinateur les processus qu'il suspecte d'être défaillants.
+
+    Args:
+        sender (int): Identifiant du processus émetteur.
+        recipient (int): Identifiant du coordinateur.
+        fails (list[str]): Noms des processus suspectés.
+    """
+    __slots__ = ()
+
+    def __init__(self, sender: int, recipient: int, fails: list[str]):
+        super(SuspicionMessage, self).__init__(sender, recipient, fails, 0, True)
+
+class TokenStatusMessage(Message):
+    """
+    Message système envoyé au coordinateur après une réorganisation, décrivant ce que le processus sait du token.
 
     Args:
         sender (int): Identifiant du processus émetteur.
-        fails (list[int]): Liste des identifiants des processus défaillants.
+        recipient (int): Identifiant du coordinateur.
+        report (tuple): (époque, état de chaque token connu du processus), l'état d'un token étant indexé par nom de section critique
+            (None pour la section globale) : (détient le token, dernière transmission connue, nom du destinataire de la dernière
+            transmission émise, numéro de la dernière requête, attend le token, numéro de l'accès partagé en cours ou 0).
+    """
+    __slots__ = ()
+
+    def __init__(self, sender: int, recipient: int, report: tuple):
+        super(TokenStatusMessage, self).__init__(sender, recipient, report, 0, True)
+
+class CreditMessage(Message):
+    """
+    Message système par lequel un processus rend à un émetteur les crédits de ses messages retirés de la boîte aux lettres.
+
+    Args:
+        sender (int): Identifiant du processus émetteur, dont la boîte aux lettres s'est libérée.
+        recipient (int): Identifiant du processus à qui les crédits sont rendus.
+        credits (int): Nombre de crédits rendus.
     """
-    def __init__(self, sender: int, fails: list[int]):
-        super(ReorgMessage,self).__init__(sender, None, fails, 0, True)
\ No newline at end of file
+    __slots__ = ()
+
+    def __init__(self, sender: int, recipient: int, credits: int):
+        super(CreditMessage, self).__init__(sender, recipient, credits, 0, True)
+
+class ReleaseMessage(Message):
+    """
+    Message système par lequel un processus signale au créateur d'un segment de mémoire partagée qu'il n'en utilise plus le contenu.
+
+    Args:
+        sender (int): Identifiant du processus émetteur.
+        segment (str): Le nom du segment libéré.
+        name (str): Le nom du processus émetteur, dont la référence au segment est retirée.
+    """
+    __slots__ = ()
+
+    def __init__(self, sender: int, segment: str, name: str):
+        super(ReleaseMessage, self).__init__(sender, None, (segment, name), 0, True)
+
+class GroupMessage(Message):
+    """
+    Message système diffusé par un processus qui entre dans un groupe de diffusion ou le quitte.
+
+    Args:
+        sender (int): Identifiant du processus émetteur.
+        group (str): Le nom du groupe.
+        joined (bool): True si le processus entre dans le groupe, False s'il le quitte.
+    """
+    __slots__ = ()
+
+    def __init__(self, sender: int, group: str, joined: bool):
+        super(GroupMessage, self).__init__(sender, None, (group, joined), 0, True)
+
+class CollectiveMessage(Message):
+    """
+    Message système portant la valeur échangée à une étape d'une opération collective (bcast, reduce, allreduce, scatter, gather).
+
+    Args:
+        sender (int): Identifiant du processus émetteur.
+        recipient (int): Identifiant du processus récepteur.
+        generation (int): Numéro de l'opération collective.
+        step (int): Numéro de l'étape de l'opération.
+        value (any): La valeur transmise.
+    """
+    __slots__ = ()
+
+    def __init__(self, sender: int, recipient: int, generation: int, step: int, value: any):
+        super(CollectiveMessage, self).__init__(sender, recipient, (generation, step, value), 0, True)
@@ -0,0 +1,208 @@
+from __future__ import annotations
+import json
+from threading import Lock
+from time import monotonic
+
+class Histogram:
+    """
+    Histogramme de latences à précision relative constante, à la manière d'un HdrHistogram.
+    Les valeurs sont enregistrées en microsecondes dans des intervalles dont la largeur double à chaque puissance de deux
+    au-delà de 2**subBucketBits, ce qui borne l'erreur relative des percentiles à 2**-subBucketBits (moins de 1%),
+    pour une mémoire proportionnelle au logarithme de l'étendue des valeurs.
+
+    Args:
+        subBucketBits (int): Nombre de bits significatifs conservés pour chaque valeur.
+
+    Attributs:
+        counts (dict[int, int]): Nombre de valeurs par intervalle, indexé par la borne inférieure de l'intervalle.
+        count (int): Nombre de valeurs enregistrées.
+        total (int): Somme des valeurs enregistrées.
+        min (int | None): Plus petite valeur enregistrée.
+        max (int | None): Plus grande valeur enregistrée.
+        lock (Lock): Mutex protégeant l'histogramme.
+    """
+
+    def __init__(self, subBucketBits: int = 7):
+        self.subBucketBits = subBucketBits
+        self.counts: dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.min: int | None = None
+        self.max: int | None = None
+        self.lock = Lock()
+
+    def record(self, seconds: float) -> None:
+        """
+        Enregistre une durée.
+        Args:
+            seconds (float): La durée, en secondes.
+        """
+        value = max(0, int(seconds * 1_000_000))
+        shift = max(0, value.bit_length() - self.subBucketBits)
+        bucket = value >> shift << shift
+        with self.lock:
+            self.counts[bucket] = self.counts.get(bucket, 0) + 1
+            self.count += 1
+            self.total += value
+            if self.min is None or value < self.min:
+                self.min = value
+            if self.max is None or value > self.max:
+                self.max = value
+
+    def percentile(self, percent: float) -> float | None:
+        """
+        Retourne la valeur en dessous de laquelle se trouvent percent % des valeurs enregistrées.
+        Returns:
+            float | None: La valeur en millisecondes, ou None si l'histogramme est vide.
+        """
+        with self.lock:
+            return self._percentile(percent)
+
+    def _percentile(self, percent: float) -> float | None:
+        """Calcule un percentile. Doit être appelé avec le verrou pris."""
+        if self.count == 0:
+            return None
+        rank = max(1, round(self.count * percent / 100))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return min(max(bucket, self.min), self.max) / 1000
+        return self.max / 1000
+
+    def snapshot(self) -> dict:
+        """
+        Retourne le résumé de l'histogramme : nombre de valeurs, minimum, moyenne, percentiles et maximum, en millisecondes.
+        """
+        with self.lock:
+            if self.count == 0:
+                return {"count": 0}
+            return {
+                "count": self.count,
+                "min": self.min / 1000,
+                "mean": self.total / self.count / 1000,
+                "p50": self._percentile(50),
+                "p90": self._percentile(90),
+                "p99": self._percentile(99),
+                "p999": self._percentile(99.9),
+                "max": self.max / 1000,
+            }
+
+class Metrics:
+    """
+    Métriques d'un Com : compteurs, histogrammes de latences et jauges, consultables par snapshot ou exportables en JSON.
+
+    Compteurs tenus par les couches de routage :
+        sent.<Type> / received.<Type>: Messages postés et livrés, par type de message (une diffusion compte pour un envoi).
+        dropped: Messages livrés à un Com qui n'en est pas le destinataire.
+        bytesSent / bytesReceived: Octets transmis, pour les transports entre processus OS.
+    Histogrammes tenus par le Com : ackRtt, tokenWait, barrierWait et bootstrap.
+
+    Args:
+        now (callable): Horloge de référence, monotonic par défaut.
+
+    Attributs:
+        createdAt (float): Instant de création, début de la mesure du temps d'initialisation.
+        counters (dict[str, int]): Compteurs, par nom.
+        histograms (dict[str, Histogram]): Histogrammes, par nom, créés à leur première utilisation.
+        gauges (dict[str, callable]): Fonctions retournant la valeur courante de chaque jauge.
+        lock (Lock): Mutex protégeant les compteurs et la création des histogrammes.
+
+    Class Attributes:
+        sentNames (dict[type, str]): Nom du compteur sent.<Type> de chaque type de message.
+        receivedNames (dict[type, str]): Nom du compteur received.<Type> de chaque type de message.
+    """
+    sentNames: dict[type, str] = {}
+    receivedNames: dict[type, str] = {}
+
+    def __init__(self, now=monotonic):
+        self.createdAt = now()
+        self.counters: dict[str, int] = {}
+        self.histograms: dict[str, Histogram] = {}
+        self.gauges: dict[str, any] = {}
+        self.lock = Lock()
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        """
+        Incrémente un compteur.
+        """
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def countSent(self, message) -> None:
+        """
+        Compte un message posté. Appelé pour chaque message : le nom du compteur est calculé une fois par type,
+        et le verrou est pris sans bloc with, plus coûteux.
+        """
+        name = Metrics.sentNames.get(message.__class__)
+        if name is None:
+            name = Metrics.sentNames[message.__class__] = "sent." + message.__class__.__name__
+        self.lock.acquire()
+        try:
+            self.counters[name] = self.counters.get(name, 0) + 1
+        finally:
+            self.lock.release()
+
+    def countReceived(self, message) -> None:
+        """Compte un message livré, comme countSent."""
+        name = Metrics.receivedNames.get(message.__class__)
+        if name is None:
+            name = Metrics.receivedNames[message.__class__] = "received." + message.__class__.__name__
+        self.lock.acquire()
+        try:
+            self.counters[name] = self.counters.get(name, 0) + 1
+        finally:
+            self.lock.release()
+
+    def histogram(self, name: str) -> Histogram:
+        """
+        Retourne l'histogramme de nom donné, en le créant si besoin.
+        """
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self.lock:
+                histogram = self.histograms.setdefault(name, Histogram())
+        return histogram
+
+    def record(self, name: str, seconds: float) -> None:
+        """
+        Enregistre une durée dans l'histogramme de nom donné.
+        """
+        self.histogram(name).record(seconds)
+
+    def gauge(self, name: str, function) -> None:
+        """
+        Déclare une jauge, dont la valeur est lue à chaque snapshot.
+        Args:
+            name (str): Nom de la jauge.
+            function (callable): Fonction sans argument retournant la valeur courante.
+        """
+        self.gauges[name] = function
+
+    def snapshot(self) -> dict:
+        """
+        Retourne l'état courant de toutes les métriques.
+        Returns:
+            dict: {"counters": {...}, "histograms": {nom: résumé en millisecondes}, "gauges": {...}}.
+        """
+        with self.lock:
+            counters = dict(self.counters)
+            histograms = dict(self.histograms)
+        return {
+            "counters": counters,
+            "histograms": {name: histogram.snapshot() for name, histogram in histograms.items()},
+            "gauges": {name: function() for name, function in self.gauges.items()},
+        }
+
+    def toJson(self, **kwargs) -> str:
+        """
+        Retourne le snapshot des métriques au format JSON ; les arguments sont transmis à json.dumps.
+        """
+        return json.dumps(self.snapshot(), **kwargs)
+
+    def dump(self, path: str) -> None:
+        """
+        Écrit le snapshot des métriques au format JSON dans un fichier.
+        """
+        with open(path, "w") as file:
+            file.write(self.toJson(indent=2))
@@ -0,0 +1,83 @@
+from collections import deque
+from math import exp, log10, sqrt
+
+class PhiAccrualDetector:
+    """
+    Détecteur de défaillance à accumulation (phi accrual) : plutôt qu'un verdict vivant/mort à seuil fixe,
+    il donne pour chaque processus surveillé un niveau de suspicion phi, qui croît avec le temps écoulé depuis
+    le dernier signe de vie, relativement à la distribution des intervalles observés jusque-là.
+    phi = 1 correspond à 10% de chances de se tromper en déclarant le processus mort, phi = 2 à 1%, phi = 3 à 0.1%, etc.
+
+    Args:
+        table (dict[int, float]): Table des derniers instants de réception, mise à jour par le détecteur.
+        expectedInterval (float): Intervalle maximal attendu entre deux signes de vie, utilisé comme moyenne minimale.
+        minStdDeviation (float): Écart type minimal, pour ne pas suspecter au moindre retard quand les intervalles sont très réguliers.
+        windowSize (int): Nombre d'intervalles conservés par processus.
+
+    Attributs:
+        table (dict[int, float]): Table des derniers instants de réception.
+        intervals (dict[int, deque[float]]): Derniers intervalles observés entre deux signes de vie, par processus.
+    """
+
+    def __init__(self, table: dict[int, float], expectedInterval: float, minStdDeviation: float, windowSize: int = 100):
+        self.table = table
+        self.expectedInterval = expectedInterval
+        self.minStdDeviation = minStdDeviation
+        self.windowSize = windowSize
+        self.intervals: dict[int, deque[float]] = {}
+
+    def watch(self, id: int, now: float) -> None:
+        """
+        Commence à surveiller un processus, comme s'il venait de donner signe de vie.
+        Args:
+            id (int): ID du processus.
+            now (float): Instant courant.
+        """
+        self.table[id] = now
+        self.intervals[id] = deque(maxlen=self.windowSize)
+
+    def heartbeat(self, id: int, now: float) -> None:
+        """
+        Enregistre un signe de vie d'un processus surveillé. Les processus non surveillés sont ignorés.
+        Args:
+            id (int): ID du processus.
+            now (float): Instant de réception.
+        """
+        last = self.table.get(id)
+        if last is None:
+            return
+        self.intervals[id].append(now - last)
+        self.table[id] = now
+
+    def phi(self, id: int, now: float) -> float:
+        """
+        Calcule le niveau de suspicion d'un processus surveillé.
+        Args:
+            id (int): ID du processus.
+            now (float): Instant courant.
+        Returns:
+            float: Le niveau de suspicion phi, 0 pour un processus non surveillé.
+        """
+        last = self.table.get(id)
+        if last is None:
+            return 0.0
+        intervals = self.intervals[id]
+        mean = sum(intervals) / len(intervals) if intervals else self.expectedInterval
+        variance = sum((x - mean) ** 2 for x in intervals) / len(intervals) if intervals else 0.0
+        mean = max(mean, self.expectedInterval)
+        std = max(sqrt(variance), self.minStdDeviation)
+
+        y = (now - last - mean) / std
+        e = exp(-y * (1.5976 + 0.070566 * y * y))
+        if y > 0:
+            return -log10(e / (1.0 + e))
+        return -log10(1.0 - 1.0 / (1.0 + e))
+
+    def remove(self, id: int) -> None:
+        """
+        Arrête de surveiller un processus.
+        Args:
+            id (int): ID du processus.
+        """
+        self.table.pop(id, None)
+        self.intervals.pop(id, None)
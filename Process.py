@@ -1,7 +1,5 @@
 from threading import Lock, Thread
 
-from time import sleep
-
 from Com import Com
 
 class Process(Thread):
@@ -10,6 +8,8 @@ class Process(Thread):
 
     Args:
         name (str): Nom du processus (ex: "P0", "P1", "P2").
+        expectedProcesses (int | None): Nombre de processus attendus, transmis au Com pour accélérer son initialisation.
+        router (Router | None): La couche de routage transmise au Com, par défaut un Router en mémoire.
 
     Attributs:
         com (Com): Objet de communication associé au processus.
@@ -17,10 +17,12 @@ class Process(Thread):
         alive (bool): Indique si le processus est actif.
     """
 
-    def __init__(self,name):
+    def __init__(self,name, expectedProcesses=None, router=None):
         Thread.__init__(self)
 
         self.com = None
+        self.expectedProcesses = expectedProcesses
+        self.router = router
         
         self.nbProcess = None
 
@@ -31,7 +33,7 @@ class Process(Thread):
     
     def init(self):
         """Initialise le processus en configurant son communicateur et en récupérant le nombre total de processus."""
-        self.com = Com(self.getName())
+        self.com = Com(self.getName(), self.expectedProcesses, self.router)
         self.nbProcess = self.com.getNbProcess()
 
     def run(self):
@@ -66,11 +68,8 @@ class Process(Thread):
             # self.com.stop()
             # return # test pour heartbit et reorg
         
-            while self.com.mailbox.isEmpty():
-                print(f"@P1 - waiting for a message...", flush=True)
-                sleep(0.5)
-            
-            msg = self.com.mailbox.getMessage()
+            print(f"@P1 - waiting for a message...", flush=True)
+            msg = self.com.mailbox.get()
             print(f"@P1 - Reçu de {msg.getSender()} : {msg.getContent()}", flush=True)
 
             msg = self.com.recevFromSync("P0")
@@ -115,4 +114,27 @@ class Process(Thread):
 
     def waitStopped(self):
         """Attend que le thread du processus se termine."""
-        self.join()
\ No newline at end of file
+        self.join()
+async def play(com: "AsyncCom") -> None:
+    """
+    Partie jouée par Process.run, généralisée à N processus et jouée par un AsyncCom, pour les simulations :
+    tous se synchronisent, le premier à obtenir la section critique annonce sa victoire à tous avec ACK,
+    et les suivants trouvent l'annonce dans leur boîte aux lettres.
+    """
+    await com.start()
+    print(f"@{com.name} - started with id {com.id} among {com.nbProcess} process(es)", flush=True)
+
+    await com.synchronize()
+
+    await com.requestSC()
+    if com.mailbox.isEmpty():
+        print(f"@{com.name} - Catched !", flush=True)
+        await com.ackNeededBroadcast("J'ai gagné !!!")
+    else:
+        msg = com.mailbox.getMessage()
+        print(f"@{com.name} - {msg.getSender()} à eu le jeton en premier", flush=True)
+    com.releaseSC()
+
+    await com.synchronize()
+    com.stop()
+    print(f"@{com.name} - execution finished with id {com.id}", flush=True)
@@ -0,0 +1,195 @@
+from __future__ import annotations
+from threading import Lock
+
+from pyeventbus3.pyeventbus3 import PyBus, Mode
+
+from Membership import shiftKeys
+from Message import Message
+from Scheduler import Scheduler
+
+class Router:
+    """
+    Couche de routage des messages entre instances de Com d'un même interpréteur.
+    Les messages point à point sont livrés directement au Com destinataire, sans passer par la diffusion globale du PyBus.
+    Seuls les messages sans destinataire (recipient=None) sont diffusés à tous les Com de l'annuaire.
+    Le PyBus ne sert plus que de registre des handlers déclarés par @subscribe et de leur mode de thread.
+    Chaque message posté est marqué de l'époque courante de la composition du système, dans laquelle ses IDs sont exprimés.
+    Les sous-classes (par exemple SocketRouter) remplacent le transport en mémoire en redéfinissant
+    register, unregister, build, renumber, post, multicast, postToName et release.
+
+    Class Attributes:
+        directory (dict[str, Com]): Annuaire global des Com enregistrés, indexé par nom de processus.
+        directoryLock (Lock): Mutex protégeant l'accès à l'annuaire.
+        inlineHandlers (bool): Indique si les handlers peuvent être exécutés dès la livraison par le LoopDispatcher d'un AsyncCom,
+            ce qui n'est possible que si la couche de routage ne livre jamais un message depuis un handler ou un envoi.
+        handlerCache (dict[tuple[type, type], tuple[list, int, list]]): Handlers abonnés à chaque type de message (voir handlers),
+            par classe de Com et de message, avec la liste des handlers déclarés pour ce type dans le PyBus et sa taille lors de leur recherche.
+
+    Attributs:
+        com (Com | None): Le Com local, connu une fois enregistré, dont les métriques comptent les messages postés.
+        scheduler (Scheduler | None): L'ordonnanceur des tâches de fond et de l'horloge du Com qui utilise la couche de routage,
+            None pour le Scheduler partagé de l'interpréteur.
+        routes (dict[int, Com]): Table de routage des IDs vers les Com destinataires, construite à partir de la nameTable.
+        lastSent (dict[int, float]): Instant (horloge du Scheduler) du dernier message point à point posté vers chaque ID.
+        lastBroadcast (float): Instant (horloge du Scheduler) de la dernière diffusion postée.
+    """
+    directory: dict[str, "Com"] = {}
+    directoryLock = Lock()
+    inlineHandlers = False
+    handlerCache: dict[tuple[type, type], tuple[list, int, list]] = {}
+
+    def __init__(self):
+        """
+        Initialise une table de routage vide.
+        """
+        self.com: "Com" | None = None
+        self.scheduler: Scheduler | None = None
+        self.routes: dict[int, "Com"] = {}
+        self.lastSent: dict[int, float] = {}
+        self.lastBroadcast: float = 0.0
+
+    def register(self, com: "Com") -> None:
+        """
+        Enregistre un Com dans l'annuaire global sous son nom.
+        Args:
+            com (Com): Le Com à enregistrer.
+        """
+        self.com = com
+        with Router.directoryLock:
+            Router.directory[com.name] = com
+
+    def unregister(self, com: "Com") -> None:
+        """
+        Retire un Com de l'annuaire global s'il y figure encore.
+        Args:
+            com (Com): Le Com à retirer.
+        """
+        with Router.directoryLock:
+            if Router.directory.get(com.name) is com:
+                del Router.directory[com.name]
+
+    def build(self, nameTable: dict[str, int]) -> None:
+        """
+        Construit la table de routage à partir de la table des noms.
+        Args:
+            nameTable (dict[str, int]): Table de correspondance entre les noms des processus et leurs IDs.
+        """
+        with Router.directoryLock:
+            self.routes = {id: Router.directory[name] for name, id in nameTable.items() if name in Router.directory}
+
+    def renumber(self, removed: list[int], size: int) -> None:
+        """
+        Renumérote les tables indexées par ID après le retrait de processus défaillants.
+        Args:
+            removed (list[int]): Les anciens IDs retirés, triés.
+            size (int): Le nombre de processus avant le retrait.
+        """
+        shiftKeys(self.routes, removed, size)
+        shiftKeys(self.lastSent, removed, size)
+
+    def release(self, content: any) -> None:
+        """
+        Libère le contenu d'un message reçu. Sans effet en mémoire, où les contenus sont transmis par référence ;
+        les couches de routage entre processus OS y libèrent les segments de mémoire partagée.
+        """
+
+    def post(self, message: Message) -> None:
+        """
+        Poste un message : livraison directe au destinataire pour un message point à point,
+        diffusion à tout l'annuaire pour un message sans destinataire.
+        Args:
+            message (Message): Le message à poster.
+        """
+        self.com.metrics.countSent(message)
+        message.epoch = self.com.membership.epoch
+        if message.recipient is None:
+            self.lastBroadcast = self.com.scheduler.now()
+            with Router.directoryLock:
+                targets = list(Router.directory.values())
+            for target in targets:
+                Router.deliver(target, message)
+            return
+        self.lastSent[message.recipient] = self.com.scheduler.now()
+        target = self.routes.get(message.recipient)
+        if target is not None:
+            Router.deliver(target, message)
+
+    def multicast(self, message: Message, recipients: list[int]) -> None:
+        """
+        Livre un message sans destinataire aux seuls processus d'IDs donnés, par exemple les membres d'un groupe.
+        Args:
+            message (Message): Le message à livrer, de recipient None.
+            recipients (list[int]): Les IDs des destinataires.
+        """
+        self.com.metrics.countSent(message)
+        message.epoch = self.com.membership.epoch
+        now = self.com.scheduler.now()
+        for id in recipients:
+            self.lastSent[id] = now
+            target = self.routes.get(id)
+            if target is not None:
+                Router.deliver(target, message)
+
+    def postToName(self, message: Message, name: str) -> None:
+        """
+        Livre un message au Com enregistré sous un nom donné, avant même que les IDs ne soient attribués.
+        Args:
+            message (Message): Le message à livrer.
+            name (str): Le nom du processus destinataire.
+        """
+        self.com.metrics.countSent(message)
+        message.epoch = self.com.membership.epoch
+        with Router.directoryLock:
+            target = Router.directory.get(name)
+        if target is not None:
+            Router.deliver(target, message)
+
+    @staticmethod
+    def deliver(com: "Com", message: Message) -> None:
+        """
+        Livre un message à un unique Com en appelant ses handlers abonnés au type du message,
+        avec le mode de thread déclaré dans leur @subscribe.
+        Args:
+            com (Com): Le Com destinataire.
+            message (Message): Le message à livrer.
+        """
+        com.metrics.countReceived(message)
+        if message.recipient is not None and message.recipient != com.id:
+            com.metrics.increment("dropped")
+        for method, mode, function in Router.handlers(com, message.__class__):
+            if function is not None:
+                com.dispatcher.submit(function, com, message)
+            elif mode == Mode.POSTING:
+                method(com, message)
+            else:
+                PyBus.Instance().call(method=method, withEvent=message, inMode=mode, subscriber=com)
+
+    @staticmethod
+    def handlers(com: "Com", messageClass: type) -> list[tuple[any, int, any]]:
+        """
+        Retourne les handlers d'un Com abonnés à un type de message, avec leur mode de thread déclaré dans leur @subscribe
+        et, pour un handler @dispatched, la fonction décorée à soumettre au Dispatcher du Com.
+        La recherche est mise en cache par classe de Com et de message, et refaite si d'autres handlers ont été déclarés depuis pour ce type.
+        """
+        cached = Router.handlerCache.get((com.__class__, messageClass))
+        if cached is None or cached[1] != len(cached[0]):
+            bus = PyBus.Instance()
+            methods = bus.event_method.get(messageClass)
+            if methods is None:
+                return []
+            cached = Router.handlerCache[(com.__class__, messageClass)] = (methods, len(methods),
+                [(method, bus.method_mode.get(method), method.__wrapped__ if getattr(method, "dispatched", False) else None)
+                 for method in methods if hasattr(com, method.__name__)])
+        return cached[2]
+
+    @staticmethod
+    def handle(com: "Com", message: Message) -> None:
+        """
+        Exécute immédiatement, dans le thread appelant, les handlers d'un Com abonnés au type du message,
+        sans passer par son Dispatcher. Utilisé pour traiter les messages retenus pendant une réorganisation.
+        Args:
+            com (Com): Le Com destinataire.
+            message (Message): Le message à traiter.
+        """
+        for method, _, _ in Router.handlers(com, message.__class__):
+            getattr(method, "__wrapped__", method)(com, message)
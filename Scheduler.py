@@ -0,0 +1,138 @@
+from __future__ import annotations
+from heapq import heappush, heappop
+from itertools import count
+from threading import Thread, Condition, Lock, current_thread
+from time import monotonic
+
+from Dispatcher import markNonBlocking
+from Log import getLogger
+
+schedulerLog = getLogger("scheduler")
+
+class ScheduledTask:
+    """
+    Tâche enregistrée auprès du Scheduler, ponctuelle ou périodique.
+
+    Args:
+        callback (callable): Fonction à appeler.
+        parameters (tuple): Paramètres à passer à la fonction callback.
+        repeatEvery (float | int | None): Intervalle de répétition en secondes, None pour une tâche ponctuelle.
+
+    Attributs:
+        cancelled (bool): Indique si la tâche a été annulée.
+        running (bool): Indique si la fonction callback est en cours d'exécution.
+    """
+
+    def __init__(self, callback, parameters: tuple, repeatEvery: float | int | None):
+        self.callback = callback
+        self.parameters = parameters
+        self.repeatEvery = repeatEvery
+        self.cancelled = False
+        self.running = False
+
+    def cancel(self) -> None:
+        """
+        Annule la tâche : elle ne sera plus exécutée, sans attendre une exécution éventuellement en cours.
+        """
+        self.cancelled = True
+
+class Scheduler:
+    """
+    Ordonnanceur partagé par tout l'interpréteur, exécutant les tâches ponctuelles et périodiques de tous les Com
+    depuis un unique thread, à partir d'un tas trié par échéance.
+    Le nombre de threads reste ainsi constant quel que soit le nombre de Com ; les tâches doivent être courtes.
+
+    Class Attributes:
+        instance (Scheduler | None): L'instance partagée, créée au premier appel de Instance().
+        instanceLock (Lock): Mutex protégeant la création de l'instance partagée.
+
+    Attributs:
+        heap (list[tuple[float, int, ScheduledTask]]): Tas des tâches, trié par échéance puis par ordre d'enregistrement.
+        condition (Condition): Condition protégeant le tas, notifiée à chaque enregistrement et à chaque fin d'exécution.
+        thread (Thread): Le thread exécutant les tâches.
+    """
+    instance: Scheduler | None = None
+    instanceLock = Lock()
+
+    @staticmethod
+    def Instance() -> Scheduler:
+        """
+        Retourne l'instance partagée du Scheduler, en la créant et la démarrant au premier appel.
+        """
+        with Scheduler.instanceLock:
+            if Scheduler.instance is None:
+                Scheduler.instance = Scheduler()
+            return Scheduler.instance
+
+    def __init__(self):
+        self.heap: list[tuple[float, int, ScheduledTask]] = []
+        self.condition = Condition()
+        self.sequence = count()
+        self.thread = Thread(target=self.run, name="Scheduler", daemon=True)
+        self.thread.start()
+
+    def schedule(self, delay: float | int, callback, parameters: tuple = (), repeatEvery: float | int | None = None) -> ScheduledTask:
+        """
+        Enregistre une tâche à exécuter après un délai, puis périodiquement si repeatEvery est donné.
+        Args:
+            delay (float | int): Délai en secondes avant la première exécution.
+            callback (callable): Fonction à appeler.
+            parameters (tuple): Paramètres à passer à la fonction callback.
+            repeatEvery (float | int | None): Intervalle de répétition en secondes, None pour une tâche ponctuelle.
+        Returns:
+            ScheduledTask: La tâche enregistrée, qui permet de l'annuler.
+        """
+        task = ScheduledTask(callback, parameters, repeatEvery)
+        with self.condition:
+            heappush(self.heap, (monotonic() + delay, next(self.sequence), task))
+            self.condition.notify_all()
+        return task
+
+    def now(self) -> float:
+        """
+        Retourne l'instant courant (monotonic), horloge de référence des délais et des mesures de temps des Com.
+        """
+        return monotonic()
+
+    def wait(self, task: ScheduledTask) -> None:
+        """
+        Attend la fin de l'exécution en cours d'une tâche, s'il y en a une.
+        Ne fait rien si appelé depuis le thread du Scheduler lui-même.
+        Args:
+            task (ScheduledTask): La tâche à attendre.
+        """
+        if current_thread() is self.thread:
+            return
+        with self.condition:
+            self.condition.wait_for(lambda: not task.running)
+
+    def run(self) -> None:
+        """
+        Exécute les tâches à leur échéance, indéfiniment.
+        Le thread ne bloque jamais sur un Dispatcher plein : une tâche bloquée gèlerait les heartbeats et la détection des pannes de tous les Com.
+        """
+        markNonBlocking()
+        while True:
+            with self.condition:
+                while not self.heap:
+                    self.condition.wait()
+                deadline, _, task = self.heap[0]
+                now = monotonic()
+                if deadline > now:
+                    self.condition.wait(deadline - now)
+                    continue
+                heappop(self.heap)
+                if task.cancelled:
+                    continue
+                task.running = True
+
+            try:
+                task.callback(*task.parameters)
+            except Exception:
+                schedulerLog.exception("task %s failed", task.callback)
+
+            with self.condition:
+                task.running = False
+                if task.repeatEvery is not None and not task.cancelled:
+                    heappush(self.heap, (max(deadline + task.repeatEvery, monotonic()), next(self.sequence), task))
+                self.condition.notify_all()
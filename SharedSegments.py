@@ -0,0 +1,171 @@
+from __future__ import annotations
+from multiprocessing.shared_memory import SharedMemory
+from threading import Lock
+
+from Log import getLogger
+
+messagesLog = getLogger("messages")
+
+class SharedHandle:
+    """
+    Référence vers un contenu volumineux placé dans un segment de mémoire partagée, transmise à la place du contenu.
+
+    Args:
+        segment (str): Le nom du segment.
+        size (int): La taille du contenu, en octets (le segment peut être plus grand).
+        owner (str): Le nom du processus qui a créé le segment, à qui le libérer.
+    """
+    __slots__ = ("segment", "size", "owner")
+
+    def __init__(self, segment: str, size: int, owner: str):
+        self.segment = segment
+        self.size = size
+        self.owner = owner
+
+    def __getstate__(self):
+        return (self.segment, self.size, self.owner)
+
+    def __setstate__(self, state):
+        self.segment, self.size, self.owner = state
+
+class SharedSegments:
+    """
+    Segments de mémoire partagée d'un processus : ceux qu'il a créés pour ses envois volumineux, avec les processus qui les référencent
+    encore, et ceux qu'il a ouverts à la réception. Un contenu diffusé n'est copié qu'une fois, dans un unique segment référencé par
+    tous ses destinataires ; le segment est supprimé lorsque tous l'ont libéré, sont retirés du système, ou lorsque son créateur s'arrête.
+    Les destinataires ouvrant le segment dès la réception, sa suppression ne les prive pas du contenu : la mémoire n'est rendue
+    au système qu'à la fermeture de la dernière vue.
+
+    Le créateur d'un segment l'inscrit auprès du resource_tracker de multiprocessing, qui le supprime si le processus meurt sans le faire.
+    Avant Python 3.13, un segment ouvert à la réception y est inscrit aussi : les processus doivent donc partager le resource_tracker
+    (processus lancés par multiprocessing depuis un même parent, comme le fait Launcher), faute de quoi la sortie d'un destinataire
+    supprime le segment.
+
+    Args:
+        owner (str): Le nom du processus local.
+        threshold (int): Taille en octets à partir de laquelle un contenu en octets passe par un segment, 0 pour ne jamais le faire.
+
+    Attributs:
+        owned (dict[str, tuple[SharedMemory, set[str]]]): Segments créés, avec les noms des processus qui ne les ont pas encore libérés.
+        attached (dict[int, tuple[memoryview, SharedMemory, SharedHandle]]): Segments ouverts, par identité de la vue remise au Com local.
+        lock (Lock): Mutex protégeant owned et attached.
+    """
+
+    def __init__(self, owner: str, threshold: int):
+        self.owner = owner
+        self.threshold = threshold
+        self.owned: dict[str, tuple[SharedMemory, set[str]]] = {}
+        self.attached: dict[int, tuple[memoryview, SharedMemory, SharedHandle]] = {}
+        self.lock = Lock()
+
+    def eligible(self, content: any) -> bool:
+        """
+        Indique si un contenu doit passer par un segment : un contenu en octets d'au moins threshold octets.
+        """
+        return self.threshold > 0 and isinstance(content, (bytes, bytearray, memoryview)) and memoryview(content).nbytes >= self.threshold
+
+    def share(self, content: bytes | bytearray | memoryview, recipients: list[str]) -> SharedHandle:
+        """
+        Copie un contenu dans un nouveau segment, référencé par les processus destinataires.
+        Args:
+            content (bytes | bytearray | memoryview): Le contenu.
+            recipients (list[str]): Les noms des processus destinataires, qui devront chacun libérer le segment.
+        Returns:
+            SharedHandle: La référence à transmettre à la place du contenu.
+        """
+        view = memoryview(content).cast("B")
+        segment = SharedMemory(create=True, size=view.nbytes)
+        segment.buf[:view.nbytes] = view
+        with self.lock:
+            self.owned[segment.name] = (segment, set(recipients))
+        return SharedHandle(segment.name, view.nbytes, self.owner)
+
+    def release(self, segment: str, name: str) -> None:
+        """
+        Retire la référence d'un processus à un segment créé localement, et supprime le segment s'il n'est plus référencé.
+        """
+        with self.lock:
+            entry = self.owned.get(segment)
+            if entry is None:
+                return
+            entry[1].discard(name)
+            if entry[1]:
+                return
+            del self.owned[segment]
+        self._unlink(entry[0])
+
+    def forget(self, names: list[str]) -> None:
+        """
+        Retire les références des processus retirés du système, qui ne libéreront jamais leurs segments.
+        """
+        with self.lock:
+            unused = []
+            for segment, (memory, references) in list(self.owned.items()):
+                references.difference_update(names)
+                if not references:
+                    del self.owned[segment]
+                    unused.append(memory)
+        for memory in unused:
+            self._unlink(memory)
+
+    def attach(self, handle: SharedHandle) -> memoryview | None:
+        """
+        Ouvre un segment reçu et retourne une vue sur son contenu, sans copie, ou None si le segment n'existe plus.
+        """
+        try:
+            try:
+                memory = SharedMemory(handle.segment, track=False)
+            except TypeError:
+                memory = SharedMemory(handle.segment)
+        except FileNotFoundError:
+            messagesLog.error("<%s> shared segment %s from %s no longer exists", self.owner, handle.segment, handle.owner)
+            return None
+        view = memory.buf[:handle.size]
+        with self.lock:
+            self.attached[id(view)] = (view, memory, handle)
+        return view
+
+    def detach(self, view: any) -> SharedHandle | None:
+        """
+        Ferme le segment d'une vue remise par attach, qui ne doit plus être utilisée ; si des vues qui en sont dérivées
+        sont encore ouvertes, le segment reste projeté jusqu'à leur destruction.
+        Returns:
+            SharedHandle | None: La référence du segment, à libérer auprès de son créateur, ou None si la vue ne provient pas d'un segment.
+        """
+        with self.lock:
+            entry = self.attached.pop(id(view), None)
+        if entry is None:
+            return None
+        view, memory, handle = entry
+        self._close(view, memory)
+        return handle
+
+    def close(self) -> None:
+        """
+        Supprime tous les segments créés localement et ferme tous les segments ouverts ; leurs vues ne doivent plus être utilisées.
+        """
+        with self.lock:
+            owned = [memory for memory, _ in self.owned.values()]
+            attached = list(self.attached.values())
+            self.owned.clear()
+            self.attached.clear()
+        for memory in owned:
+            self._unlink(memory)
+        for view, memory, _ in attached:
+            self._close(view, memory)
+
+    def _close(self, view: memoryview, memory: SharedMemory) -> None:
+        """Ferme la vue et le segment ouvert dont elle provient, sauf si des vues dérivées le retiennent encore."""
+        view.release()
+        try:
+            memory.close()
+        except BufferError:
+            pass
+
+    def _unlink(self, memory: SharedMemory) -> None:
+        """Ferme et supprime un segment créé localement."""
+        memory.close()
+        try:
+            memory.unlink()
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,355 @@
+"""
+Simulation à événements discrets et en temps virtuel de systèmes de Com.
+
+Tous les Com d'une simulation sont des AsyncCom exécutés par une unique boucle d'événements dont l'horloge est virtuelle :
+lorsque plus rien n'est prêt à s'exécuter, l'horloge saute directement à la prochaine échéance au lieu de l'attendre.
+Les heartbeats, vérifications et regroupements sont planifiés par un VirtualScheduler sur cette boucle,
+et les messages sont transmis par un SimRouter avec un délai de lien tiré d'un générateur pseudo-aléatoire initialisé par la graine,
+en conservant l'ordre FIFO de chaque lien.
+Les instants de livraison sont arrondis au pas de temps de la simulation : les messages dus au même instant sont rangés dans
+un tas d'événements propre à la simulation et livrés par un unique rappel de la boucle, au lieu d'un rappel par message.
+Aucun thread n'intervenant, une même graine produit exactement les mêmes livraisons, dans le même ordre et aux mêmes instants virtuels ;
+l'empreinte de la simulation (digest) permet de le vérifier.
+
+Usage:
+    simulation = Simulation(seed=42)
+
+    async def main():
+        coms = [AsyncCom(f"P{i}", 1000, simulation.router()) for i in range(1000)]
+        await asyncio.gather(*(com.start() for com in coms))
+        ...
+
+    simulation.run(main())
+    print(simulation.now(), simulation.delivered, simulation.digest())
+"""
+
+from __future__ import annotations
+import asyncio
+import selectors
+from hashlib import sha256
+from array import array
+from heapq import heappush, heappop
+from math import ceil
+from random import Random
+
+from Message import Message
+from Router import Router
+from Scheduler import ScheduledTask
+
+class VirtualSelector(selectors.BaseSelector):
+    """
+    Sélecteur d'une boucle en temps virtuel : une attente de la boucle fait avancer son horloge au lieu de bloquer.
+    Les descripteurs (dont celui d'éveil de la boucle) restent surveillés par un vrai sélecteur, interrogé sans attendre.
+
+    Attributs:
+        loop (VirtualEventLoop | None): La boucle dont l'horloge avance, fixée par la boucle à sa création.
+        selector (selectors.BaseSelector): Le sélecteur réel.
+    """
+
+    def __init__(self):
+        self.loop: VirtualEventLoop | None = None
+        self.selector = selectors.DefaultSelector()
+
+    def register(self, fileobj, events, data=None):
+        return self.selector.register(fileobj, events, data)
+
+    def unregister(self, fileobj):
+        return self.selector.unregister(fileobj)
+
+    def modify(self, fileobj, events, data=None):
+        return self.selector.modify(fileobj, events, data)
+
+    def select(self, timeout=None):
+        if timeout is None:
+            raise RuntimeError("simulation is stuck: nothing is ready and nothing is scheduled")
+        self.loop.virtualTime += timeout
+        return self.selector.select(0)
+
+    def close(self):
+        self.selector.close()
+
+    def get_map(self):
+        return self.selector.get_map()
+
+class VirtualEventLoop(asyncio.SelectorEventLoop):
+    """
+    Boucle d'événements asyncio dont l'horloge (loop.time()) est virtuelle, partant de 0.
+
+    Attributs:
+        virtualTime (float): L'instant virtuel courant, en secondes.
+    """
+
+    def __init__(self):
+        selector = VirtualSelector()
+        super(VirtualEventLoop, self).__init__(selector)
+        selector.loop = self
+        self.virtualTime = 0.0
+
+    def time(self) -> float:
+        return self.virtualTime
+
+class VirtualScheduler:
+    """
+    Ordonnanceur à l'interface du Scheduler, exécutant les tâches sur une boucle en temps virtuel.
+    Toutes les tâches s'exécutant sur la boucle, aucune n'est jamais en cours pendant un appel à wait.
+
+    Args:
+        loop (VirtualEventLoop): La boucle exécutant les tâches.
+    """
+
+    def __init__(self, loop: VirtualEventLoop):
+        self.loop = loop
+
+    def schedule(self, delay: float | int, callback, parameters: tuple = (), repeatEvery: float | int | None = None) -> ScheduledTask:
+        """
+        Enregistre une tâche à exécuter après un délai virtuel, puis périodiquement si repeatEvery est donné, voir Scheduler.schedule.
+        """
+        task = ScheduledTask(callback, parameters, repeatEvery)
+        self.loop.call_later(delay, self.run, task)
+        return task
+
+    def now(self) -> float:
+        """
+        Retourne l'instant virtuel courant.
+        """
+        return self.loop.virtualTime
+
+    def wait(self, task: ScheduledTask) -> None:
+        """
+        Ne fait rien : la tâche ne peut pas être en cours d'exécution.
+        """
+
+    def run(self, task: ScheduledTask) -> None:
+        """Exécute une tâche à son échéance, et la replanifie si elle est périodique."""
+        if task.cancelled:
+            return
+        task.callback(*task.parameters)
+        if task.repeatEvery is not None and not task.cancelled:
+            self.loop.call_later(task.repeatEvery, self.run, task)
+
+class SimRouter(Router):
+    """
+    Couche de routage entre les Com d'une simulation, qui transmet chaque message après le délai de lien tiré par la simulation.
+    L'annuaire est celui de la simulation, et non l'annuaire global des Router en mémoire. Les Com utilisent l'horloge et le
+    VirtualScheduler de la simulation, et leurs handlers sont exécutés dès la livraison, chaque livraison partant d'un rappel de la boucle.
+
+    Args:
+        simulation (Simulation): La simulation à laquelle appartient le Com.
+
+    Attributs:
+        index (int): Numéro du Com dans la simulation, dans l'ordre de création des couches de routage, qui l'identifie dans l'empreinte.
+        links (dict[str, int]): Pas de livraison du dernier message transmis vers chaque destinataire, indexé par nom.
+    """
+
+    inlineHandlers = True
+
+    def __init__(self, simulation: Simulation):
+        super(SimRouter, self).__init__()
+        self.simulation = simulation
+        self.scheduler = simulation.scheduler
+        self.index = simulation.routers
+        simulation.routers += 1
+        self.links: dict[str, int] = {}
+
+    def register(self, com: "Com") -> None:
+        """
+        Enregistre un Com dans l'annuaire de la simulation.
+        """
+        self.com = com
+        self.simulation.directory[com.name] = com
+
+    def unregister(self, com: "Com") -> None:
+        """
+        Retire un Com de l'annuaire de la simulation ; les messages déjà en transit vers lui lui sont encore livrés.
+        """
+        if self.simulation.directory.get(com.name) is com:
+            del self.simulation.directory[com.name]
+
+    def build(self, nameTable: dict[str, int]) -> None:
+        """
+        Construit la table de routage à partir de la table des noms et de l'annuaire de la simulation.
+        """
+        self.routes = {id: self.simulation.directory[name] for name, id in nameTable.items() if name in self.simulation.directory}
+
+    def post(self, message: Message) -> None:
+        """
+        Transmet un message à son destinataire, ou à tout l'annuaire pour un message sans destinataire.
+        """
+        self.com.metrics.countSent(message)
+        message.epoch = self.com.membership.epoch
+        if message.recipient is None:
+            self.lastBroadcast = self.com.scheduler.now()
+            self.simulation.transmit(self, list(self.simulation.directory.values()), message)
+            return
+        self.lastSent[message.recipient] = self.com.scheduler.now()
+        target = self.routes.get(message.recipient)
+        if target is not None:
+            self.simulation.transmit(self, (target,), message)
+
+    def multicast(self, message: Message, recipients: list[int]) -> None:
+        """
+        Transmet un message sans destinataire aux seuls processus d'IDs donnés.
+        """
+        self.com.metrics.countSent(message)
+        message.epoch = self.com.membership.epoch
+        now = self.com.scheduler.now()
+        targets = []
+        for id in recipients:
+            self.lastSent[id] = now
+            target = self.routes.get(id)
+            if target is not None:
+                targets.append(target)
+        self.simulation.transmit(self, targets, message)
+
+    def postToName(self, message: Message, name: str) -> None:
+        """
+        Transmet un message au Com de nom donné, avant même que les IDs ne soient attribués.
+        """
+        self.com.metrics.countSent(message)
+        message.epoch = self.com.membership.epoch
+        target = self.simulation.directory.get(name)
+        if target is not None:
+            self.simulation.transmit(self, (target,), message)
+
+class Simulation:
+    """
+    Simulation déterministe d'un système de Com en temps virtuel.
+
+    Args:
+        seed (int): Graine du générateur des délais de lien.
+        minDelay (float): Délai de lien minimal, en secondes virtuelles.
+        maxDelay (float): Délai de lien maximal, en secondes virtuelles ; chaque message reçoit un délai uniforme entre les deux bornes.
+        resolution (float): Pas de temps des livraisons, en secondes virtuelles : chaque instant de livraison est arrondi au pas supérieur.
+        record (bool): Si vrai, conserve la trace de chaque livraison dans trace.
+
+    Attributs:
+        random (Random): Générateur des délais de lien.
+        loop (VirtualEventLoop): La boucle en temps virtuel exécutant tous les Com.
+        scheduler (VirtualScheduler): L'ordonnanceur des tâches de fond et l'horloge des Com, imposé par leurs SimRouter.
+        directory (dict[str, Com]): Annuaire des Com de la simulation, indexé par nom.
+        routers (int): Nombre de couches de routage créées.
+        events (list[int]): Tas des pas de livraison à venir.
+        arrivals (dict[int, list]): Livraisons de chaque pas à venir, dans l'ordre de leur transmission : destinataire, message
+            et clé de la livraison (numéro du message et du destinataire) à la suite, sans tuple par livraison,
+            pour ne pas multiplier les objets suivis par le ramasse-miettes.
+        wakeup (asyncio.TimerHandle | None): Le rappel de la boucle programmé pour le premier pas du tas.
+        posted (int): Nombre de messages transmis, qui numérote chaque message dans l'empreinte.
+        typeCodes (dict[type, int]): Code de chaque type de message dans l'empreinte, dans l'ordre de première transmission.
+        headers (array): En-têtes des messages transmis depuis la dernière livraison, ajoutés à l'empreinte avec elle.
+        delivered (int): Nombre de messages livrés.
+        trace (list[tuple] | None): Livraisons (instant, destinataire, type, sender, recipient, clock), si record est vrai.
+    """
+
+    def __init__(self, seed: int = 0, minDelay: float = 0.001, maxDelay: float = 0.01, resolution: float = 0.0001, record: bool = False):
+        self.random = Random(seed)
+        self.minDelay = minDelay
+        self.maxDelay = maxDelay
+        self.resolution = resolution
+        self.loop = VirtualEventLoop()
+        self.scheduler = VirtualScheduler(self.loop)
+        self.directory: dict[str, "Com"] = {}
+        self.routers = 0
+        self.events: list[int] = []
+        self.arrivals: dict[int, list] = {}
+        self.wakeup: asyncio.TimerHandle | None = None
+        self.posted = 0
+        self.typeCodes: dict[type, int] = {}
+        self.headers = array("q")
+        self.delivered = 0
+        self.hash = sha256()
+        self.trace: list[tuple] | None = [] if record else None
+
+    def router(self) -> SimRouter:
+        """
+        Retourne une couche de routage pour un nouveau Com de la simulation.
+        """
+        return SimRouter(self)
+
+    def now(self) -> float:
+        """
+        Retourne l'instant virtuel courant.
+        """
+        return self.loop.time()
+
+    def transmit(self, router: SimRouter, targets, message: Message) -> None:
+        """
+        Planifie la livraison d'un message à chaque destinataire après un délai de lien tiré au hasard, arrondi au pas supérieur,
+        mais toujours après le message précédent du même lien. L'en-tête du message entre dans l'empreinte une seule fois, avec son numéro.
+        Args:
+            router (SimRouter): La couche de routage de l'émetteur.
+            targets (Iterable[Com]): Les Com destinataires.
+            message (Message): Le message à transmettre.
+        """
+        serial = self.posted
+        self.posted += 1
+        code = self.typeCodes.get(message.__class__)
+        if code is None:
+            code = self.typeCodes[message.__class__] = len(self.typeCodes)
+        sender, recipient = message.sender, message.recipient
+        self.headers.extend((serial, router.index, code, -1 if sender is None else sender, -1 if recipient is None else recipient, message.clock))
+        start = self.loop.virtualTime + self.minDelay
+        spread = self.maxDelay - self.minDelay
+        resolution = self.resolution
+        random = self.random.random
+        links = router.links
+        arrivals = self.arrivals
+        serial <<= 24
+        for target in targets:
+            name = target.name
+            step = ceil((start + spread * random()) / resolution)
+            last = links.get(name)
+            if last is not None and step <= last:
+                step = last + 1
+            links[name] = step
+            pending = arrivals.get(step)
+            if pending is None:
+                pending = arrivals[step] = []
+                heappush(self.events, step)
+                if self.events[0] == step:
+                    self.arm()
+            pending += (target, message, serial | target.router.index)
+
+    def arm(self) -> None:
+        """Programme le rappel de la boucle pour le premier pas du tas, à la place du rappel déjà programmé."""
+        if self.wakeup is not None:
+            self.wakeup.cancel()
+        self.wakeup = self.loop.call_at(self.events[0] * self.resolution, self.deliver) if self.events else None
+
+    def deliver(self) -> None:
+        """Livre tous les messages dus au premier pas du tas, dans l'ordre de leur transmission, et les ajoute à l'empreinte de la simulation."""
+        step = heappop(self.events)
+        self.wakeup = None
+        pending = self.arrivals.pop(step)
+        self.hash.update(self.headers)
+        del self.headers[:]
+        deliveries = array("q", (step,))
+        deliveries.extend(pending[2::3])
+        self.hash.update(deliveries)
+        if self.trace is not None:
+            self.trace.extend((step * self.resolution, target.name, message.__class__.__name__, message.sender, message.recipient, message.clock)
+                              for target, message in zip(pending[0::3], pending[1::3]))
+        deliver = Router.deliver
+        for i in range(0, len(pending), 3):
+            deliver(pending[i], pending[i + 1])
+        self.delivered += len(pending) // 3
+        if self.wakeup is None:
+            self.arm()
+
+    def digest(self) -> str:
+        """
+        Retourne l'empreinte des livraisons effectuées jusque-là : identique pour deux exécutions de même graine.
+        """
+        self.hash.update(self.headers)
+        del self.headers[:]
+        return self.hash.hexdigest()
+
+    def run(self, main, timeLimit: float | None = None):
+        """
+        Exécute une coroutine sur la boucle en temps virtuel.
+        Args:
+            main (coroutine): La coroutine principale, qui crée et fait travailler les AsyncCom de la simulation.
+            timeLimit (float | None): Durée virtuelle maximale, au-delà de laquelle asyncio.TimeoutError est levée.
+        Returns:
+            any: Le résultat de la coroutine.
+        """
+        return self.loop.run_until_complete(asyncio.wait_for(main, timeLimit))
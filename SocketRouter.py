@@ -0,0 +1,262 @@
+from __future__ import annotations
+import os
+from copy import copy
+from multiprocessing.connection import Listener, Client, Connection
+from threading import Lock, Thread
+
+from Codec import encode, decode
+from Dispatcher import markNonBlocking
+from Membership import shiftKeys
+from Message import Message, ReleaseMessage
+from Router import Router
+from SharedSegments import SharedSegments, SharedHandle
+
+class SocketRouter(Router):
+    """
+    Couche de routage entre Com hébergés dans des processus OS distincts, via des sockets Unix.
+    Chaque Com écoute sur <directory>/<nom>.sock, et la découverte des pairs pendant l'initialisation se fait en listant ce répertoire.
+    Les connexions sortantes sont ouvertes à la demande et conservées ; chaque connexion entrante est lue par son propre thread,
+    ce qui conserve l'ordre FIFO des messages par émetteur. Les messages sont transmis sous la forme binaire du Codec,
+    encodés une seule fois quel que soit le nombre de destinataires.
+    Un contenu en octets d'au moins Com.sharedMemoryThreshold octets est copié une seule fois dans un segment de mémoire partagée,
+    dont seule la référence est transmise ; le destinataire reçoit une vue sur le segment, sans copie, à libérer avec Com.release.
+
+    Args:
+        directory (str): Répertoire de rendez-vous partagé par tous les processus du système.
+
+    Attributs:
+        directory (str): Répertoire de rendez-vous.
+        listener (Listener | None): La socket d'écoute du Com local.
+        connections (dict[str, tuple[Connection, Lock]]): Connexions sortantes ouvertes, et leur mutex d'envoi, par nom de processus.
+        connectionsLock (Lock): Mutex protégeant connections.
+        names (dict[int, str]): Table des IDs vers les noms des processus, construite à partir de la nameTable.
+        segments (SharedSegments | None): Les segments de mémoire partagée créés et ouverts par le Com local.
+        closed (bool): Indique si le Com local a été retiré.
+    """
+
+    def __init__(self, directory: str):
+        super(SocketRouter, self).__init__()
+        self.directory = directory
+        self.listener: Listener | None = None
+        self.connections: dict[str, tuple[Connection, Lock]] = {}
+        self.connectionsLock = Lock()
+        self.names: dict[int, str] = {}
+        self.segments: SharedSegments | None = None
+        self.closed = False
+
+    def address(self, name: str) -> str:
+        """
+        Retourne le chemin de la socket d'écoute d'un processus.
+        """
+        return os.path.join(self.directory, name + ".sock")
+
+    def register(self, com: "Com") -> None:
+        """
+        Ouvre la socket d'écoute du Com local et démarre l'acceptation des connexions entrantes.
+        Args:
+            com (Com): Le Com local.
+        """
+        self.com = com
+        self.segments = SharedSegments(com.name, com.sharedMemoryThreshold)
+        com.metrics.gauge("sharedSegments", lambda: len(self.segments.owned))
+        self.listener = Listener(self.address(com.name), family="AF_UNIX")
+        Thread(target=self.accept, name=f"{com.name}-accept", daemon=True).start()
+
+    def unregister(self, com: "Com") -> None:
+        """
+        Ferme la socket d'écoute et toutes les connexions sortantes du Com local, et supprime ses segments de mémoire partagée.
+        Args:
+            com (Com): Le Com local.
+        """
+        self.closed = True
+        try:
+            Client(self.address(com.name), family="AF_UNIX").close()
+        except OSError:
+            pass
+        self.listener.close()
+        with self.connectionsLock:
+            for connection, _ in self.connections.values():
+                connection.close()
+            self.connections.clear()
+        self.segments.close()
+
+    def build(self, nameTable: dict[str, int]) -> None:
+        """
+        Construit la table des IDs vers les noms à partir de la table des noms.
+        Args:
+            nameTable (dict[str, int]): Table de correspondance entre les noms des processus et leurs IDs.
+        """
+        self.names = {id: name for name, id in nameTable.items()}
+
+    def renumber(self, removed: list[int], size: int) -> None:
+        """
+        Renumérote les tables indexées par ID après le retrait de processus défaillants, ferme les connexions vers ceux-ci
+        et retire leurs références aux segments de mémoire partagée.
+        Args:
+            removed (list[int]): Les anciens IDs retirés, triés.
+            size (int): Le nombre de processus avant le retrait.
+        """
+        super(SocketRouter, self).renumber(removed, size)
+        names = [self.names[id] for id in removed if id in self.names]
+        shiftKeys(self.names, removed, size)
+        with self.connectionsLock:
+            entries = [self.connections.pop(name) for name in names if name in self.connections]
+        for connection, _ in entries:
+            connection.close()
+        self.segments.forget(names)
+
+    def peers(self) -> list[str]:
+        """
+        Liste les noms des processus dont la socket d'écoute est présente dans le répertoire de rendez-vous, y compris le Com local.
+        """
+        return [entry[:-len(".sock")] for entry in os.listdir(self.directory) if entry.endswith(".sock")]
+
+    def post(self, message: Message) -> None:
+        """
+        Poste un message : envoi au seul destinataire pour un message point à point,
+        à tous les processus connus (ou présents dans le répertoire pendant l'initialisation) pour un message sans destinataire.
+        Args:
+            message (Message): Le message à poster.
+        """
+        self.com.metrics.countSent(message)
+        message.epoch = self.com.membership.epoch
+        if message.recipient is None:
+            self.lastBroadcast = self.com.scheduler.now()
+            self.send(message, list(self.names.values()) or self.peers())
+            return
+        self.lastSent[message.recipient] = self.com.scheduler.now()
+        name = self.names.get(message.recipient)
+        if name is not None:
+            self.send(message, [name])
+
+    def multicast(self, message: Message, recipients: list[int]) -> None:
+        """
+        Envoie un message sans destinataire aux seuls processus d'IDs donnés, encodé une seule fois.
+        Args:
+            message (Message): Le message à envoyer, de recipient None.
+            recipients (list[int]): Les IDs des destinataires.
+        """
+        self.com.metrics.countSent(message)
+        message.epoch = self.com.membership.epoch
+        now = self.com.scheduler.now()
+        names = []
+        for id in recipients:
+            self.lastSent[id] = now
+            if id in self.names:
+                names.append(self.names[id])
+        self.send(message, names)
+
+    def postToName(self, message: Message, name: str) -> None:
+        """
+        Envoie un message au processus de nom donné, avant même que les IDs ne soient attribués.
+        Args:
+            message (Message): Le message à envoyer.
+            name (str): Le nom du processus destinataire.
+        """
+        self.com.metrics.countSent(message)
+        message.epoch = self.com.membership.epoch
+        self.send(message, [name])
+
+    def release(self, content: any) -> None:
+        """
+        Ferme le segment de mémoire partagée d'un contenu reçu, et le signale à son créateur. Sans effet sur les autres contenus.
+        """
+        handle = self.segments.detach(content)
+        if handle is not None:
+            self.postToName(ReleaseMessage(self.com.id, handle.segment, self.com.name), handle.owner)
+
+    def send(self, message: Message, names: list[str]) -> None:
+        """
+        Envoie un message à des processus de noms donnés, en le livrant directement au Com local s'il en fait partie.
+        Le message n'est encodé qu'une fois, et son contenu n'est placé qu'une fois en mémoire partagée s'il est volumineux.
+        """
+        remote = [name for name in names if name != self.com.name]
+        if len(remote) < len(names):
+            Router.deliver(self.com, message)
+        if not remote:
+            return
+        handle = None
+        if self.segments.eligible(message.content):
+            handle = self.segments.share(message.content, remote)
+            self.com.metrics.increment("sharedBytes", handle.size)
+            message = copy(message)
+            message.content = handle
+        data = encode(message)
+        for name in remote:
+            if not self.transmit(data, name) and handle is not None:
+                self.segments.release(handle.segment, name)
+
+    def transmit(self, data: bytes, name: str) -> bool:
+        """
+        Envoie un message encodé au processus de nom donné.
+        Un pair injoignable est ignoré, sa défaillance étant du ressort du détecteur de défaillance.
+        Returns:
+            bool: True si le message a été envoyé.
+        """
+        entry = self.connect(name)
+        if entry is None:
+            return False
+        connection, lock = entry
+        try:
+            with lock:
+                connection.send_bytes(data)
+            self.com.metrics.increment("bytesSent", len(data))
+            return True
+        except (OSError, EOFError):
+            with self.connectionsLock:
+                if self.connections.get(name) is entry:
+                    del self.connections[name]
+            connection.close()
+            return False
+
+    def connect(self, name: str) -> tuple[Connection, Lock] | None:
+        """
+        Retourne la connexion sortante vers un processus, en l'ouvrant si besoin.
+        Returns:
+            tuple[Connection, Lock] | None: La connexion et son mutex d'envoi, ou None si le processus est injoignable.
+        """
+        with self.connectionsLock:
+            entry = self.connections.get(name)
+            if entry is None and not self.closed:
+                try:
+                    entry = (Client(self.address(name), family="AF_UNIX"), Lock())
+                except OSError:
+                    return None
+                self.connections[name] = entry
+            return entry
+
+    def accept(self) -> None:
+        """Accepte les connexions entrantes et démarre un thread de lecture pour chacune, jusqu'au retrait du Com local."""
+        while True:
+            try:
+                connection = self.listener.accept()
+            except OSError:
+                return
+            if self.closed:
+                connection.close()
+                return
+            Thread(target=self.receive, args=(connection,), name=f"{self.com.name}-receive", daemon=True).start()
+
+    def receive(self, connection: Connection) -> None:
+        """
+        Livre au Com local les messages reçus sur une connexion entrante, jusqu'à sa fermeture.
+        Un contenu placé en mémoire partagée est remplacé par une vue sur son segment ; les libérations de segments sont traitées ici.
+        La connexion portant aussi le trafic système, le thread n'est jamais bloqué par le Dispatcher plein.
+        """
+        markNonBlocking()
+        while True:
+            try:
+                data = connection.recv_bytes()
+            except (OSError, EOFError):
+                connection.close()
+                return
+            self.com.metrics.increment("bytesReceived", len(data))
+            message = decode(data)
+            if isinstance(message, ReleaseMessage):
+                self.segments.release(*message.content)
+                continue
+            if isinstance(message.content, SharedHandle):
+                message.content = self.segments.attach(message.content)
+                if message.content is None:
+                    continue
+            Router.deliver(self.com, message)
@@ -0,0 +1,340 @@
+from __future__ import annotations
+from collections import deque
+from concurrent.futures import Future
+from threading import Lock
+
+from Membership import renumber
+from Message import Message, TokenMessage, TokenRequestMessage, SharedGrantMessage, SharedReleaseMessage
+
+class SuzukiKasami:
+    """
+    Exclusion mutuelle par token à la demande, selon l'algorithme de Suzuki-Kasami, pour une section critique :
+    la section globale, ou une section nommée dont le token est indépendant de celui des autres sections.
+    Un processus qui veut entrer en section critique diffuse une requête numérotée, et le token ne circule
+    que vers les processus qui l'ont demandé : au repos, aucun message n'est échangé.
+
+    Une requête peut aussi demander un accès partagé (lecteurs/rédacteurs). Le détenteur du token, hors section critique, l'accorde
+    directement au demandeur sans céder le token, et le retient dans l'état du token (readers). Un processus qui termine un accès
+    partagé le diffuse, et chaque processus retient le numéro du dernier accès partagé terminé par chacun, comme il retient leurs requêtes :
+    le token peut ainsi être cédé à un demandeur exclusif pendant des accès partagés, et celui-ci n'entre en section critique qu'une fois
+    qu'ils sont tous terminés. Les demandeurs sont servis dans l'ordre de la file du token : les accès partagés qui suivent un demandeur
+    exclusif attendent qu'il ait terminé, si bien qu'un flot de lecteurs n'affame pas les rédacteurs.
+
+    Args:
+        com (Com): Le Com initialisé (id et nbProcess connus) utilisé pour envoyer les requêtes et le token.
+        resource (str | None): Nom de la section critique, None pour la section globale.
+        holds (bool): Indique si le processus détient initialement le token.
+
+    Attributs:
+        com (Com): Le Com associé.
+        requestNumbers (list[int]): Numéro de la dernière requête connue de chaque processus (RN).
+        sharedRequests (list[bool]): Indique si la dernière requête connue de chaque processus demande un accès partagé.
+        sharedReleased (list[int]): Numéro du dernier accès partagé terminé connu de chaque processus.
+        hasToken (bool): Indique si le processus détient le token.
+        lastGranted (list[int] | None): Numéro de la dernière requête satisfaite de chaque processus (LN), porté par le token.
+        queue (deque[int] | None): File des processus en attente du token, portée par le token.
+        readers (dict[int, int] | None): Numéro de l'accès partagé accordé à chaque processus et peut-être pas terminé, porté par le token.
+        requesting (Future | None): Future résolu à l'entrée en section critique, si le processus l'attend.
+        requestingShared (bool): Indique si l'accès attendu est partagé.
+        inCS (bool): Indique si le processus est en section critique exclusive.
+        reading (int): Numéro de l'accès partagé en cours du processus, 0 s'il n'en a pas.
+        lock (Lock): Mutex protégeant l'état.
+    """
+
+    def __init__(self, com: "Com", resource: str | None, holds: bool):
+        self.com = com
+        self.resource = resource
+        self.requestNumbers: list[int] = [0] * com.nbProcess
+        self.sharedRequests: list[bool] = [False] * com.nbProcess
+        self.sharedReleased: list[int] = [0] * com.nbProcess
+        self.hasToken: bool = holds
+        self.lastGranted: list[int] | None = [0] * com.nbProcess if self.hasToken else None
+        self.queue: deque[int] | None = deque() if self.hasToken else None
+        self.readers: dict[int, int] | None = {} if self.hasToken else None
+        self.requesting: Future | None = None
+        self.requestingShared: bool = False
+        self.inCS: bool = False
+        self.reading: int = 0
+        self.lock = Lock()
+
+    def request(self, shared: bool = False) -> Future:
+        """
+        Demande l'entrée en section critique, en diffusant une requête si le processus ne détient pas déjà le token.
+        Args:
+            shared (bool): True pour un accès partagé avec les autres accès partagés, False pour un accès exclusif.
+        Returns:
+            Future: Le Future résolu à l'entrée en section critique.
+        """
+        future = Future()
+        with self.lock:
+            if self.hasToken:
+                if shared:
+                    self.requestNumbers[self.com.id] += 1
+                    self._grantShared(self.com.id)
+                    self.reading = self.requestNumbers[self.com.id]
+                    future.set_result(None)
+                    return future
+                if not self._sharing():
+                    self.inCS = True
+                    future.set_result(None)
+                    return future
+                self.requesting = future
+                self.requestingShared = False
+                return future
+            self.requestNumbers[self.com.id] += 1
+            number = self.requestNumbers[self.com.id]
+            self.sharedRequests[self.com.id] = shared
+            self.requesting = future
+            self.requestingShared = shared
+        self.com.router.post(TokenRequestMessage(self.com.id, number, self.resource, shared))
+        return future
+
+    def release(self) -> None:
+        """
+        Sort de la section critique : termine l'accès partagé en cours, ou transmet le token au prochain demandeur s'il y en a un.
+        """
+        with self.lock:
+            if self.reading:
+                messages = [self._endShared()]
+            elif self.inCS:
+                self.inCS = False
+                self.lastGranted[self.com.id] = self.requestNumbers[self.com.id]
+                messages = self._passToken()
+            else:
+                return
+        self._post(messages)
+
+    def leave(self) -> None:
+        """
+        Termine l'accès partagé en cours et cède le token avant l'arrêt du processus, pour qu'il ne soit pas perdu :
+        aux prochains demandeurs s'il y en a, au processus suivant sur l'anneau sinon.
+        """
+        with self.lock:
+            messages = [self._endShared()] if self.reading else []
+            if self.hasToken and self.com.nbProcess > 1:
+                self.inCS = False
+                self.requesting = None
+                self.lastGranted[self.com.id] = self.requestNumbers[self.com.id]
+                messages += self._passToken()
+                if self.hasToken:
+                    messages.append(self._giveToken((self.com.id + 1) % self.com.nbProcess))
+        self._post(messages)
+
+    def onRequest(self, sender: int, number: int, shared: bool) -> None:
+        """
+        Traite la requête d'un autre processus : la mémorise, et la satisfait si le token est détenu et inutilisé,
+        en lui accordant un accès partagé ou en lui envoyant le token.
+        Args:
+            sender (int): ID du processus demandeur.
+            number (int): Numéro de la requête.
+            shared (bool): Indique si la requête demande un accès partagé.
+        """
+        with self.lock:
+            if number > self.requestNumbers[sender]:
+                self.requestNumbers[sender] = number
+                self.sharedRequests[sender] = shared
+            message = None
+            if self.hasToken and not self.inCS and self.requesting is None and self.requestNumbers[sender] == self.lastGranted[sender] + 1:
+                message = self._grantShared(sender) if self.sharedRequests[sender] else self._giveToken(sender)
+        if message is not None:
+            self.com.router.post(message)
+
+    def onToken(self, state: tuple[list[int], deque[int], dict[int, int]]) -> None:
+        """
+        Reçoit le token et son état (LN, file, accès partagés), et réveille le processus qui l'attendait ; un demandeur exclusif
+        attend encore la fin des accès partagés en cours.
+        Un token reçu sans l'avoir demandé (cédé par un processus qui s'arrête, ou recréé après une défaillance) est transmis aux demandeurs en attente, s'il y en a.
+        Args:
+            state (tuple[list[int], deque[int], dict[int, int]]): L'état porté par le token.
+        """
+        with self.lock:
+            self.hasToken = True
+            self.lastGranted, self.queue, self.readers = state
+            future = self.requesting
+            messages = []
+            if future is not None and self.requestingShared:
+                self.requesting = None
+                self._grantShared(self.com.id)
+                self.reading = self.requestNumbers[self.com.id]
+                messages = self._passToken()
+            elif future is not None:
+                future = self._enter()
+            else:
+                messages = self._passToken()
+        if future is not None:
+            future.set_result(None)
+        self._post(messages)
+
+    def onSharedGrant(self, number: int) -> None:
+        """
+        Reçoit l'accès partagé accordé par le détenteur du token, et réveille le processus qui l'attendait.
+        Args:
+            number (int): Numéro de la requête satisfaite.
+        """
+        with self.lock:
+            future = self.requesting
+            if future is None or not self.requestingShared or number != self.requestNumbers[self.com.id]:
+                return
+            self.requesting = None
+            self.reading = number
+        future.set_result(None)
+
+    def onSharedRelease(self, sender: int, number: int) -> None:
+        """
+        Enregistre la fin d'un accès partagé d'un autre processus, et entre en section critique si le processus
+        détient le token et n'attendait plus que la fin des accès partagés.
+        Args:
+            sender (int): ID du processus qui termine son accès.
+            number (int): Numéro de la requête dont l'accès se termine.
+        """
+        with self.lock:
+            self.sharedReleased[sender] = max(self.sharedReleased[sender], number)
+            future = self._enter()
+        if future is not None:
+            future.set_result(None)
+
+    def _enter(self) -> Future | None:
+        """
+        Fait entrer en section critique exclusive le détenteur du token qui l'attend, si aucun accès partagé n'est en cours.
+        Doit être appelé avec le verrou pris.
+        Returns:
+            Future | None: Le Future à résoudre, hors du verrou, si le processus entre en section critique.
+        """
+        if not self.hasToken or self.requesting is None or self.requestingShared or self._sharing():
+            return None
+        future = self.requesting
+        self.requesting = None
+        self.inCS = True
+        return future
+
+    def _sharing(self) -> bool:
+        """
+        Indique si des accès partagés accordés par le token sont en cours, en oubliant ceux qui sont terminés.
+        Doit être appelé avec le verrou pris, par le détenteur du token.
+        """
+        for id, number in list(self.readers.items()):
+            if self.sharedReleased[id] >= number:
+                del self.readers[id]
+        return bool(self.readers)
+
+    def _grantShared(self, recipient: int) -> SharedGrantMessage | None:
+        """
+        Accorde un accès partagé pour la dernière requête d'un processus, et l'enregistre dans l'état du token.
+        Doit être appelé avec le verrou pris, par le détenteur du token.
+        Returns:
+            SharedGrantMessage | None: Le message à envoyer au demandeur, None si c'est le processus local.
+        """
+        number = self.requestNumbers[recipient]
+        self.lastGranted[recipient] = number
+        self.readers[recipient] = number
+        if recipient == self.com.id:
+            return None
+        return SharedGrantMessage(self.com.id, recipient, self.resource, number)
+
+    def _endShared(self) -> SharedReleaseMessage:
+        """
+        Termine l'accès partagé en cours du processus. Doit être appelé avec le verrou pris.
+        Returns:
+            SharedReleaseMessage: Le message à diffuser pour que le détenteur du token, présent ou futur, le sache.
+        """
+        number = self.reading
+        self.reading = 0
+        self.sharedReleased[self.com.id] = number
+        return SharedReleaseMessage(self.com.id, self.resource, number)
+
+    def _passToken(self) -> list[Message]:
+        """
+        Ajoute à la file du token les processus dont une requête est en attente, puis sert la file dans l'ordre :
+        accorde un accès partagé à chaque demandeur partagé en tête de file, et cède le token au premier demandeur exclusif.
+        Doit être appelé avec le verrou pris, par le détenteur du token hors section critique.
+        Returns:
+            list[Message]: Les messages à envoyer.
+        """
+        queued = set(self.queue)
+        for id, number in enumerate(self.requestNumbers):
+            if id not in queued and number == self.lastGranted[id] + 1:
+                self.queue.append(id)
+        messages = []
+        while self.queue:
+            id = self.queue.popleft()
+            if self.requestNumbers[id] != self.lastGranted[id] + 1:
+                continue
+            if not self.sharedRequests[id]:
+                messages.append(self._giveToken(id))
+                break
+            messages.append(self._grantShared(id))
+        return [message for message in messages if message is not None]
+
+    def _giveToken(self, recipient: int) -> TokenMessage:
+        """
+        Cède le token et son état à un autre processus. Doit être appelé avec le verrou pris.
+        """
+        state = (self.lastGranted, self.queue, self.readers)
+        self.hasToken = False
+        self.lastGranted = None
+        self.queue = None
+        self.readers = None
+        return self.com.tokenMessage(recipient, state, self.resource)
+
+    def _post(self, messages: list[Message]) -> None:
+        """Envoie des messages, point à point ou diffusés selon leur destinataire."""
+        for message in messages:
+            self.com.router.post(message)
+
+    def status(self) -> tuple[bool, int, bool, int]:
+        """
+        Retourne ce que le processus sait du token : s'il le détient, le numéro de sa dernière requête, s'il l'attend,
+        et le numéro de son accès partagé en cours (0 s'il n'en a pas).
+        """
+        with self.lock:
+            return self.hasToken, self.requestNumbers[self.com.id], self.requesting is not None, self.reading
+
+    def regenerate(self, reports: dict[int, tuple[int, bool, int]]) -> None:
+        """
+        Recrée le token perdu avec son détenteur défaillant, à partir de l'état rapporté par chaque processus :
+        la dernière requête d'un processus qui attend le token est considérée comme non satisfaite, les précédentes comme satisfaites,
+        et les accès partagés en cours sont conservés.
+        Args:
+            reports (dict[int, tuple[int, bool, int]]): Numéro de la dernière requête de chaque processus, s'il attend le token,
+                et le numéro de son accès partagé en cours.
+        """
+        lastGranted = [0] * self.com.nbProcess
+        readers = {}
+        with self.lock:
+            for id, (number, waiting, reading) in reports.items():
+                self.requestNumbers[id] = max(self.requestNumbers[id], number)
+                lastGranted[id] = number - 1 if waiting else number
+                if reading:
+                    readers[id] = reading
+        self.onToken((lastGranted, deque(), readers))
+
+    def renumber(self, removed: list[int]) -> None:
+        """
+        Renumérote l'état après le retrait de processus défaillants, en oubliant leurs requêtes et leurs accès partagés ;
+        le détenteur du token qui n'attendait plus que la fin de leurs accès entre en section critique.
+        Args:
+            removed (list[int]): Les anciens IDs retirés, triés.
+        """
+        with self.lock:
+            for id in reversed(removed):
+                del self.requestNumbers[id]
+                del self.sharedRequests[id]
+                del self.sharedReleased[id]
+            if self.hasToken:
+                self.lastGranted, self.queue, self.readers = SuzukiKasami.translateState((self.lastGranted, self.queue, self.readers), removed)
+            future = self._enter()
+        if future is not None:
+            future.set_result(None)
+
+    @staticmethod
+    def translateState(state: tuple[list[int], deque[int], dict[int, int]], removed: list[int]) -> tuple[list[int], deque[int], dict[int, int]]:
+        """
+        Retourne l'état du token (LN, file, accès partagés) renuméroté après le retrait de processus défaillants, sans modifier l'original.
+        """
+        lastGranted, queue, readers = state
+        lastGranted = list(lastGranted)
+        for id in reversed(removed):
+            del lastGranted[id]
+        queue = deque(new for id in queue if (new := renumber(id, removed)) is not None)
+        readers = {new: number for id, number in readers.items() if (new := renumber(id, removed)) is not None}
+        return lastGranted, queue, readers
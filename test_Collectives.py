@@ -0,0 +1,68 @@
+"""
+Tests des opérations collectives : ordre de combinaison des réductions pour une opération non commutative.
+"""
+
+import unittest
+from threading import Thread
+
+from Com import Com
+
+def concatenate(a: list, b: list) -> list:
+    """Opération associative mais non commutative."""
+    return a + b
+
+class ReduceOrderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.coms: list[Com] = []
+
+    def tearDown(self):
+        for com in self.coms:
+            com.stop()
+
+    def cluster(self, prefix: str, n: int) -> list[Com]:
+        """Crée en parallèle un système de n Com et retourne la liste indexée par ID."""
+        coms: list[Com | None] = [None] * n
+
+        def create(i: int):
+            coms[i] = Com(f"{prefix}{i}", n)
+
+        self.runAll([lambda i=i: create(i) for i in range(n)])
+        self.coms = sorted(coms, key=lambda com: com.id)
+        return self.coms
+
+    def runAll(self, targets) -> None:
+        threads = [Thread(target=target) for target in targets]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def reduceEverywhere(self, coms: list[Com], root: int) -> dict[int, tuple]:
+        """Exécute reduce (racine d'ID root) puis allreduce de [ID] par concaténation sur tous les processus."""
+        results = {}
+
+        def run(com: Com):
+            results[com.id] = (com.reduce([com.id], concatenate, root=coms[root].name), com.allreduce([com.id], concatenate))
+
+        self.runAll([lambda com=com: run(com) for com in coms])
+        return results
+
+    def testReduceWithNonZeroRootFollowsIdOrder(self):
+        coms = self.cluster("R", 5)
+        results = self.reduceEverywhere(coms, 3)
+        self.assertEqual(results[3][0], [0, 1, 2, 3, 4])
+        for id, (reduced, allreduced) in results.items():
+            self.assertEqual(allreduced, [0, 1, 2, 3, 4])
+            if id != 3:
+                self.assertIsNone(reduced)
+
+    def testReduceMatchesAllreduceForEveryRoot(self):
+        coms = self.cluster("S", 7)
+        for root in range(7):
+            results = self.reduceEverywhere(coms, root)
+            self.assertEqual(results[root][0], results[root][1])
+            self.assertEqual(results[root][0], list(range(7)))
+
+if __name__ == '__main__':
+    unittest.main()